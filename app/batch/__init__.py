@@ -0,0 +1,10 @@
+from .sources import collect_scripts
+from .runner import BatchRunner, ScriptResult, summarize
+
+
+__all__ = [
+    collect_scripts.__name__,
+    BatchRunner.__name__,
+    ScriptResult.__name__,
+    summarize.__name__,
+]
@@ -0,0 +1,141 @@
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+import io
+import os
+import signal
+import sys
+from time import perf_counter
+import traceback
+from typing import Any, Callable, Optional
+import zlib
+
+
+class _ScriptTimeout(BaseException):
+    "raised by the interval timer, a BaseException so no interpreter handler swallows it"
+
+
+def _on_timeout(signum: int, frame: Any) -> None:
+    raise _ScriptTimeout()
+
+
+class ScriptResult:
+    __slots__ = ["file", "status", "exit_code", "stdout", "stderr", "elapsed"]
+    def __init__(
+        self, 
+        file: str, 
+        status: str, 
+        exit_code: Optional[int], 
+        stdout: str, 
+        stderr: str, 
+        elapsed: float
+    ) -> None:
+        self.file = file
+        # "ok" (exit 0), "compile_error" (65), "runtime_error" (70), "budget_exceeded" (75), "timeout" or "crash"
+        self.status = status
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.stderr = stderr
+        self.elapsed = elapsed
+
+    def to_json(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+_STATUS_BY_EXIT_CODE = {0: "ok", 65: "compile_error", 70: "runtime_error", 75: "budget_exceeded"}
+
+
+class BatchRunner:
+    """
+    Runs many scripts on a pool of worker processes, each worker runs its scripts in process
+    with stdout / stderr captured, so only the pool pays interpreter startup.
+    A script exceeding the timeout is interrupted by an ITIMER_REAL timer inside its worker.
+    """
+    def __init__(
+        self,
+        parse_args: Callable[[list[str]], Namespace],
+        run_options: list[str],
+        jobs: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_output: int = 1 << 16,
+        metrics_dir: Optional[str] = None,
+        coverage_dir: Optional[str] = None,
+    ) -> None:
+        self.parse_args = parse_args
+        self.run_options = run_options
+        self.jobs = jobs or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_output = max_output
+        self.metrics_dir = metrics_dir
+        self.coverage_dir = coverage_dir
+
+    def run(self, scripts: list[str]) -> list[ScriptResult]:
+        # small chunks keep every worker busy without a round trip per script
+        chunksize = max(1, min(32, len(scripts) // (self.jobs * 4)))
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            return list(executor.map(self.run_script, scripts, chunksize=chunksize))
+
+    def run_script(self, file: str) -> ScriptResult:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        exit_code: Optional[int] = 0
+        status = "ok"
+        stdin = sys.stdin
+        previous_handler = signal.signal(signal.SIGALRM, _on_timeout)
+        start = perf_counter()
+        try:
+            sys.stdin = io.StringIO("")
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                try:
+                    if self.timeout:
+                        signal.setitimer(signal.ITIMER_REAL, self.timeout)
+                    ns = self.parse_args(["run", *self.run_options, *self._report_options(file), file])
+                    ns.entry(ns)
+                except SystemExit as e:
+                    exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                finally:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+            status = _STATUS_BY_EXIT_CODE.get(exit_code, "crash")  # type: ignore
+        except _ScriptTimeout:
+            exit_code, status = None, "timeout"
+        except BaseException:
+            exit_code, status = 1, "crash"
+            stderr.write(traceback.format_exc())
+        finally:
+            sys.stdin = stdin
+            signal.signal(signal.SIGALRM, previous_handler)
+
+        return ScriptResult(
+            file,
+            status,
+            exit_code,
+            self._truncate(stdout.getvalue()),
+            self._truncate(stderr.getvalue()),
+            perf_counter() - start,
+        )
+
+    def _report_options(self, file: str) -> list[str]:
+        # scripts of different directories may share a name, the path's checksum tells them apart
+        name = f"{os.path.splitext(os.path.basename(file))[0]}-{zlib.crc32(os.path.abspath(file).encode()):08x}"
+        options = []
+        if self.metrics_dir is not None:
+            options += ["--metrics", os.path.join(self.metrics_dir, name + ".prom")]
+        if self.coverage_dir is not None:
+            options += ["--coverage", os.path.join(self.coverage_dir, name + ".json")]
+        return options
+
+    def _truncate(self, text: str) -> str:
+        if len(text) <= self.max_output:
+            return text
+        return text[:self.max_output] + f"\n... {len(text) - self.max_output} characters truncated"
+
+
+def summarize(results: list[ScriptResult], elapsed: float) -> dict[str, Any]:
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    return {
+        "total": len(results),
+        "counts": counts,
+        "elapsed": elapsed,
+        "results": [result.to_json() for result in results],
+    }
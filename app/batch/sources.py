@@ -0,0 +1,27 @@
+import glob
+import os
+
+
+def collect_scripts(source: str) -> list[str]:
+    """
+    The scripts named by source: every .lox file below a directory, the files matching a glob
+    pattern, or the paths listed in a manifest (one per line, relative to the manifest, # comments).
+    """
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, "**", "*.lox"), recursive=True))
+    if os.path.isfile(source):
+        if source.endswith(".lox"):
+            return [source]
+        return _read_manifest(source)
+    return sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+
+
+def _read_manifest(path: str) -> list[str]:
+    base = os.path.dirname(path)
+    scripts: list[str] = []
+    with open(path) as fd:
+        for line in fd:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                scripts.append(os.path.join(base, line))
+    return scripts
@@ -0,0 +1,24 @@
+from .columns import (
+    ColumnsError,
+    ColumnResult,
+    load_columns,
+    evaluate_columns,
+    write_csv,
+    write_npy,
+    numpy_or_none,
+)
+from .vectorize import Vector, NotVectorizable, compile_expression
+
+
+__all__ = [
+    ColumnsError.__name__,
+    ColumnResult.__name__,
+    load_columns.__name__,
+    evaluate_columns.__name__,
+    write_csv.__name__,
+    write_npy.__name__,
+    numpy_or_none.__name__,
+    Vector.__name__,
+    NotVectorizable.__name__,
+    compile_expression.__name__,
+]
@@ -0,0 +1,210 @@
+import csv
+import math
+import os
+from typing import Any, Optional, TextIO
+
+from ..expressions import Expression, stringify
+from ..utils import RuntimeError, UndefinedVariableError
+from .vectorize import (
+    Vector,
+    NUMBER,
+    BOOL,
+    STRING,
+    NUMBERS_ERROR,
+    ERROR_MESSAGES,
+    NotVectorizable,
+    compile_expression,
+    vector_from_array,
+    vector_from_values,
+)
+
+
+class ColumnsError(Exception):
+    "the columns can not be read"
+
+
+def numpy_or_none() -> Any:
+    "numpy if it is installed, the columnar evaluation falls back to one tree walk per row without it"
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def load_columns(path: str) -> dict[str, Any]:
+    """
+    The named columns of a CSV file, with a header row, or of numpy data: a .npz archive of arrays,
+    a .npy structured array or a plain .npy array named after the file.
+    CSV cells are numbers when float() reads a finite one from them (1e3, .5 and +2 too),
+    true, false, nil for an empty cell, strings otherwise.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".npy", ".npz"):
+        np = numpy_or_none()
+        if np is None:
+            raise ColumnsError(f"reading {extension} files needs numpy")
+        data = np.load(path, allow_pickle=False)
+        if extension == ".npz":
+            columns = {name: data[name] for name in data.files}
+        elif data.dtype.names:
+            columns = {name: data[name] for name in data.dtype.names}
+        else:
+            columns = {os.path.splitext(os.path.basename(path))[0]: data}
+        for name, column in columns.items():
+            if column.ndim != 1:
+                raise ColumnsError(f"column {name} has {column.ndim} dimensions, columns have one")
+    else:
+        with open(path, newline="") as fd:
+            reader = csv.reader(fd)
+            header = next(reader, None)
+            if header is None:
+                raise ColumnsError("the CSV file has no header row")
+            names = [name.strip() for name in header]
+            values: list[list[Any]] = [[] for _ in names]
+            for line, row in enumerate(reader, 2):
+                if len(row) != len(names):
+                    raise ColumnsError(f"line {line} has {len(row)} cells, the header has {len(names)}")
+                for i, cell in enumerate(row):
+                    values[i].append(_cell_value(cell))
+        columns = dict(zip(names, values))
+
+    if len({len(column) for column in columns.values()}) > 1:
+        raise ColumnsError("the columns have different lengths")
+    return columns
+
+
+def _cell_value(cell: str) -> Any:
+    if cell == "" or cell == "nil":
+        return None
+    if cell == "true" or cell == "false":
+        return cell == "true"
+    try:
+        number = float(cell)
+    except ValueError:
+        return cell
+    # inf and nan are names a column may well hold as text
+    return number if math.isfinite(number) else cell
+
+
+class ColumnResult:
+    """
+    The value of each row, None where errors holds the message of the row's runtime error.
+    A vectorized result keeps its Vector and only builds the python values when they are read.
+    """
+    __slots__ = ["vector", "_values", "_errors"]
+    def __init__(
+        self,
+        values: Optional[list[Any]] = None,
+        errors: Optional[list[Optional[str]]] = None,
+        vector: Optional[Vector] = None,
+    ) -> None:
+        self.vector = vector
+        self._values = values
+        self._errors = errors
+
+    @property
+    def values(self) -> list[Any]:
+        if self._values is None:
+            self._values = self.vector.values()  # type: ignore
+        return self._values
+
+    @property
+    def errors(self) -> list[Optional[str]]:
+        if self._errors is None:
+            self._errors = [ERROR_MESSAGES.get(kind) for kind in self.vector.kinds.tolist()]  # type: ignore
+        return self._errors
+
+    @property
+    def masked(self) -> int:
+        if self.vector is not None:
+            return int((self.vector.kinds >= NUMBERS_ERROR).sum())
+        return sum(1 for error in self.errors if error is not None)
+
+    def __len__(self) -> int:
+        return len(self.vector) if self.vector is not None else len(self.values)
+
+
+def evaluate_columns(expression: Optional[Expression], columns: dict[str, Any]) -> ColumnResult:
+    """
+    The expression evaluated for every row of the columns, as numpy array operations when numpy is
+    installed and every node of the expression has an array counterpart, one tree walk per row otherwise.
+    A row failing a type check is masked with its error, the other rows are still evaluated.
+    """
+    rows = len(next(iter(columns.values()))) if columns else 1
+    np = numpy_or_none()
+    if np is not None:
+        try:
+            compiled = compile_expression(expression, set(columns))
+        except NotVectorizable:
+            pass
+        else:
+            vectors = {
+                name: vector_from_array(column) if isinstance(column, np.ndarray) else vector_from_values(column)
+                for name, column in columns.items()
+            }
+            return ColumnResult(vector=compiled(vectors))
+    return _evaluate_rows(expression, columns, rows)
+
+
+def _evaluate_rows(expression: Optional[Expression], columns: dict[str, Any], rows: int) -> ColumnResult:
+    from ..execution import ExecutionContext
+
+    context = ExecutionContext()
+    scope = context.root_scope
+    bindings = [
+        (scope.create_variable(name), column.tolist() if hasattr(column, "tolist") else column)
+        for name, column in columns.items()
+    ]
+    values: list[Any] = []
+    errors: list[Optional[str]] = []
+    for row in range(rows):
+        for variable, column in bindings:
+            value = column[row]
+            # numpy integers and the like become Lox numbers
+            if value is not None and value.__class__ not in (bool, float, str):
+                value = float(value) if isinstance(value, (int, float)) else str(value)
+            variable.set_value(value)
+        try:
+            values.append(expression.evaluate(scope) if expression is not None else None)
+            errors.append(None)
+        except UndefinedVariableError:
+            # a mistake in the expression rather than in the row
+            raise
+        except RuntimeError as e:
+            values.append(None)
+            errors.append(e.msg)
+    return ColumnResult(values, errors)
+
+
+def write_csv(result: ColumnResult, stream: TextIO) -> None:
+    "a result column and an error column, the result of a masked row is empty"
+    writer = csv.writer(stream, lineterminator="\n")
+    writer.writerow(["result", "error"])
+    writer.writerows(
+        ("", error) if error is not None else (stringify(value), "")
+        for value, error in zip(result.values, result.errors)
+    )
+
+
+def write_npy(result: ColumnResult, path: str) -> None:
+    "a structured array of a float value and a valid flag per row, for results that are numbers or booleans"
+    np = numpy_or_none()
+    if np is None:
+        raise ColumnsError("writing .npy files needs numpy")
+    array = np.zeros(len(result), dtype=[("value", np.float64), ("valid", np.bool_)])
+    vector = result.vector
+    if vector is not None:
+        if (vector.kinds == STRING).any():
+            raise ColumnsError(_NPY_RESULTS)
+        array["value"] = np.where((vector.kinds == NUMBER) | (vector.kinds == BOOL), vector.numbers, np.nan)
+        array["valid"] = vector.kinds < NUMBERS_ERROR
+    else:
+        if any(value is not None and value.__class__ not in (bool, float) for value in result.values):
+            raise ColumnsError(_NPY_RESULTS)
+        array["value"] = [float(value) if value is not None else np.nan for value in result.values]
+        array["valid"] = [error is None for error in result.errors]
+    np.save(path, array)
+
+
+_NPY_RESULTS = "only numbers and booleans can be written as .npy, other results as CSV"
@@ -0,0 +1,287 @@
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from ..expressions import (
+    Expression,
+    LiteralExpression,
+    GroupExpression,
+    IdentifierExpression,
+    ThisExpression,
+    NegativeExpression,
+    BangExpression,
+    PlusExpression,
+    MinusExpression,
+    MultiplyExpression,
+    DivideExpression,
+    LessExpression,
+    LessEqualExpression,
+    GreaterExpression,
+    GreaterEqualExpression,
+    EqualEqualExpression,
+    BangEqualExpression,
+    AndExpression,
+    OrExpression,
+)
+from ..utils import NoneNumberOperandError, UnMatchedOprendError
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# kind of each element of a Vector, the errors mask their rows with the message of the error
+NIL, BOOL, NUMBER, STRING, NUMBERS_ERROR, MATCH_ERROR = range(6)
+ERROR_MESSAGES = {NUMBERS_ERROR: NoneNumberOperandError.msg, MATCH_ERROR: UnMatchedOprendError.msg}
+
+
+class NotVectorizable(Exception):
+    "the expression has a node with no array counterpart, e.g. a call or a name that is not a column"
+
+
+class Vector:
+    """
+    One Lox value per row as parallel arrays: the kind of each value, the number it holds (0 / 1 for
+    booleans) and, only if some value is a string, the strings as an object array.
+    """
+    __slots__ = ["kinds", "numbers", "strings"]
+    def __init__(self, kinds: 'np.ndarray', numbers: 'np.ndarray', strings: Optional['np.ndarray'] = None) -> None:
+        self.kinds = kinds
+        self.numbers = numbers
+        self.strings = strings
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def values(self) -> list[Any]:
+        "the python values of the rows, None for a masked row"
+        kinds = self.kinds.tolist()
+        numbers = self.numbers.tolist()
+        strings = self.strings.tolist() if self.strings is not None else None
+        result: list[Any] = []
+        for i, kind in enumerate(kinds):
+            if kind == NUMBER:
+                result.append(numbers[i])
+            elif kind == BOOL:
+                result.append(numbers[i] != 0)
+            elif kind == STRING:
+                result.append(strings[i])  # type: ignore
+            else:
+                result.append(None)
+        return result
+
+
+Compiled = Callable[[dict[str, Vector]], Vector]
+
+
+def compile_expression(expr: Optional[Expression], names: set[str]) -> Compiled:
+    """
+    The expression as a function of the vectors of the columns called names, each operator applied to
+    whole arrays at once with the checks of its evaluate turned into masks: a row failing one is an
+    error row instead of a raised error, the other rows go on.
+    """
+    import numpy as np
+
+    if expr is None or isinstance(expr, LiteralExpression):
+        value = expr.evaluate(None) if expr is not None else None  # type: ignore
+        return lambda columns: _constant(np, value, len(next(iter(columns.values()))) if columns else 1)
+    if isinstance(expr, GroupExpression):
+        return compile_expression(expr.expr, names)
+    if isinstance(expr, IdentifierExpression) and not isinstance(expr, ThisExpression):
+        name = expr.name.lexeme
+        if name not in names:
+            raise NotVectorizable(name)
+        return lambda columns: columns[name]
+
+    if isinstance(expr, (NegativeExpression, BangExpression)):
+        right = compile_expression(expr.right, names)
+        unary = _negative if isinstance(expr, NegativeExpression) else _bang
+        return lambda columns: unary(np, right(columns))
+
+    for classes, binary in _BINARY:
+        if isinstance(expr, classes):
+            left = compile_expression(expr.left, names)  # type: ignore
+            right = compile_expression(expr.right, names)  # type: ignore
+            return lambda columns: binary(np, left(columns), right(columns))
+    raise NotVectorizable(expr.__class__.__name__)
+
+
+def vector_from_values(values: list[Any]) -> Vector:
+    "the vector of a column of python values: floats, strings, booleans and None"
+    import numpy as np
+
+    kinds = np.array([_kind_of(value) for value in values], dtype=np.uint8)
+    numbers = np.array(
+        [value if value.__class__ is float else float(value is True) for value in values], dtype=np.float64
+    )
+    strings = None
+    if (kinds == STRING).any():
+        strings = np.array(values, dtype=object)
+    return Vector(kinds, numbers, strings)
+
+
+def vector_from_array(array: 'np.ndarray') -> Vector:
+    "the vector of a one dimensional numpy array of numbers, booleans or strings"
+    import numpy as np
+
+    rows = len(array)
+    if array.dtype.kind == "b":
+        return Vector(np.full(rows, BOOL, np.uint8), array.astype(np.float64))
+    if array.dtype.kind in "iuf":
+        return Vector(np.full(rows, NUMBER, np.uint8), array.astype(np.float64))
+    if array.dtype.kind in "US":
+        strings = array.astype(str).astype(object)
+        return Vector(np.full(rows, STRING, np.uint8), np.zeros(rows), strings)
+    return vector_from_values([_python_value(value) for value in array.tolist()])
+
+
+def _python_value(value: Any) -> Any:
+    if value is None or value.__class__ in (bool, str, float):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    return str(value)
+
+
+def _kind_of(value: Any) -> int:
+    if value is None:
+        return NIL
+    if value is True or value is False:
+        return BOOL
+    if value.__class__ is float:
+        return NUMBER
+    return STRING
+
+
+def _constant(np: Any, value: Any, rows: int) -> Vector:
+    strings = np.full(rows, value, dtype=object) if isinstance(value, str) else None
+    number = value if value.__class__ is float else float(value is True)
+    return Vector(np.full(rows, _kind_of(value), np.uint8), np.full(rows, number), strings)
+
+
+def _errors(np: Any, *operands: Vector) -> 'np.ndarray':
+    "the error kind of each row whose operands already failed, the leftmost one first like evaluate, else 0"
+    errors = np.zeros(len(operands[0]), np.uint8)
+    for operand in reversed(operands):
+        errors = np.where(operand.kinds >= NUMBERS_ERROR, operand.kinds, errors)
+    return errors
+
+
+def _lox_falsy(np: Any, vector: Vector) -> 'np.ndarray':
+    "_is_truthy of and / or: only nil and false are false"
+    return (vector.kinds == NIL) | ((vector.kinds == BOOL) & (vector.numbers == 0))
+
+
+def _python_falsy(np: Any, vector: Vector) -> 'np.ndarray':
+    "`not value` of BangExpression, which also takes 0 and the empty string for false"
+    falsy = (vector.kinds == NIL) | (((vector.kinds == BOOL) | (vector.kinds == NUMBER)) & (vector.numbers == 0))
+    if vector.strings is not None:
+        falsy |= (vector.kinds == STRING) & (vector.strings == "")
+    return falsy
+
+
+def _result(np: Any, errors: 'np.ndarray', valid: 'np.ndarray', kind: int, numbers: 'np.ndarray', error: int) -> Vector:
+    kinds = np.where(errors != 0, errors, np.where(valid, kind, error)).astype(np.uint8)
+    return Vector(kinds, numbers)
+
+
+def _negative(np: Any, right: Vector) -> Vector:
+    return _result(np, _errors(np, right), right.kinds == NUMBER, NUMBER, -right.numbers, NUMBERS_ERROR)
+
+
+def _bang(np: Any, right: Vector) -> Vector:
+    # never fails, not even on an error row: that row stays an error
+    errors = _errors(np, right)
+    return _result(np, errors, np.ones(len(right), bool), BOOL, _python_falsy(np, right).astype(np.float64), 0)
+
+
+def _numeric(operation: Callable[[Any, Any], Any], kind: int) -> Callable[[Any, Vector, Vector], Vector]:
+    "an operator taking two numbers, giving a number or a boolean"
+    def binary(np: Any, left: Vector, right: Vector) -> Vector:
+        valid = (left.kinds == NUMBER) & (right.kinds == NUMBER)
+        # IEEE 754 division by zero like divide, without the warnings
+        with np.errstate(all="ignore"):
+            numbers = np.asarray(operation(left.numbers, right.numbers), dtype=np.float64)
+        return _result(np, _errors(np, left, right), valid, kind, numbers, NUMBERS_ERROR)
+    return binary
+
+
+def _plus(np: Any, left: Vector, right: Vector) -> Vector:
+    errors = _errors(np, left, right)
+    numbers = (left.kinds == NUMBER) & (right.kinds == NUMBER)
+    strings = (left.kinds == STRING) & (right.kinds == STRING)
+    # a number and a string do not match, anything else is not a number
+    mismatched = (
+        ((left.kinds == NUMBER) | (left.kinds == STRING)) & ((right.kinds == NUMBER) | (right.kinds == STRING))
+    )
+    kinds = np.where(
+        errors != 0, errors,
+        np.where(numbers, NUMBER, np.where(strings, STRING, np.where(mismatched, MATCH_ERROR, NUMBERS_ERROR)))
+    ).astype(np.uint8)
+    result = Vector(kinds, left.numbers + right.numbers)
+    concatenated = strings & (errors == 0)
+    if concatenated.any():
+        result.strings = np.full(len(kinds), None, dtype=object)
+        result.strings[concatenated] = left.strings[concatenated] + right.strings[concatenated]  # type: ignore
+    return result
+
+
+def _equal(np: Any, left: Vector, right: Vector) -> 'np.ndarray':
+    "python == of the values: nil only equals nil, booleans compare as 0 / 1 with numbers"
+    numeric = ((left.kinds == NUMBER) | (left.kinds == BOOL)) & ((right.kinds == NUMBER) | (right.kinds == BOOL))
+    equal = (numeric & (left.numbers == right.numbers)) | ((left.kinds == NIL) & (right.kinds == NIL))
+    if left.strings is not None and right.strings is not None:
+        both = (left.kinds == STRING) & (right.kinds == STRING)
+        equal[both] = left.strings[both] == right.strings[both]
+    return equal
+
+
+def _equal_equal(np: Any, left: Vector, right: Vector) -> Vector:
+    valid = np.ones(len(left), bool)
+    return _result(np, _errors(np, left, right), valid, BOOL, _equal(np, left, right).astype(np.float64), 0)
+
+
+def _bang_equal(np: Any, left: Vector, right: Vector) -> Vector:
+    valid = np.ones(len(left), bool)
+    return _result(np, _errors(np, left, right), valid, BOOL, (~_equal(np, left, right)).astype(np.float64), 0)
+
+
+def _select(np: Any, condition: 'np.ndarray', chosen: Vector, other: Vector) -> Vector:
+    "rows of chosen where condition holds, of other elsewhere"
+    strings = None
+    if chosen.strings is not None or other.strings is not None:
+        strings = np.full(len(condition), None, dtype=object)
+        if chosen.strings is not None:
+            strings[condition] = chosen.strings[condition]
+        if other.strings is not None:
+            strings[~condition] = other.strings[~condition]
+    return Vector(
+        np.where(condition, chosen.kinds, other.kinds).astype(np.uint8),
+        np.where(condition, chosen.numbers, other.numbers),
+        strings,
+    )
+
+
+def _and(np: Any, left: Vector, right: Vector) -> Vector:
+    # false itself, not the falsy left value, as AndExpression.evaluate returns
+    false = _constant(np, False, len(left))
+    failed = left.kinds >= NUMBERS_ERROR
+    return _select(np, failed, left, _select(np, _lox_falsy(np, left), false, right))
+
+
+def _or(np: Any, left: Vector, right: Vector) -> Vector:
+    truthy = ~_lox_falsy(np, left)
+    return _select(np, truthy, left, right)
+
+
+_BINARY: list[tuple[Any, Callable[[Any, Vector, Vector], Vector]]] = [
+    (PlusExpression, _plus),
+    (MinusExpression, _numeric(lambda a, b: a - b, NUMBER)),
+    (MultiplyExpression, _numeric(lambda a, b: a * b, NUMBER)),
+    (DivideExpression, _numeric(lambda a, b: a / b, NUMBER)),
+    (LessExpression, _numeric(lambda a, b: a < b, BOOL)),
+    (LessEqualExpression, _numeric(lambda a, b: a <= b, BOOL)),
+    (GreaterExpression, _numeric(lambda a, b: a > b, BOOL)),
+    (GreaterEqualExpression, _numeric(lambda a, b: a >= b, BOOL)),
+    (EqualEqualExpression, _equal_equal),
+    (BangEqualExpression, _bang_equal),
+    (AndExpression, _and),
+    (OrExpression, _or),
+]
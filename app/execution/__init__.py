@@ -1,4 +1,28 @@
-from .execution_context import ExecutionScope, Variable, ExecutionContext, FunctionScopeBinding
+from typing import Any
+
+from .execution_context import (
+    ExecutionScope, 
+    Variable, 
+    ExecutionContext, 
+    FunctionScopeBinding, 
+    ClassBinding, 
+    Instance, 
+    Shape,
+)
+from .budget import ExecutionBudget
+from .modules import ModuleLoader, ModuleCacheError
+from .output import Output, Sink, StdoutSink, FileSink, MemorySink, FlushPolicy
+
+
+_SNAPSHOT_NAMES = ["SnapshotError", "snapshot_key", "save_snapshot", "load_snapshot"]
+
+
+def __getattr__(name: str) -> Any:
+    # snapshots pull in the tree serializer, hashlib and tempfile, a run without a prelude never needs them
+    if name in _SNAPSHOT_NAMES:
+        from . import snapshot
+        return getattr(snapshot, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = [
@@ -6,4 +30,17 @@ __all__ = [
     ExecutionScope.__name__,
     Variable.__name__,
     FunctionScopeBinding.__name__,
+    ClassBinding.__name__,
+    Instance.__name__,
+    Shape.__name__,
+    ExecutionBudget.__name__,
+    ModuleLoader.__name__,
+    ModuleCacheError.__name__,
+    Output.__name__,
+    Sink.__name__,
+    StdoutSink.__name__,
+    FileSink.__name__,
+    MemorySink.__name__,
+    FlushPolicy.__name__,
+    *_SNAPSHOT_NAMES,
 ]
\ No newline at end of file
@@ -0,0 +1,111 @@
+import os
+from time import perf_counter
+from typing import Optional
+
+from ..utils import BudgetExceededError
+
+
+class ExecutionBudget:
+    """
+    Limits for running untrusted scripts: steps, wall time, call depth, memory growth and string size.
+    A step is a loop iteration or a call. Loops tick the budget of their context at each back edge and
+    calls when they enter a function, time and memory are only read every CHECK_INTERVAL steps,
+    so a tick stays a counter increment and a comparison.
+    Calls nesting deeper than python's stack allows go over the depth limit even without a max_depth.
+    """
+    CHECK_INTERVAL = 1024
+    # strings this long are checked against the memory limit right away, doubling one outgrows any interval
+    LARGE_STRING = 1 << 20
+    # natives allocating this many bytes at once are checked against the memory limit before they do
+    LARGE_ALLOCATION = 1 << 20
+
+    def __init__(
+        self,
+        max_steps: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        max_depth: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        max_string: Optional[int] = None,
+    ) -> None:
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.max_depth = max_depth
+        # bytes the resident size may grow by from start, a worker reused by many scripts is not charged for earlier ones
+        self.max_memory = max_memory
+        self.max_string = max_string
+        self.steps = 0
+        self.depth = 0
+        self._next_check = 0
+        self._deadline: Optional[float] = None
+        self._memory_base = 0
+
+    def start(self) -> None:
+        if self.max_seconds is not None:
+            self._deadline = perf_counter() + self.max_seconds
+        if self.max_memory is not None:
+            self._memory_base = _memory_in_use()
+        self._schedule()
+
+    def tick(self) -> None:
+        self.steps += 1
+        if self.steps >= self._next_check:
+            self._check()
+
+    def enter_call(self) -> None:
+        "a tick for a call, the caller takes depth back down once the call returns"
+        if self.max_depth is not None and self.depth >= self.max_depth:
+            raise BudgetExceededError("depth", f"more than {self.max_depth} nested calls")
+        self.depth += 1
+        self.tick()
+
+    def check_string(self, length: int) -> None:
+        if self.max_string is not None and length > self.max_string:
+            raise BudgetExceededError("string", f"a string of {length} characters, the limit is {self.max_string}")
+        if self.max_memory is not None and length >= self.LARGE_STRING:
+            self._check_memory()
+
+    def check_allocation(self, size: int) -> None:
+        "size bytes a native is about to allocate in one go"
+        if self.max_memory is not None and size >= self.LARGE_ALLOCATION:
+            grown = _memory_in_use() - self._memory_base + size
+            if grown > self.max_memory:
+                raise BudgetExceededError(
+                    "memory", f"allocating {size >> 20} MiB grows memory past the limit of {self.max_memory >> 20} MiB"
+                )
+
+    def _check(self) -> None:
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise BudgetExceededError("steps", f"more than {self.max_steps} steps")
+        if self._deadline is not None and perf_counter() > self._deadline:
+            raise BudgetExceededError("time", f"ran for more than {self.max_seconds:g} seconds")
+        if self.max_memory is not None:
+            self._check_memory()
+        self._schedule()
+
+    def _check_memory(self) -> None:
+        grown = _memory_in_use() - self._memory_base
+        if grown > self.max_memory:  # type: ignore
+            raise BudgetExceededError(
+                "memory", f"memory grew by {grown >> 20} MiB, the limit is {self.max_memory >> 20} MiB"  # type: ignore
+            )
+
+    def _schedule(self) -> None:
+        next_check = self.steps + self.CHECK_INTERVAL
+        if self.max_steps is not None:
+            next_check = min(next_check, self.max_steps + 1)
+        self._next_check = next_check
+
+
+def _memory_in_use() -> int:
+    "resident size of the process in bytes, its peak where the current size can not be read"
+    try:
+        with open("/proc/self/statm") as fd:
+            return int(fd.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
@@ -1,17 +1,38 @@
-from datetime import datetime
-from typing import Any, Optional, Union, cast
-from xmlrpc.client import boolean
+from typing import TYPE_CHECKING, Any, Optional, Union, cast
 
-from ..expressions import FunctionDefinitionExpression, define_built_in_function
+from ..expressions import FunctionDefinitionExpression
 from ..utils import UndefinedVariableError, RuntimeError
+from ..stdlib import BUILT_IN_FUNCTIONS
+from .output import Output, StdoutSink
+from .budget import ExecutionBudget
 
+if TYPE_CHECKING:
+    from .modules import ModuleLoader
 
 
 class ExecutionContext:
-    def __init__(self) -> None:
-        self.root_scope = ExecutionScope()
+    "state shared by every scope of one program run"
+    def __init__(
+        self,
+        output: Optional[Output] = None,
+        budget: Optional[ExecutionBudget] = None,
+        modules: Optional['ModuleLoader'] = None,
+    ) -> None:
+        self.output = output if output is not None else Output(StdoutSink())
+        # read by loops and calls, None runs without limits
+        self.budget = budget
+        self._modules = modules
+        self.root_scope = ExecutionScope(context=self)
         self._current_scope = self.root_scope
     
+    @property
+    def modules(self) -> 'ModuleLoader':
+        "the loader of this run's imports, one resolving from the working directory unless given"
+        if self._modules is None:
+            from .modules import ModuleLoader
+            self._modules = ModuleLoader()
+        return self._modules
+    
     @property
     def current_scope(self) -> 'ExecutionScope':
         return self._current_scope
@@ -28,23 +49,19 @@ class ExecutionContext:
 
 class ExecutionScope:
     _variables: dict[str, 'Variable']
+    context: ExecutionContext
     if_statement_predicate = False
     function_return_value: tuple[bool, Any] = (False, None)  # bool means returned or not, Any is return value
+    module_path: Optional[str] = None  # set on the top level scope of an imported module
     
-    def __init__(self, parent: Optional['ExecutionScope']=None) -> None:
+    def __init__(self, parent: Optional['ExecutionScope']=None, context: Optional[ExecutionContext]=None) -> None:
         self.parent = parent
+        self.context = parent.context if parent is not None else context  # type: ignore
         self._variables = {}
         
         if self.parent is None:
-            self._variables["clock"] = Variable(self, "clock")
-            self._variables["clock"]._value = FunctionScopeBinding(
-                define_built_in_function(
-                    "clock", 
-                    [], 
-                    lambda: int(datetime.now().timestamp()), 
-                    self
-                ),
-                self)
+            for function in BUILT_IN_FUNCTIONS:
+                self.create_variable(function.name).set_value(function)  # type: ignore
     
     def create_variable(self, name: str) -> 'Variable':
         self._variables[name] = Variable(self, name)
@@ -59,6 +76,10 @@ class ExecutionScope:
             
         raise UndefinedVariableError(name)
 
+    def import_variables(self, module: 'ExecutionScope') -> None:
+        "binds the variables of module here, the very same ones: an assignment on either side shows on both"
+        self._variables.update(module._variables)
+
     def create_child_scope(self) -> 'ExecutionScope':
         return ExecutionScope(self)
     
@@ -92,7 +113,16 @@ class Variable:
     def set_function_value(self, funcdef: 'FunctionDefinitionExpression', closure: ExecutionScope):
         self._value = FunctionScopeBinding(funcdef, closure)
     
-    def is_function(self) -> boolean:
+    def set_class_value(
+        self, 
+        name: str, 
+        superclass: Optional['ClassBinding'], 
+        methods: list['FunctionDefinitionExpression'], 
+        closure: ExecutionScope
+    ) -> None:
+        self._value = ClassBinding(name, superclass, methods, closure)
+    
+    def is_function(self) -> bool:
         return isinstance(self._value, FunctionScopeBinding)
     
     def __hash__(self) -> int:
@@ -116,5 +146,65 @@ class FunctionScopeBinding:
     
     def __str__(self) -> str:
         return str(self.funcdef)
+
+
+class Shape:
+    """
+    Hidden class of an instance: where each field lives in the instance's slot list.
+    Instances of one class that add the same fields in the same order share their shapes, so a
+    shape identifies both the class and the field layout and can key the inline caches.
+    """
+    __slots__ = ["klass", "slots", "transitions"]
+    def __init__(self, klass: 'ClassBinding', slots: dict[str, int]) -> None:
+        self.klass = klass
+        self.slots = slots
+        self.transitions: dict[str, Shape] = {}
+    
+    def with_field(self, name: str) -> 'Shape':
+        shape = self.transitions.get(name)
+        if shape is None:
+            shape = Shape(self.klass, {**self.slots, name: len(self.slots)})
+            self.transitions[name] = shape
+        return shape
+
+
+class ClassBinding:
+    __slots__ = ["name", "superclass", "methods", "root_shape"]
+    def __init__(
+        self, 
+        name: str, 
+        superclass: Optional['ClassBinding'], 
+        methods: list['FunctionDefinitionExpression'], 
+        closure: ExecutionScope
+    ) -> None:
+        self.name = name
+        self.superclass = superclass
+        # inherited methods keep the closure of the class defining them, for their `super`
+        self.methods: dict[str, FunctionScopeBinding] = {**superclass.methods} if superclass else {}
+        for method in methods:
+            self.methods[method.name] = FunctionScopeBinding(method, closure)
+        self.root_shape = Shape(self, {})
     
-    
\ No newline at end of file
+    def instantiate(self) -> 'Instance':
+        return Instance(self.root_shape)
+    
+    def __str__(self) -> str:
+        return self.name
+
+
+class Instance:
+    __slots__ = ["shape", "fields"]
+    def __init__(self, shape: Shape) -> None:
+        self.shape = shape
+        self.fields: list[Any] = []
+    
+    def method_scope(self, method: FunctionScopeBinding) -> ExecutionScope:
+        scope = method.closure.create_child_scope()
+        scope.create_variable("this").set_value(self)  # type: ignore
+        return scope
+    
+    def bind(self, method: FunctionScopeBinding) -> FunctionScopeBinding:
+        return FunctionScopeBinding(method.funcdef, self.method_scope(method))
+    
+    def __str__(self) -> str:
+        return f"{self.shape.klass.name} instance"
@@ -0,0 +1,183 @@
+import os
+import sys
+from typing import TYPE_CHECKING, Any, Optional
+
+from ..utils import ModuleLoadError, ModuleSyntaxError
+from .execution_context import ExecutionScope
+
+if TYPE_CHECKING:
+    from ..expressions import RootAST
+    from ..server import ASTCache
+
+
+# bump whenever a change to the nodes makes trees cached on disk by an older version wrong to load
+MODULE_CACHE_VERSION = 2
+
+# parsed modules of every run in this process that was not given a cache of its own
+_process_cache: Optional['ASTCache'] = None
+
+
+class ModuleCacheError(Exception):
+    "the module cache directory can not be made or other users can write to it"
+
+
+class ModuleLoader:
+    """
+    Runs the modules `import` statements name, each once per program run, in a top level scope of
+    its own whose variables the importing scope then binds.
+    A path is relative to the file whose code runs the import, the directory given here for the
+    program itself. Parsed and optimized trees are kept by path, mtime and size in an ASTCache,
+    the server's when it runs the program, and in cache_dir on disk when one is given.
+    Raises ModuleCacheError for a cache_dir other users could plant trees in.
+    """
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        cache: Optional['ASTCache'] = None,
+        cache_dir: Optional[str] = None,
+        optimize: bool = True,
+    ) -> None:
+        self.directory = directory if directory is not None else os.getcwd()
+        self.cache = cache
+        self.cache_dir = cache_dir
+        if cache_dir is not None:
+            _prepare_cache_dir(cache_dir)
+        self.optimize = optimize
+        # real path -> top level scope of each module this run imported
+        self.modules: dict[str, ExecutionScope] = {}
+
+    def load(self, path: str, scope: ExecutionScope) -> ExecutionScope:
+        "the top level scope of the module path names from scope, run on its first import"
+        resolved = self.resolve(path, scope)
+        module = self.modules.get(resolved)
+        if module is not None:
+            # also a module importing one of its importers back: it gets the names bound so far
+            return module
+
+        ast = self._parse(path, resolved)
+        module = ExecutionScope(scope.context.root_scope)
+        module.module_path = resolved
+        self.modules[resolved] = module
+        ast.evaluate_in(module)
+        return module
+
+    def resolve(self, path: str, scope: ExecutionScope) -> str:
+        # the closest module scope is the one of the file the running code was written in
+        directory = self.directory
+        current: Optional[ExecutionScope] = scope
+        while current is not None:
+            if current.module_path is not None:
+                directory = os.path.dirname(current.module_path)
+                break
+            current = current.parent
+        return os.path.realpath(os.path.join(directory, path))
+
+    def _parse(self, path: str, resolved: str) -> 'RootAST':
+        global _process_cache
+        cache = self.cache
+        if cache is None:
+            if _process_cache is None:
+                from ..server.cache import ASTCache
+                _process_cache = ASTCache()
+            cache = _process_cache
+        try:
+            ast = cache.load(resolved, ("module", self.optimize), lambda: self._parse_file(resolved))
+        except OSError as e:
+            raise ModuleLoadError(path, e.strerror or str(e))
+        except UnicodeDecodeError:
+            raise ModuleLoadError(path, "not a text file")
+        if ast is None:
+            raise ModuleSyntaxError(path)
+        return ast
+
+    def _parse_file(self, resolved: str) -> Optional['RootAST']:
+        from ..parse import Parser
+        from ..optimize import optimize
+
+        stat = os.stat(resolved)
+        key = (MODULE_CACHE_VERSION, sys.version, resolved, stat.st_mtime_ns, stat.st_size, self.optimize)
+        cached_path = self._cached_path(resolved) if self.cache_dir else None
+        if cached_path is not None:
+            ast = _read_cached(cached_path, key)
+            if ast is not None:
+                return ast
+
+        with open(resolved) as fd:
+            parser = Parser(fd.read())
+        if parser.error:
+            return None
+        if self.optimize:
+            # every function of a module is there for its importers
+            optimize(parser.ast, remove_unused_functions=False)
+        if cached_path is not None:
+            _write_cached(cached_path, key, parser.ast)
+        return parser.ast
+
+    def _cached_path(self, resolved: str) -> str:
+        import hashlib
+
+        name = hashlib.sha256(f"{resolved}\0{self.optimize}".encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, name + ".ast")  # type: ignore
+
+
+def _prepare_cache_dir(path: str) -> None:
+    import stat
+
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.stat(path)
+    except OSError as e:
+        raise ModuleCacheError(f"{path}: {e.strerror or e}")
+    if not stat.S_ISDIR(info.st_mode):
+        raise ModuleCacheError(f"{path} is not a directory")
+    # every run loads the trees found there, only this user may put them there
+    shared = shared_with(info)
+    if shared is not None:
+        raise ModuleCacheError(f"{path} {shared}")
+
+
+def shared_with(info: os.stat_result) -> Optional[str]:
+    "how other users could change the file or directory of info, None when only this user can"
+    if info.st_mode & 0o022:
+        return "is writable by other users"
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        return "belongs to another user"
+    return None
+
+
+def _read_cached(path: str, key: tuple[Any, ...]) -> Optional['RootAST']:
+    import json
+    from ..expressions import RootAST
+    from ..expressions.serialize import TreeFormatError, load_tree
+
+    # a script can write files as well as any other user of the cache, so it holds data only: 
+    # a tree loaded from it is no more than a module source could have said
+    try:
+        with open(path, encoding="utf-8") as file:
+            if json.loads(file.readline()) != list(key):
+                return None
+            ast = load_tree(file.read())
+    except (OSError, ValueError, TreeFormatError):
+        # missing, cut short or written by another version: parsed again
+        return None
+    return ast if isinstance(ast, RootAST) else None
+
+
+def _write_cached(path: str, key: tuple[Any, ...], ast: 'RootAST') -> None:
+    import json
+    import tempfile
+    from ..expressions.serialize import TreeFormatError, dump_tree
+
+    # the cache only saves parsing, a tree that can not be written is simply parsed again next time
+    try:
+        text = dump_tree(ast)
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".module-")
+    except (OSError, TreeFormatError):
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(json.dumps(list(key)) + "\n")
+            file.write(text)
+        os.replace(temporary, path)
+    except OSError:
+        os.unlink(temporary)
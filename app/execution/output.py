@@ -0,0 +1,104 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+import sys
+from typing import Optional, TextIO
+
+
+class Sink(ABC):
+    "where buffered output ends up"
+    @abstractmethod
+    def write(self, text: str) -> None:
+        ...
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class StdoutSink(Sink):
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+
+    def write(self, text: str) -> None:
+        self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class FileSink(Sink):
+    def __init__(self, path: str) -> None:
+        self.stream = open(path, "w")
+
+    def write(self, text: str) -> None:
+        self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+class MemorySink(Sink):
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+
+    def write(self, text: str) -> None:
+        self._parts.append(text)
+
+    def getvalue(self) -> str:
+        return "".join(self._parts)
+
+
+class FlushPolicy(Enum):
+    SIZE = "size"   # once the buffer holds buffer_size characters
+    LINE = "line"   # after every complete line
+    EXIT = "exit"   # only when the program ends or fails
+
+
+class Output:
+    """
+    Buffered program output.
+    Writes collect in a list and reach the sink in one joined write when the flush policy says so.
+    Whoever reports an error on stderr flushes first, so everything the program printed before
+    failing still comes out before the error.
+    """
+    DEFAULT_BUFFER_SIZE = 1 << 16
+
+    def __init__(
+        self,
+        sink: Sink,
+        policy: FlushPolicy = FlushPolicy.SIZE,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> None:
+        self.sink = sink
+        self.policy = policy
+        self.buffer_size = buffer_size
+        self._parts: list[str] = []
+        self._size = 0
+
+    def write(self, text: str) -> None:
+        self._parts.append(text)
+        if self.policy is FlushPolicy.SIZE:
+            self._size += len(text)
+            if self._size >= self.buffer_size:
+                self.flush()
+        elif self.policy is FlushPolicy.LINE and "\n" in text:
+            self.flush()
+
+    def print(self, text: str) -> None:
+        self.write(text + "\n")
+
+    def flush(self) -> None:
+        if self._parts:
+            self.sink.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+        self.sink.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.sink.close()
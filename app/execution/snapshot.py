@@ -0,0 +1,114 @@
+from functools import cache
+import hashlib
+import os
+import sys
+import tempfile
+from typing import Any, Optional
+
+from ..expressions import Rope
+from ..expressions.serialize import TreeFormatError, dump_graph, load_graph, tree_classes
+from ..stdlib import BUILT_IN_FUNCTIONS, LoxArray, LoxMap
+from ..stdlib.maps import FALSE_KEY, TRUE_KEY
+from .execution_context import (
+    ClassBinding, ExecutionContext, ExecutionScope, FunctionScopeBinding, Instance, Shape, Variable
+)
+from .modules import shared_with
+
+
+# bump whenever a change to the nodes or the runtime objects makes older snapshots wrong to restore
+SNAPSHOT_VERSION = 3
+
+
+class SnapshotError(Exception):
+    """
+    the state can not be written as a snapshot, e.g. it holds a native function that is not a builtin,
+    or the snapshot file could have been written by other users
+    """
+
+
+def snapshot_key(prelude: str, optimized: bool) -> str:
+    "what a snapshot must have been taken from to be restored: the prelude's source, the interpreter and its options"
+    digest = hashlib.sha256()
+    for part in (str(SNAPSHOT_VERSION), sys.version, str(optimized), prelude):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def save_snapshot(path: str, key: str, scope: ExecutionScope, output: str, context: ExecutionContext) -> None:
+    """
+    Writes scope, the globals a prelude left behind, with everything reachable from them: values,
+    functions with their closures and syntax trees, classes and instances, along with what the prelude
+    printed and the modules it imported, stamped with the mtime and size of their files.
+    The file is replaced in one rename, a concurrent run reads the old snapshot or the new one.
+    """
+    modules = {module_path: (_stamp(module_path), module) for module_path, module in context.modules.modules.items()}
+    try:
+        text = dump_graph((scope, output, modules), _snapshot_classes(), {
+            id(value): name for name, value in _externals(context).items()
+        })
+    except TreeFormatError as e:
+        raise SnapshotError(str(e)) from e
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            # the key comes first on its own line, a stale snapshot is told apart without loading the state
+            file.write(key + "\n")
+            file.write(text)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load_snapshot(path: str, key: str, context: ExecutionContext) -> Optional[tuple[ExecutionScope, str]]:
+    """
+    The globals and the output of the snapshot at path, bound to context, None if it is missing or
+    stale. The modules the prelude imported count as imported by context's run, they are not run again.
+    Raises SnapshotError for a file other users could have written.
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            # a restored prelude runs with this user's rights, only this user may have written it
+            shared = shared_with(os.fstat(file.fileno()))
+            if shared is not None:
+                raise SnapshotError(f"{path} {shared}")
+            if file.readline() != key + "\n":
+                return None
+            # data only, it can hold no more than a prelude could have left behind
+            scope, output, modules = load_graph(file.read(), _snapshot_classes(), _externals(context))
+        if scope.__class__ is not ExecutionScope or output.__class__ is not str or modules.__class__ is not dict:
+            return None
+        if any(_stamp(module_path) != stamp for module_path, (stamp, _) in modules.items()):
+            return None
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError):
+        # written by another version of the interpreter, or cut short: taken again from the prelude
+        return None
+    context.modules.modules.update((module_path, module) for module_path, (_, module) in modules.items())
+    return scope, output
+
+
+def _externals(context: ExecutionContext) -> dict[str, Any]:
+    # the root scope, the context, the builtins and the map keys of booleans belong to the run restoring the snapshot
+    return {
+        "context": context,
+        "root": context.root_scope,
+        "true key": TRUE_KEY,
+        "false key": FALSE_KEY,
+        **{"native " + function.name: function for function in BUILT_IN_FUNCTIONS},
+    }
+
+
+@cache
+def _snapshot_classes() -> dict[tuple[str, str], type]:
+    "the nodes and tokens of trees, and the runtime values and scopes a prelude leaves behind"
+    runtime = (ExecutionScope, Variable, FunctionScopeBinding, ClassBinding, Shape, Instance, LoxArray, LoxMap, Rope)
+    return {**tree_classes(), **{(cls.__module__, cls.__name__): cls for cls in runtime}}
+
+
+def _stamp(path: str) -> tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
@@ -1,5 +1,6 @@
 from .expressions import *
 from .builtin import *
+from .rope import Rope
 
 __all__ = [
     Expression.__name__,
@@ -29,20 +30,43 @@ __all__ = [
     LessEqualExpression.__name__,
     GreaterExpression.__name__,
     GreaterEqualExpression.__name__,
-    
+
+    NumericNegativeExpression.__name__,
+    NumericPlusExpression.__name__,
+    StringPlusExpression.__name__,
+    NumericMinusExpression.__name__,
+    NumericMultiplyExpression.__name__,
+    NumericDivideExpression.__name__,
+    NumericLessExpression.__name__,
+    NumericLessEqualExpression.__name__,
+    NumericGreaterExpression.__name__,
+    NumericGreaterEqualExpression.__name__,
+    LoopInvariantExpression.__name__,
+    IncrementExpression.__name__,
+
     VarExpression.__name__,
     IdentifierExpression.__name__,
+    ThisExpression.__name__,
     IfExpression.__name__,
     ElseExpression.__name__,
     WhileExpression.__name__,
+    ForExpression.__name__,
     AssignExpression.__name__,
     FunctionDefinitionExpression.__name__,
     FunctionCallExpression.__name__,
+    ClassExpression.__name__,
+    GetExpression.__name__,
+    SuperExpression.__name__,
+    ImportExpression.__name__,
     
     AST.__name__,
     RootAST.__name__,
 
-    define_built_in_function.__name__,    
+    Rope.__name__,
+    stringify.__name__,
+    format_number.__name__,
+    divide.__name__,
+    NativeFunction.__name__,
 ]
 
 
@@ -1,48 +1,19 @@
-import datetime
-from typing import Any, Iterator, Optional, Self, Type, TYPE_CHECKING, Callable
+from typing import Any, Callable
 
-from ..tokens.tokens import NilReservedWord, Token
-from .expressions import FunctionDefinitionExpression, Expression
 
-if TYPE_CHECKING:
-    from ..execution import ExecutionScope
-
-class BuiltInFunctionDefinitionExpression(FunctionDefinitionExpression):
-    name: str
-    parameters: list[str]
-    body: Expression
-    closure: 'ExecutionScope'
-    
-    @classmethod
-    def from_token(
-        cls: Type[Self],
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        token_iter: Iterator['Token']
-    ) -> Self:
-        raise NotImplementedError()
-
-    def __init__(
-        self, 
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        token_iter: Iterator['Token']
-    ) -> None:
-        pass
-
-class ExpressionMixin:
-    __slots__ = ["evaluate"]
-    def __init__(self, callback: Callable[..., Any]):
-        def wrapped_callback(scope: 'ExecutionScope')-> None:
-            scope.function_return_value = (True, callback())
-        self.evaluate = wrapped_callback
-                
-
-def define_built_in_function(name: str, paramters: list[str], callback: Callable[..., Any], root_scope: 'ExecutionScope') -> BuiltInFunctionDefinitionExpression:
-    expression = BuiltInFunctionDefinitionExpression(NilReservedWord(), None, iter([]))
-    expression.name = name
-    expression.parameters = paramters
-    expression.closure = root_scope
-    expression.body = ExpressionMixin(callback)  # type: ignore
+class NativeFunction:
+    """
+    A function implemented in python.
+    Calls check the arity and hand the evaluated arguments straight to the callback, no function
+    scope is created and the result does not travel through `function_return_value`.
+    """
+    __slots__ = ["name", "arity", "callback", "takes_context"]
+    def __init__(self, name: str, arity: int, callback: Callable[..., Any], *, takes_context: bool = False) -> None:
+        self.name = name
+        self.arity = arity
+        self.callback = callback
+        # callbacks touching program state (e.g. its output) get the ExecutionContext as first argument
+        self.takes_context = takes_context
     
-    return expression
+    def __str__(self) -> str:
+        return "<native fn>"
@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
+import math
 from typing import TYPE_CHECKING, Any, Self, Callable, Iterator, Optional, Type, Union, cast
 
 from app.tokens.tokens import CommaSymbol, ReturnReservedWord
-from app.utils.errors import FunctionScopeExpressionError
+from app.utils.errors import FunctionScopeExpressionError, ImportPathError
+
+from .rope import Rope, concat
+from .builtin import NativeFunction
 
 from ..tokens import (
     AndReservedWord, 
@@ -38,6 +42,11 @@ from ..tokens import (
     EOFSymbol, 
     SemicolonSymbol,
     FunReservedWord,
+    ClassReservedWord,
+    ThisReservedWord,
+    SuperReservedWord,
+    DotSymbol,
+    ImportReservedWord,
 )
 from ..utils import (
     MissingScopeExpressionError, 
@@ -47,11 +56,18 @@ from ..utils import (
     NotCallableError, 
     RuntimeError,
     ArgumentsNotMatchError,
+    NotInstanceError,
+    NotInstanceFieldError,
+    UndefinedPropertyError,
+    SuperclassNotClassError,
+    BudgetExceededError,
+    OutOfMemoryError,
+    StackOverflowError,
 )
 
 if TYPE_CHECKING:
     from ..tokens import Token
-    from ..execution import ExecutionScope, Variable, FunctionScopeBinding
+    from ..execution import ExecutionScope, Variable, FunctionScopeBinding, ClassBinding, Instance, Shape
 
 
 def precedence(pre: int) -> Callable[[Type['Expression']], Type['Expression']]:
@@ -208,6 +224,11 @@ class IdentifierExpression(Expression):
     def __str__(self) -> str:
         return f"(Identifier {self.name.lexeme})"
 
+@yield_from(ThisReservedWord)
+class ThisExpression(IdentifierExpression):
+    def __str__(self) -> str:
+        return "this"
+
 class UnaryExpression(Expression, ABC):
     __slots__ = ["operator", "right"]
     operator: 'Token'
@@ -390,10 +411,8 @@ class NumberLiteralExpression(LiteralExpression):
     def __str__(self) -> str:
         return self.value.literal
         
-    def evaluate(self, scope: 'ExecutionScope') -> Union[int, float]:
-        if "." in self.value.lexeme:
-            return float(self.value.lexeme)
-        return int(self.value.lexeme)
+    def evaluate(self, scope: 'ExecutionScope') -> float:
+        return cast(NumberLiteral, self.value).value
 
 @yield_from(FalseReservedWord)
 @yield_from(TrueReservedWord)
@@ -430,10 +449,10 @@ class PlusExpression(BinaryExpression):
     def evaluate(self, scope: 'ExecutionScope') -> Any:        
         left_v = self.left.evaluate(scope)
         right_v = self.right.evaluate(scope)
-        if isinstance(left_v, str) and isinstance(right_v, str):
-            return left_v + right_v
         if _is_number(left_v) and _is_number(right_v):
             return left_v + right_v
+        if _is_string(left_v) and _is_string(right_v):
+            return _concat(scope, left_v, right_v)
         
         if (
             (_is_string(left_v) or _is_number(left_v)) and
@@ -465,10 +484,7 @@ class DivideExpression(BinaryExpression):
         if not _is_number(left_v) or not _is_number(right_v):
             raise NoneNumberOperandError()
         
-        if left_v % right_v:
-            return left_v / right_v
-        else:
-            return left_v // right_v
+        return divide(left_v, right_v)
     
     
 # @precedence(3)
@@ -567,6 +583,8 @@ class GreaterEqualExpression(BinaryExpression):
 @right_associative
 class AssignExpression(BinaryExpression):
     def evaluate(self, scope: 'ExecutionScope') -> None:
+        if isinstance(self.left, GetExpression):
+            return cast(GetExpression, self.left).set_evaluate(scope, self.right)
         assert (
             isinstance(self.left, IdentifierExpression) or 
             isinstance(self.left, VarExpression)
@@ -576,10 +594,134 @@ class AssignExpression(BinaryExpression):
         
         var = left_expr.left_value_evaluate(scope)
         var.set_value(right_v)
-        
+
         return right_v
 
 
+# *********************************************** Specialized ***********************************************
+# Installed by app.optimize.TypeInference on nodes whose operand types are proven statically,
+# the operand checks are skipped since they can never fail.
+class NumericNegativeExpression(NegativeExpression):
+    def evaluate(self, scope: 'ExecutionScope') -> Any:
+        return - self.right.evaluate(scope)
+
+
+class NumericPlusExpression(PlusExpression):
+    def evaluate(self, scope: 'ExecutionScope') -> Any:
+        return self.left.evaluate(scope) + self.right.evaluate(scope)
+
+
+class StringPlusExpression(PlusExpression):
+    def evaluate(self, scope: 'ExecutionScope') -> Any:
+        return _concat(scope, self.left.evaluate(scope), self.right.evaluate(scope))
+
+
+class NumericMinusExpression(MinusExpression):
+    def evaluate(self, scope: 'ExecutionScope') -> Any:
+        return self.left.evaluate(scope) - self.right.evaluate(scope)
+
+
+class NumericMultiplyExpression(MultiplyExpression):
+    def evaluate(self, scope: 'ExecutionScope') -> Any:
+        return self.left.evaluate(scope) * self.right.evaluate(scope)
+
+
+class NumericDivideExpression(DivideExpression):
+    def evaluate(self, scope: 'ExecutionScope') -> Any:
+        return divide(self.left.evaluate(scope), self.right.evaluate(scope))
+
+
+class NumericLessExpression(LessExpression):
+    def evaluate(self, scope: 'ExecutionScope') -> bool:
+        return self.left.evaluate(scope) < self.right.evaluate(scope)
+
+
+class NumericLessEqualExpression(LessEqualExpression):
+    def evaluate(self, scope: 'ExecutionScope') -> bool:
+        return self.left.evaluate(scope) <= self.right.evaluate(scope)
+
+
+class NumericGreaterExpression(GreaterExpression):
+    def evaluate(self, scope: 'ExecutionScope') -> bool:
+        return self.left.evaluate(scope) > self.right.evaluate(scope)
+
+
+class NumericGreaterEqualExpression(GreaterEqualExpression):
+    def evaluate(self, scope: 'ExecutionScope') -> bool:
+        return self.left.evaluate(scope) >= self.right.evaluate(scope)
+
+
+class LoopInvariantExpression(Expression):
+    "Stands in for an expression hoisted out of a loop, the loop evaluates it once on entry"
+    __slots__ = ["expr", "_value"]
+    expr: Expression
+    _value: Any
+
+    def __init__(
+        self,
+        token: 'Token',
+        prev_expr: Optional['Expression'],
+        token_iter: Iterator['Token']
+    ) -> None:
+        assert prev_expr is not None
+        self.expr = prev_expr
+        self._value = None
+
+    @classmethod
+    def from_token(
+        cls: Type[Self],
+        token: 'Token',
+        prev_expr: Optional['Expression'],
+        token_iter: Iterator['Token']
+    ) -> Self:
+        return cls(token, prev_expr, token_iter)
+
+    def __str__(self) -> str:
+        return str(self.expr)
+
+    def hoist(self, scope: 'ExecutionScope') -> None:
+        self._value = self.expr.evaluate(scope)
+
+    def evaluate(self, scope: 'ExecutionScope') -> Any:
+        return self._value
+
+
+class IncrementExpression(Expression):
+    "`i = i + c` on a proven number with a literal step, updated in place with a single lookup"
+    __slots__ = ["assignment", "_name", "_amount"]
+    assignment: AssignExpression
+    _name: str
+    _amount: Union[int, float]
+
+    def __init__(
+        self,
+        token: 'Token',
+        prev_expr: Optional['Expression'],
+        token_iter: Iterator['Token']
+    ) -> None:
+        assert isinstance(prev_expr, AssignExpression) and isinstance(prev_expr.left, IdentifierExpression)
+        self.assignment = prev_expr
+        self._name = prev_expr.left.name.lexeme
+        self._amount = 0
+
+    @classmethod
+    def from_token(
+        cls: Type[Self],
+        token: 'Token',
+        prev_expr: Optional['Expression'],
+        token_iter: Iterator['Token']
+    ) -> Self:
+        return cls(token, prev_expr, token_iter)
+
+    def __str__(self) -> str:
+        return str(self.assignment)
+
+    def evaluate(self, scope: 'ExecutionScope') -> Any:
+        var = scope.fetch_variable(self._name)
+        var.set_value(var.value + self._amount)
+        return var.value
+
+
 # *********************************************** Statement ***********************************************
 @yield_from(PrintReservedWord)
 class PrintExpression(StatementExpression):
@@ -600,13 +742,7 @@ class PrintExpression(StatementExpression):
         return f"(print {self.body})"
     
     def evaluate(self, scope: 'ExecutionScope') -> Any:
-        value = self.body.evaluate(scope)
-        if isinstance(value, bool):
-            print(str(value).lower())
-        elif value is None:
-            print("nil")
-        else:
-            print(value)
+        scope.context.output.print(stringify(self.body.evaluate(scope)))
 
 
 @yield_from(VarReservedWord)
@@ -717,9 +853,10 @@ class ElseExpression(StatementExpression):
 
 @yield_from(WhileReservedWord)
 class WhileExpression(StatementExpression):
-    __slots__ = ["predicates", "expression"]
+    __slots__ = ["predicates", "expression", "invariants"]
     predicates: Expression
     expression: Expression
+    invariants: list['LoopInvariantExpression']
     
     def __init__(
         self, 
@@ -728,6 +865,7 @@ class WhileExpression(StatementExpression):
         token_iter: Iterator['Token']
     ) -> None:
         assert isinstance(token, WhileReservedWord)
+        self.invariants = []
         
         token = next(token_iter)
         assert isinstance(token, LeftParenthesisSymbol)
@@ -743,19 +881,25 @@ class WhileExpression(StatementExpression):
         return f"while {self.predicates} \n {self.expression}"
     
     def evaluate(self, scope: 'ExecutionScope') -> Any:
+        for invariant in self.invariants:
+            invariant.hoist(scope)
+        budget = scope.context.budget
         while _is_truthy(self.predicates.evaluate(scope)):
             if scope.function_return_value[0]:
                 break
+            if budget is not None:
+                budget.tick()
             self.expression.evaluate(scope)
             
 
 @yield_from(ForReservedWord)
 class ForExpression(StatementExpression):
-    __slots__ = ["initialization", "predicates", "step", "expression"]
+    __slots__ = ["initialization", "predicates", "step", "expression", "invariants"]
     initialization: Expression
     step: Expression
     predicates: Expression
     expression: Expression
+    invariants: list['LoopInvariantExpression']
     
     def __init__(
         self, 
@@ -764,6 +908,7 @@ class ForExpression(StatementExpression):
         token_iter: Iterator['Token']
     ) -> None:
         assert isinstance(token, ForReservedWord)
+        self.invariants = []
         
         token = next(token_iter)
         assert isinstance(token, LeftParenthesisSymbol)
@@ -790,11 +935,16 @@ class ForExpression(StatementExpression):
     
     def evaluate(self, scope: 'ExecutionScope') -> Any:
         self.initialization.evaluate(scope)
+        for invariant in self.invariants:
+            invariant.hoist(scope)
+        budget = scope.context.budget
         while True:
             if not _is_truthy(self.predicates.evaluate(scope)):
                 break
             if scope.function_return_value[0]:
                 break
+            if budget is not None:
+                budget.tick()
             
             self.expression.evaluate(scope)
             self.step.evaluate(scope)
@@ -807,6 +957,7 @@ class FunctionDefinitionExpression(StatementExpression):
     name: str
     parameters: list[str]
     body: Expression
+    initializer: bool = False  # set on a class's `init` method, calling it always returns `this`
     
     def __init__(
         self, 
@@ -814,8 +965,9 @@ class FunctionDefinitionExpression(StatementExpression):
         prev_expr: Optional['Expression'], 
         token_iter: Iterator['Token']
     ) -> None:
-        assert isinstance(token, FunReservedWord)
-        token = next(token_iter)
+        # methods are declared without the `fun` keyword
+        if isinstance(token, FunReservedWord):
+            token = next(token_iter)
         assert isinstance(token, Identifier)
         self.name = token.lexeme
         
@@ -851,6 +1003,64 @@ class FunctionDefinitionExpression(StatementExpression):
         var.set_function_value(self, scope.create_child_scope())
 
 
+@yield_from(ClassReservedWord)
+class ClassExpression(StatementExpression):
+    __slots__ = ["name", "superclass", "methods"]
+    name: str
+    superclass: Optional[IdentifierExpression]
+    methods: list[FunctionDefinitionExpression]
+    
+    def __init__(
+        self, 
+        token: 'Token', 
+        prev_expr: Optional['Expression'], 
+        token_iter: Iterator['Token']
+    ) -> None:
+        assert isinstance(token, ClassReservedWord)
+        token = next(token_iter)
+        if not isinstance(token, Identifier):
+            raise MissingExpressionError(token)
+        self.name = token.lexeme
+        
+        self.superclass = None
+        token = next(token_iter)
+        if isinstance(token, LessSymbol):
+            token = next(token_iter)
+            if not isinstance(token, Identifier):
+                raise MissingExpressionError(token)
+            self.superclass = IdentifierExpression(token, None, token_iter)
+            token = next(token_iter)
+        
+        if not isinstance(token, LeftBraceSymbol):
+            raise MissingExpressionError(token)
+        self.methods = []
+        for token in token_iter:
+            if isinstance(token, RightBraceSymbol):
+                return
+            if not isinstance(token, Identifier):
+                raise MissingExpressionError(token)
+            method = FunctionDefinitionExpression(token, None, token_iter)
+            method.initializer = method.name == "init"
+            self.methods.append(method)
+        
+        raise MissingScopeExpressionError()
+
+    def __str__(self) -> str:
+        return f"<class {self.name}>"
+    
+    def evaluate(self, scope: 'ExecutionScope') -> Any:
+        superclass: Optional['ClassBinding'] = None
+        if self.superclass is not None:
+            superclass = self.superclass.evaluate(scope)
+            if superclass.__class__.__name__ != 'ClassBinding':
+                raise SuperclassNotClassError()
+        
+        closure = scope.create_child_scope()
+        if superclass is not None:
+            closure.create_variable("super").set_value(superclass)  # type: ignore
+        scope.create_variable(self.name).set_class_value(self.name, superclass, self.methods, closure)
+
+
 @yield_from(ReturnReservedWord)
 class ReturnExpression(StatementExpression):
     __slots__= ["body"]
@@ -873,6 +1083,39 @@ class ReturnExpression(StatementExpression):
         value = self.body.evaluate(scope)
         scope.function_return_value = (True, value)
 
+
+@yield_from(ImportReservedWord)
+class ImportExpression(StatementExpression):
+    "`import \"path\";` runs the module once per program run and binds its top level variables here"
+    __slots__ = ["value"]
+    value: StringLiteral
+    
+    def __init__(
+        self, 
+        token: 'Token', 
+        prev_expr: Optional['Expression'], 
+        token_iter: Iterator['Token']
+    ) -> None:
+        assert isinstance(token, ImportReservedWord)
+        
+        token = next(token_iter)
+        if not isinstance(token, StringLiteral):
+            raise ImportPathError(token)
+        self.value = token
+        token = next(token_iter)
+        if not isinstance(token, SemicolonSymbol):
+            raise MissingExpressionError(token)
+    
+    @property
+    def path(self) -> str:
+        return self.value.literal
+    
+    def __str__(self) -> str:
+        return f"(import {self.value.lexeme})"
+    
+    def evaluate(self, scope: 'ExecutionScope') -> None:
+        scope.import_variables(scope.context.modules.load(self.path, scope))
+
     
 # *********************************************** AST ***********************************************
 
@@ -948,6 +1191,179 @@ class RootAST(AST):
         
         raise MissingScopeExpressionError()
 
+    def evaluate_in(self, scope: 'ExecutionScope') -> None:
+        "runs the program with scope as its globals instead of a new child scope, e.g. after a prelude"
+        for child in self.children:
+            child.evaluate(scope)
+            if scope.function_return_value[0]:
+                return
+
+
+# *********************************************** Property ***********************************************
+@yield_from(DotSymbol)
+class GetExpression(Expression):
+    """
+    `owner.name`, both the property read and, as the left side of an assignment, the field write.
+    Each node keeps a monomorphic inline cache keyed by the last shape it saw: a hit reads the field
+    slot (or the method) directly, a write hit also knows the shape transition to take.
+    """
+    __slots__ = ["owner", "name", "_cached_shape", "_cached_index", "_cached_method", "_cached_transition"]
+    owner: Expression
+    name: str
+    _cached_shape: Optional['Shape']
+    _cached_index: int
+    _cached_method: Optional['FunctionScopeBinding']
+    _cached_transition: Optional['Shape']
+    
+    def __init__(
+        self, 
+        token: 'Token', 
+        prev_expr: Optional['Expression'], 
+        token_iter: Iterator['Token']
+    ) -> None:
+        assert isinstance(token, DotSymbol)
+        if prev_expr is None:
+            raise MissingExpressionError(token)
+        self.owner = prev_expr
+        
+        token = next(token_iter)
+        if not isinstance(token, Identifier):
+            raise MissingExpressionError(token)
+        self.name = token.lexeme
+        
+        self._cached_shape = None
+        self._cached_index = -1
+        self._cached_method = None
+        self._cached_transition = None
+    
+    @classmethod
+    def from_token(
+        cls: Type[Self],
+        token: 'Token', 
+        prev_expr: Optional['Expression'], 
+        token_iter: Iterator['Token']
+    ) -> 'Expression':
+        # property access binds tighter than any operator, it applies to the rightmost operand
+        current_expr = prev_expr
+        parent_expr = None
+        while isinstance(current_expr, BinaryExpression) or isinstance(current_expr, UnaryExpression):
+            parent_expr = current_expr
+            current_expr = current_expr.right
+        
+        if parent_expr:
+            parent_expr.right = cls(token, current_expr, token_iter)
+            return prev_expr # type: ignore
+        return cls(token, prev_expr, token_iter)
+    
+    def __str__(self) -> str:
+        return f"(. {self.owner} {self.name})"
+    
+    def evaluate(self, scope: 'ExecutionScope') -> Any:
+        instance: 'Instance' = self.owner.evaluate(scope)
+        try:
+            shape = instance.shape
+        except AttributeError:
+            raise NotInstanceError()
+        
+        if shape is not self._cached_shape:
+            self._resolve(shape)
+        if self._cached_method is None:
+            return instance.fields[self._cached_index]
+        return instance.bind(self._cached_method)
+    
+    def method_evaluate(self, scope: 'ExecutionScope') -> tuple[Optional['Instance'], Any]:
+        "(instance, method) for a method, (None, value) for a field, saves binding a method just to call it"
+        instance: 'Instance' = self.owner.evaluate(scope)
+        try:
+            shape = instance.shape
+        except AttributeError:
+            raise NotInstanceError()
+        
+        if shape is not self._cached_shape:
+            self._resolve(shape)
+        if self._cached_method is None:
+            return None, instance.fields[self._cached_index]
+        return instance, self._cached_method
+    
+    def set_evaluate(self, scope: 'ExecutionScope', value_expr: Expression) -> Any:
+        instance: 'Instance' = self.owner.evaluate(scope)
+        if not hasattr(instance, "shape"):
+            raise NotInstanceFieldError()
+        value = value_expr.evaluate(scope)
+        
+        shape = instance.shape
+        if shape is not self._cached_shape:
+            index = shape.slots.get(self.name)
+            self._cached_shape = shape
+            self._cached_method = None
+            if index is None:
+                self._cached_index = -1
+                self._cached_transition = shape.with_field(self.name)
+            else:
+                self._cached_index = index
+                self._cached_transition = None
+        
+        if self._cached_transition is None:
+            instance.fields[self._cached_index] = value
+        else:
+            instance.fields.append(value)
+            instance.shape = self._cached_transition
+        return value
+    
+    def _resolve(self, shape: 'Shape') -> None:
+        index = shape.slots.get(self.name)
+        if index is not None:
+            # fields shadow methods
+            self._cached_index, self._cached_method = index, None
+        else:
+            method = shape.klass.methods.get(self.name)
+            if method is None:
+                raise UndefinedPropertyError(self.name)
+            self._cached_index, self._cached_method = -1, method
+        self._cached_shape = shape
+        self._cached_transition = None
+
+
+@yield_from(SuperReservedWord)
+class SuperExpression(Expression):
+    __slots__ = ["method"]
+    method: str
+    
+    def __init__(
+        self, 
+        token: 'Token', 
+        prev_expr: Optional['Expression'], 
+        token_iter: Iterator['Token']
+    ) -> None:
+        assert isinstance(token, SuperReservedWord)
+        token = next(token_iter)
+        if not isinstance(token, DotSymbol):
+            raise MissingExpressionError(token)
+        token = next(token_iter)
+        if not isinstance(token, Identifier):
+            raise MissingExpressionError(token)
+        self.method = token.lexeme
+    
+    @classmethod
+    def from_token(
+        cls: Type[Self],
+        token: 'Token', 
+        prev_expr: Optional['Expression'], 
+        token_iter: Iterator['Token']
+    ) -> Self:
+        return cls(token, prev_expr, token_iter)
+    
+    def __str__(self) -> str:
+        return f"(super {self.method})"
+    
+    def evaluate(self, scope: 'ExecutionScope') -> Any:
+        superclass: 'ClassBinding' = scope.fetch_variable("super").value  # type: ignore
+        instance: 'Instance' = scope.fetch_variable("this").value  # type: ignore
+        method = superclass.methods.get(self.method)
+        if method is None:
+            raise UndefinedPropertyError(self.method)
+        return instance.bind(method)
+
 
 # *********************************************** Call ***********************************************
 class FunctionCallExpression(Expression):
@@ -996,36 +1412,121 @@ class FunctionCallExpression(Expression):
         return f"{self.identifier} ({','.join(str(p) for p in self.call_parameters)})"
     
     def evaluate(self, scope: 'ExecutionScope') -> None:
-        v:'FunctionScopeBinding' = self.identifier.evaluate(scope)  # type: ignore
-        if v.__class__.__name__ != 'FunctionScopeBinding':
-            raise NotCallableError()
-        funcdef, closure = v.funcdef, v.closure
+        instance: Optional['Instance'] = None
+        if isinstance(self.identifier, GetExpression):
+            instance, v = cast(GetExpression, self.identifier).method_evaluate(scope)
+        else:
+            v = self.identifier.evaluate(scope)  # type: ignore
         
+        if v.__class__ is NativeFunction:
+            if v.arity != len(self.call_parameters):
+                raise ArgumentsNotMatchError(v.arity, len(self.call_parameters))
+            arguments = [param.evaluate(scope) for param in self.call_parameters]
+            try:
+                if v.takes_context:
+                    return v.callback(scope.context, *arguments)
+                return v.callback(*arguments)
+            except MemoryError:
+                raise OutOfMemoryError(v.name)
+        if v.__class__.__name__ == 'FunctionScopeBinding':
+            return self._call(scope, v, instance)
+        if v.__class__.__name__ == 'ClassBinding':
+            klass = cast('ClassBinding', v)
+            instance = klass.instantiate()
+            initializer = klass.methods.get("init")
+            if initializer is not None:
+                self._call(scope, initializer, instance)
+            elif self.call_parameters:
+                raise ArgumentsNotMatchError(0, len(self.call_parameters))
+            return instance
+        raise NotCallableError()
+    
+    def _call(self, scope: 'ExecutionScope', v: 'FunctionScopeBinding', instance: Optional['Instance']) -> Any:
+        funcdef = v.funcdef
         if len(funcdef.parameters) != len(self.call_parameters):
             raise ArgumentsNotMatchError(len(funcdef.parameters), len(self.call_parameters))
         
-        func_scope = closure.clone()
+        func_scope = v.closure.clone() if instance is None else instance.method_scope(v)
         for i in range(len(funcdef.parameters)):
             var = func_scope.create_variable(funcdef.parameters[i])
             var.set_value(self.call_parameters[i].evaluate(scope))
         
-        funcdef.body.evaluate(func_scope)
+        budget = scope.context.budget
+        try:
+            if budget is None:
+                funcdef.body.evaluate(func_scope)
+            else:
+                budget.enter_call()
+                try:
+                    funcdef.body.evaluate(func_scope)
+                finally:
+                    budget.depth -= 1
+        except RecursionError:
+            # whatever --max-depth says, python's stack is the last limit on nested calls
+            if budget is None:
+                raise StackOverflowError()
+            raise BudgetExceededError("depth", "calls nested deeper than the interpreter's stack allows")
+        if funcdef.initializer:
+            return func_scope.fetch_variable("this").value
         return func_scope.function_return_value[1]
 
 
 # *********************************************** Util ***********************************************
 
 def _is_number(obj: Any):
-    return obj.__class__ == int or obj.__class__ == float
+    return obj.__class__ == float
 
 def _is_string(obj: Any):
-    return obj.__class__ == str
+    return obj.__class__ == str or obj.__class__ == Rope
 
 def _is_truthy(value: Any):
     if value is None or value is False:
         return False
     return True
 
+def _concat(scope: 'ExecutionScope', left_v: Union[str, Rope], right_v: Union[str, Rope]) -> Union[str, Rope]:
+    value = concat(left_v, right_v)
+    budget = scope.context.budget
+    if budget is not None:
+        budget.check_string(len(value))
+    return value
+
+def divide(left_v: float, right_v: float) -> float:
+    try:
+        return left_v / right_v
+    except ZeroDivisionError:
+        # IEEE 754 semantics like every other Lox implementation, python refuses to divide by zero
+        if left_v == 0 or left_v != left_v:
+            return math.nan
+        return math.copysign(math.inf, left_v) * math.copysign(1.0, right_v)
+
+def format_number(value: float) -> str:
+    "Lox prints integral numbers without a fractional part"
+    if value.is_integer() and -1e16 < value < 1e16:
+        # past 1e16 the digits int() spells out are binary noise, repr rounds them off
+        if value == 0 and math.copysign(1.0, value) < 0:
+            # int() drops the sign of negative zero
+            return "-0"
+        return str(int(value))
+    if value != value:
+        return "NaN"
+    if value == math.inf:
+        return "Infinity"
+    if value == -math.inf:
+        return "-Infinity"
+    return repr(value)
+
+def stringify(value: Any) -> str:
+    if value.__class__ == float:
+        return format_number(value)
+    if value is None:
+        return "nil"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return str(value)
+
 @yield_from(MinusSymbol)
 class MinusNegativeExpressionRouter(Expression, ABC):
     @staticmethod
@@ -1056,6 +1557,8 @@ class GroupFunctionCallExpressionRouter(Expression, ABC):
         if (
             isinstance(current_expr, IdentifierExpression) or 
             isinstance(current_expr, FunctionCallExpression) or
+            isinstance(current_expr, GetExpression) or
+            isinstance(current_expr, SuperExpression) or
             (isinstance(current_expr, LiteralExpression) and not isinstance(current_expr, NilLiteralExpression))or
             isinstance(current_expr, GroupExpression)
         ):
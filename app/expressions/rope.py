@@ -0,0 +1,73 @@
+from typing import Any, Union
+
+
+class Rope:
+    """
+    A Lox string produced by concatenation.
+    Appending to the newest rope of a buffer pushes onto the shared parts list, so building a string
+    in a loop is amortized O(1) per piece. Older ropes keep seeing only their own prefix of the buffer.
+    The text is joined lazily, the first time it is printed, compared or hashed.
+    """
+    __slots__ = ["_parts", "_count", "_length", "_flat"]
+    _parts: list[str]
+    _count: int
+    _length: int
+    _flat: Union[str, None]
+
+    # below this size plain python concatenation is cheaper than keeping a rope
+    FLAT_THRESHOLD = 256
+
+    def __init__(self, parts: list[str], count: int, length: int) -> None:
+        self._parts = parts
+        self._count = count
+        self._length = length
+        self._flat = None
+
+    def append(self, piece: str) -> 'Rope':
+        parts = self._parts
+        if len(parts) != self._count:
+            # someone already appended to this rope, continue on a private copy of our prefix
+            parts = parts[:self._count]
+        parts.append(piece)
+        return Rope(parts, self._count + 1, self._length + len(piece))
+
+    def flatten(self) -> str:
+        if self._flat is None:
+            self._flat = "".join(self._parts[:self._count]) if len(self._parts) != self._count else "".join(self._parts)
+        return self._flat
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        return self.flatten()
+
+    def __repr__(self) -> str:
+        return repr(self.flatten())
+
+    def __eq__(self, value: object) -> bool:
+        if value.__class__ is Rope:
+            return self._length == len(value) and self.flatten() == value.flatten()  # type: ignore
+        if value.__class__ is str:
+            return self._length == len(value) and self.flatten() == value  # type: ignore
+        return False
+
+    def __hash__(self) -> int:
+        return hash(self.flatten())
+
+    def __add__(self, value: Any) -> Union[str, 'Rope']:
+        return concat(self, value)
+
+    def __radd__(self, value: Any) -> Union[str, 'Rope']:
+        return concat(value, self)
+
+
+def concat(left: Union[str, Rope], right: Union[str, Rope]) -> Union[str, Rope]:
+    if left.__class__ is Rope:
+        return left.append(right if right.__class__ is str else right.flatten())  # type: ignore
+    if right.__class__ is Rope:
+        right = right.flatten()  # type: ignore
+
+    if len(left) + len(right) < Rope.FLAT_THRESHOLD:
+        return left + right  # type: ignore
+    return Rope([left, right], 2, len(left) + len(right))  # type: ignore
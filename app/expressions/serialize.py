@@ -0,0 +1,185 @@
+from array import array
+from functools import cache
+from typing import Any, Optional
+
+from ..tokens import Token
+from .expressions import Expression
+
+
+class TreeFormatError(ValueError):
+    "the text is not a tree written by dump_tree or dump_graph, or names a class it may not hold"
+
+
+# trees only ever hold the nodes and tokens of these modules, never the classes instruments derive from them
+_TREE_MODULES = ("app.expressions.expressions", "app.tokens.tokens")
+
+
+def dump_tree(tree: Expression) -> str:
+    """
+    The tree as JSON, data only: loading it back can only create nodes and tokens and fill their
+    slots with numbers, strings, lists and other nodes, unlike a pickle which may call anything.
+    Nodes shared by several parents are written once and stay shared.
+    Raises TreeFormatError for a tree holding anything else, e.g. the runtime caches of a tree that ran.
+    """
+    return dump_graph(tree, tree_classes())
+
+
+def load_tree(text: str) -> Expression:
+    "the tree dump_tree wrote as text, TreeFormatError when text is anything else"
+    root = load_graph(text, tree_classes())
+    if not isinstance(root, Expression):
+        raise TreeFormatError("the root is not a node")
+    return root
+
+
+def dump_graph(root: Any, classes: dict[tuple[str, str], type], externals: Optional[dict[int, str]] = None) -> str:
+    """
+    root and everything it reaches as JSON, like dump_tree for objects of any of classes, keyed by
+    module and name, and packed arrays of numbers. The objects externals names by id are written as
+    their name only, the run loading the text has its own.
+    """
+    import json
+
+    # each class once with the names of its slots, each object as its class and its slot values in that order
+    class_list: list[Any] = []
+    class_index: dict[type, int] = {}
+    objects: list[Any] = []
+    index: dict[int, int] = {}
+    external = externals or {}
+
+    def encode(value: Any) -> Any:
+        if value is None or value.__class__ in (bool, int, float, str):
+            return value
+        if value.__class__ is list or value.__class__ is tuple:
+            return ["L" if value.__class__ is list else "T", *(encode(item) for item in value)]
+        if value.__class__ is dict:
+            return ["D", *([encode(key), encode(item)] for key, item in value.items())]
+        name = external.get(id(value))
+        if name is not None:
+            return ["X", name]
+        cls = value.__class__
+        if cls is array and value.typecode == "d":
+            return ["A", *value]
+        if classes.get((cls.__module__, cls.__name__)) is cls:
+            position = index.get(id(value))
+            if position is not None:
+                return ["O", position]
+            if cls not in class_index:
+                class_index[cls] = len(class_list)
+                class_list.append([cls.__module__, cls.__name__, list(_slot_descriptors(cls))])
+            position = index[id(value)] = len(objects)
+            record: list[Any] = [class_index[cls], 0]
+            objects.append(record)
+            attributes = getattr(value, "__dict__", None)
+            if attributes:
+                record[1] = {name: encode(item) for name, item in attributes.items()}
+            for descriptor in _slot_descriptors(cls).values():
+                try:
+                    item = descriptor.__get__(value)
+                except AttributeError:
+                    # a slot never set, e.g. the line of a token the parser made up
+                    record.append(_UNSET)
+                else:
+                    record.append(encode(item))
+            return ["O", position]
+        raise TreeFormatError(f"can not write a {cls.__name__}")
+
+    try:
+        encoded = encode(root)
+    except RecursionError:
+        raise TreeFormatError("the tree is too deep to write")
+    return json.dumps({"classes": class_list, "objects": objects, "root": encoded}, separators=(",", ":"))
+
+
+def load_graph(text: str, classes: dict[tuple[str, str], type], externals: Optional[dict[str, Any]] = None) -> Any:
+    "what dump_graph wrote as text with the same classes, TreeFormatError when text is anything else"
+    import json
+
+    external = externals or {}
+    try:
+        data = json.loads(text)
+        found = []
+        for module, name, slots in data["classes"]:
+            cls = classes.get((module, name))
+            if cls is None:
+                raise TreeFormatError(f"{module}.{name} is not a class a tree may hold")
+            descriptors = _slot_descriptors(cls)
+            if list(descriptors) != slots:
+                raise TreeFormatError(f"{name} has other slots than when the tree was written")
+            found.append((cls, list(descriptors.values())))
+        records = data["objects"]
+        objects = [found[record[0]][0].__new__(found[record[0]][0]) for record in records]
+        # dicts are filled once every object is, a key may hash by what its slots hold
+        dicts: list[tuple[dict[Any, Any], list[Any]]] = []
+
+        def decode(value: Any) -> Any:
+            if value.__class__ is not list:
+                if value is None or value.__class__ in (bool, int, float, str):
+                    return value
+                raise TreeFormatError(f"unexpected {value.__class__.__name__}")
+            tag = value[0]
+            if tag == "O" and len(value) == 2 and value[1].__class__ is int:
+                return objects[value[1]]
+            if tag == "L":
+                return [decode(item) for item in value[1:]]
+            if tag == "T":
+                return tuple(decode(item) for item in value[1:])
+            if tag == "D":
+                result: dict[Any, Any] = {}
+                dicts.append((result, value[1:]))
+                return result
+            if tag == "A":
+                return array("d", value[1:])
+            if tag == "X" and len(value) == 2 and value[1] in external:
+                return external[value[1]]
+            raise TreeFormatError(f"unexpected tag {tag!r}")
+
+        for obj, record in zip(objects, records):
+            descriptors = found[record[0]][1]
+            if len(record) != len(descriptors) + 2:
+                raise TreeFormatError(f"{obj.__class__.__name__} has {len(descriptors)} slots")
+            for descriptor, value in zip(descriptors, record[2:]):
+                if value != _UNSET:
+                    descriptor.__set__(obj, decode(value))
+            if record[1]:
+                obj.__dict__.update((str(name), decode(value)) for name, value in record[1].items())
+        root = decode(data["root"])
+        filled = 0
+        while filled < len(dicts):
+            result, items = dicts[filled]
+            result.update((decode(key), decode(item)) for key, item in items)
+            filled += 1
+    except TreeFormatError:
+        raise
+    except (ValueError, TypeError, KeyError, IndexError, AttributeError, RecursionError) as e:
+        raise TreeFormatError(str(e) or e.__class__.__name__) from e
+    return root
+
+
+# marks a slot without a value, no other value is encoded as this list
+_UNSET = ["U"]
+
+
+@cache
+def _slot_descriptors(cls: type) -> dict[str, Any]:
+    # through the descriptors themselves, many classes shadow a slot with a class attribute or a property
+    descriptors = {}
+    for klass in reversed(cls.__mro__):
+        declared = klass.__dict__.get("__slots__", ())
+        for name in (declared, ) if isinstance(declared, str) else declared:
+            if name not in ("__dict__", "__weakref__"):
+                descriptors[name] = klass.__dict__[name]
+    return descriptors
+
+
+@cache
+def tree_classes() -> dict[tuple[str, str], type]:
+    "every node and token class, found once all of them are defined"
+    classes: dict[tuple[str, str], type] = {}
+    pending: list[type] = [Expression, Token]
+    while pending:
+        cls = pending.pop()
+        if cls.__module__ in _TREE_MODULES:
+            classes[(cls.__module__, cls.__name__)] = cls
+        pending.extend(cls.__subclasses__())
+    return classes
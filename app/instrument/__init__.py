@@ -0,0 +1,28 @@
+from .class_swap import ClassSwap
+from .coverage import Coverage, load_reports, merge_reports, format_summary, to_lcov
+from .metrics import RuntimeMetrics
+from .node_counter import NodeCounter
+from .profiler import Profiler, NodeStats, LineStats, format_report, report_json
+from .sampler import SamplingProfiler
+from .timings import Timings, Phase, TimedTokenizer
+
+
+__all__ = [
+    ClassSwap.__name__,
+    Coverage.__name__,
+    load_reports.__name__,
+    merge_reports.__name__,
+    format_summary.__name__,
+    to_lcov.__name__,
+    RuntimeMetrics.__name__,
+    NodeCounter.__name__,
+    Profiler.__name__,
+    NodeStats.__name__,
+    LineStats.__name__,
+    format_report.__name__,
+    report_json.__name__,
+    SamplingProfiler.__name__,
+    Timings.__name__,
+    Phase.__name__,
+    TimedTokenizer.__name__,
+]
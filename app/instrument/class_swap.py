@@ -0,0 +1,62 @@
+from typing import Any, Callable, Type
+
+from ..expressions import Expression
+from ..optimize import walk
+
+
+Evaluate = Callable[[Expression, Any], Any]
+
+
+class ClassSwap:
+    """
+    Instruments a tree by swapping the class of each of its nodes for a subclass whose evaluate is
+    wrapped, the same trick the type inference uses to specialize nodes.
+    Nodes of trees it was not installed on keep their plain classes, so an instrument costs nothing
+    unless it is asked for, and uninstall puts every class back.
+    """
+    def __init__(self, prefix: str, wrap: Callable[[Evaluate], Evaluate]) -> None:
+        self.prefix = prefix
+        self.wrap = wrap
+        self._subclasses: dict[Type[Expression], Type[Expression]] = {}
+        self._originals: dict[Type[Expression], Type[Expression]] = {}
+        self._swapped: list[tuple[Expression, Type[Expression]]] = []
+
+    def subclass(self, cls: Type[Expression]) -> Type[Expression]:
+        subclass = self._subclasses.get(cls)
+        if subclass is None:
+            # no new slots, so the instance layout stays compatible with the original class
+            subclass = cls.__class__(
+                f"{self.prefix}{cls.__name__}",
+                (cls, ),
+                {"__slots__": (), "evaluate": self.wrap(cls.evaluate), "_instrumented": True},
+            )
+            self._subclasses[cls] = subclass
+            self._originals[subclass] = cls
+        return subclass
+
+    def install(self, ast: Expression) -> None:
+        instrumented = set(self._subclasses.values())
+        for node in walk(ast):
+            if node.__class__ not in instrumented:
+                self.swap(node)
+
+    def swap(self, node: Expression) -> None:
+        "instruments a single node, leaving its children as they are"
+        self._swapped.append((node, node.__class__))
+        node.__class__ = self.subclass(node.__class__)
+
+    def unswap(self, node: Expression) -> None:
+        "puts the class of a node back before uninstall, unless another instrument swapped it since"
+        cls = self._originals.get(node.__class__)
+        if cls is not None:
+            node.__class__ = cls
+
+    def uninstall(self) -> None:
+        for node, cls in reversed(self._swapped):
+            node.__class__ = cls
+        self._swapped.clear()
+
+
+def plain_class(cls: Type[Expression]) -> Type[Expression]:
+    "the class a node has without instruments, whichever of them are installed on it"
+    return next(klass for klass in cls.__mro__ if "_instrumented" not in klass.__dict__)
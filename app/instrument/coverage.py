@@ -0,0 +1,186 @@
+import json
+import os
+from typing import Any, Iterator, Optional
+
+from ..expressions import (
+    Expression,
+    AST,
+    IfExpression,
+    ElseExpression,
+    WhileExpression,
+    ForExpression,
+    FunctionDefinitionExpression,
+    ClassExpression,
+    AndExpression,
+    OrExpression,
+)
+from ..optimize import walk
+from .class_swap import ClassSwap, Evaluate
+from .profiler import source_lines
+
+
+FORMAT_VERSION = 1
+
+# statements grouping others, they run whenever their block does and keep no token of their own,
+# so their line would be borrowed from their first child
+_GROUPING = (AST, ElseExpression, FunctionDefinitionExpression, ClassExpression)
+
+
+class Coverage:
+    """
+    Statement and branch coverage for `run --coverage`, one byte per probed node in a bitmap.
+    Statements are the children of blocks, branch arms the bodies of if, else, while and for and
+    the right operands of and / or. Each probe is one-shot: its first evaluate sets its byte and
+    puts the node's class back, so covered code runs uninstrumented from then on.
+    """
+    def __init__(self) -> None:
+        self.bitmap = bytearray()
+        self._indices: dict[int, int] = {}
+        # (probe index, line) of every statement, (line of the branching node, probe index) of every arm
+        self._statements: list[tuple[int, Optional[int]]] = []
+        self._arms: list[tuple[Optional[int], int]] = []
+        self._swap = ClassSwap("Covered", self._wrap)
+
+    def install(self, ast: Expression) -> None:
+        "probes a program, or a top level statement of `run --stream`"
+        lines = source_lines(ast)
+        statements = [ast]
+        for node in walk(ast):
+            if isinstance(node, AST):
+                statements += node.children
+            for arm in _arms(node):
+                self._arms.append((lines.get(id(node)), self._probe(arm)))
+        for statement in statements:
+            if not isinstance(statement, _GROUPING):
+                self._statements.append((self._probe(statement), lines.get(id(statement))))
+
+    def uninstall(self) -> None:
+        self._swap.uninstall()
+
+    def to_json(self, file: str) -> dict[str, Any]:
+        "the coverage of one run of file, merge_reports adds up the reports of many runs"
+        lines: dict[str, int] = {}
+        for index, line in self._statements:
+            if line is not None:
+                lines[str(line)] = max(lines.get(str(line), 0), self.bitmap[index])
+        branches: dict[str, list[int]] = {}
+        for line, index in self._arms:
+            if line is not None:
+                branches.setdefault(str(line), []).append(self.bitmap[index])
+        return {
+            "version": FORMAT_VERSION,
+            "runs": 1,
+            "files": {os.path.abspath(file): {"lines": lines, "branches": branches}},
+        }
+
+    def _probe(self, node: Expression) -> int:
+        index = self._indices.get(id(node))
+        if index is None:
+            index = self._indices[id(node)] = len(self.bitmap)
+            self.bitmap.append(0)
+            self._swap.swap(node)
+        return index
+
+    def _wrap(self, evaluate: Evaluate) -> Evaluate:
+        bitmap = self.bitmap
+        indices = self._indices
+        unswap = self._swap.unswap
+
+        def probe(node: Expression, scope: Any) -> Any:
+            bitmap[indices[id(node)]] = 1
+            unswap(node)
+            return evaluate(node, scope)
+        return probe
+
+
+def _arms(node: Expression) -> Iterator[Expression]:
+    if isinstance(node, (IfExpression, ElseExpression, WhileExpression, ForExpression)):
+        yield node.expression
+    elif isinstance(node, (AndExpression, OrExpression)):
+        yield node.right
+
+
+def load_reports(paths: list[str]) -> Iterator[dict[str, Any]]:
+    "the reports in paths, a directory standing for every .json file in it"
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".json"))
+        else:
+            files = [path]
+        for file in files:
+            with open(file) as fd:
+                yield json.load(fd)
+
+
+def merge_reports(reports: Iterator[dict[str, Any]]) -> dict[str, Any]:
+    "line and arm counts added up over the reports: the number of runs covering each"
+    merged: dict[str, Any] = {"version": FORMAT_VERSION, "runs": 0, "files": {}}
+    for report in reports:
+        if report.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported coverage report version {report.get('version')}")
+        merged["runs"] += report["runs"]
+        for file, data in report["files"].items():
+            target = merged["files"].setdefault(file, {"lines": {}, "branches": {}})
+            for line, count in data["lines"].items():
+                target["lines"][line] = target["lines"].get(line, 0) + count
+            for line, arms in data["branches"].items():
+                counts = target["branches"].setdefault(line, [])
+                # the file may have changed between runs, arms are matched by position
+                counts.extend([0] * (len(arms) - len(counts)))
+                for i, count in enumerate(arms):
+                    counts[i] += count
+    return merged
+
+
+def _ranges(lines: list[int]) -> str:
+    "sorted line numbers as `1-3, 7`"
+    ranges: list[list[int]] = []
+    for line in lines:
+        if ranges and ranges[-1][1] == line - 1:
+            ranges[-1][1] = line
+        else:
+            ranges.append([line, line])
+    return ", ".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
+
+
+def format_summary(merged: dict[str, Any]) -> str:
+    rows = [f"{'file':<40} {'lines':>12} {'cover':>7} {'arms':>12}  missing"]
+    for file, data in sorted(merged["files"].items()):
+        lines = sorted(int(line) for line in data["lines"])
+        missing = [line for line in lines if not data["lines"][str(line)]]
+        arms = [count for counts in data["branches"].values() for count in counts]
+        covered = len(lines) - len(missing)
+        percent = 100 * covered / len(lines) if lines else 100.0
+        name = os.path.relpath(file)
+        if name.startswith(".."):
+            name = file
+        rows.append(
+            f"{name:<40} {f'{covered}/{len(lines)}':>12} {percent:>6.1f}% "
+            f"{f'{sum(1 for count in arms if count)}/{len(arms)}':>12}  {_ranges(missing)}"
+        )
+    rows.append(f"{merged['runs']} run{'' if merged['runs'] == 1 else 's'} merged")
+    return "\n".join(rows)
+
+
+def to_lcov(merged: dict[str, Any]) -> str:
+    "the merged report as an lcov tracefile, for genhtml and code review tools"
+    records: list[str] = []
+    for file, data in sorted(merged["files"].items()):
+        records.append("TN:")
+        records.append(f"SF:{file}")
+        lines = sorted(int(line) for line in data["lines"])
+        for line in lines:
+            records.append(f"DA:{line},{data['lines'][str(line)]}")
+        arms = 0
+        arms_hit = 0
+        for line in sorted(int(line) for line in data["branches"]):
+            for i, count in enumerate(data["branches"][str(line)]):
+                records.append(f"BRDA:{line},0,{i},{count}")
+                arms += 1
+                arms_hit += 1 if count else 0
+        records.append(f"BRF:{arms}")
+        records.append(f"BRH:{arms_hit}")
+        records.append(f"LF:{len(lines)}")
+        records.append(f"LH:{sum(1 for line in lines if data['lines'][str(line)])}")
+        records.append("end_of_record")
+    return "\n".join(records) + "\n"
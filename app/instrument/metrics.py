@@ -0,0 +1,140 @@
+from typing import Any, Optional
+
+from ..expressions import Expression, FunctionCallExpression, WhileExpression, ForExpression
+from ..expressions import expressions
+from ..execution import ExecutionScope
+from ..optimize import walk
+from ..utils import UndefinedVariableError
+from .class_swap import ClassSwap, Evaluate
+
+
+# name: (type, help), in the order they are exported
+_METRICS = {
+    "nodes_evaluated": ("counter", "Nodes evaluated."),
+    "loop_iterations": ("counter", "Loop bodies evaluated by while and for statements."),
+    "calls": ("counter", "Lox functions, methods and initializers called."),
+    "call_depth_max": ("gauge", "Deepest nesting of Lox calls."),
+    "scopes_allocated": ("counter", "Execution scopes created."),
+    "variable_lookups": ("counter", "Variables looked up through the scope chain."),
+    "scope_chain_hops": ("counter", "Scopes variable lookups moved past without finding the name."),
+    "string_concatenations": ("counter", "String concatenations evaluated."),
+    "string_concatenated_chars": ("counter", "Characters in the results of string concatenations."),
+}
+
+
+class RuntimeMetrics:
+    """
+    Aggregate counters of one program run for `run --metrics`, written out in the OpenMetrics text
+    format so a batch of scripts can be scraped for resource usage without profiling each of them.
+    Nodes and loop bodies are counted by swapping their classes, calls, scopes, lookups and string
+    concatenations by patching the execution layer, and uninstall puts everything back.
+    """
+    def __init__(self) -> None:
+        self.values = {name: 0 for name in _METRICS}
+        self.depth = 0
+        self._nodes = ClassSwap("Metered", self._wrap_node)
+        self._loop_bodies = ClassSwap("MeteredBody", self._wrap_loop_body)
+        self._patched: list[tuple[Any, str, Any]] = []
+
+    def install(self, ast: Optional[Expression] = None) -> None:
+        "patches the execution layer, and meters the nodes of ast if given"
+        self._patch(FunctionCallExpression, "_call", self._wrap_call(FunctionCallExpression._call))
+        self._patch(ExecutionScope, "__init__", self._wrap_scope_init(ExecutionScope.__init__))
+        self._patch(ExecutionScope, "fetch_variable", self._fetch_variable())
+        self._patch(expressions, "concat", self._wrap_concat(expressions.concat))
+        if ast is not None:
+            self.instrument(ast)
+
+    def instrument(self, ast: Expression) -> None:
+        "meters the nodes of one more tree, e.g. a statement parsed after install"
+        bodies = [
+            node.expression for node in walk(ast) if isinstance(node, (WhileExpression, ForExpression))
+        ]
+        self._nodes.install(ast)
+        for body in bodies:
+            self._loop_bodies.swap(body)
+
+    def uninstall(self) -> None:
+        self._loop_bodies.uninstall()
+        self._nodes.uninstall()
+        for owner, name, value in reversed(self._patched):
+            setattr(owner, name, value)
+        self._patched.clear()
+
+    def to_openmetrics(self, script: str) -> str:
+        label = script.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        lines = []
+        for name, (kind, help) in _METRICS.items():
+            lines.append(f"# TYPE lox_{name} {kind}")
+            lines.append(f"# HELP lox_{name} {help}")
+            suffix = "_total" if kind == "counter" else ""
+            lines.append(f"lox_{name}{suffix}{{script=\"{label}\"}} {self.values[name]}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def _patch(self, owner: Any, name: str, value: Any) -> None:
+        self._patched.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    def _wrap_node(self, evaluate: Evaluate) -> Evaluate:
+        values = self.values
+
+        def metered(node: Expression, scope: Any) -> Any:
+            values["nodes_evaluated"] += 1
+            return evaluate(node, scope)
+        return metered
+
+    def _wrap_loop_body(self, evaluate: Evaluate) -> Evaluate:
+        values = self.values
+
+        def metered_body(node: Expression, scope: Any) -> Any:
+            values["loop_iterations"] += 1
+            return evaluate(node, scope)
+        return metered_body
+
+    def _wrap_call(self, call: Any) -> Any:
+        values = self.values
+
+        def metered_call(node: FunctionCallExpression, scope: Any, v: Any, instance: Any) -> Any:
+            values["calls"] += 1
+            self.depth += 1
+            if self.depth > values["call_depth_max"]:
+                values["call_depth_max"] = self.depth
+            try:
+                return call(node, scope, v, instance)
+            finally:
+                self.depth -= 1
+        return metered_call
+
+    def _wrap_scope_init(self, init: Any) -> Any:
+        values = self.values
+
+        def metered_init(scope: ExecutionScope, *args: Any, **kwargs: Any) -> None:
+            values["scopes_allocated"] += 1
+            init(scope, *args, **kwargs)
+        return metered_init
+
+    def _fetch_variable(self) -> Any:
+        values = self.values
+
+        # ExecutionScope.fetch_variable, counting the parents it walks
+        def fetch_variable(scope: ExecutionScope, name: str) -> Any:
+            values["variable_lookups"] += 1
+            current: Optional[ExecutionScope] = scope
+            while current:
+                if name in current._variables:
+                    return current._variables[name]
+                values["scope_chain_hops"] += 1
+                current = current.parent
+            raise UndefinedVariableError(name)
+        return fetch_variable
+
+    def _wrap_concat(self, concat: Any) -> Any:
+        values = self.values
+
+        def metered_concat(left: Any, right: Any) -> Any:
+            result = concat(left, right)
+            values["string_concatenations"] += 1
+            values["string_concatenated_chars"] += len(result)
+            return result
+        return metered_concat
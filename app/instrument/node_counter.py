@@ -0,0 +1,46 @@
+from typing import TYPE_CHECKING, Any
+
+from ..expressions import Expression, IdentifierExpression, NativeFunction
+from ..optimize import walk
+from .class_swap import ClassSwap, Evaluate
+
+if TYPE_CHECKING:
+    from ..execution import ExecutionScope
+
+
+class NodeCounter:
+    """
+    Counts evaluated nodes for the `node_count` builtin.
+    Only scripts looking the builtin up pay for the counting, everything else runs uninstrumented.
+    """
+    builtin_name = "node_count"
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._swap = ClassSwap("Counted", self._wrap)
+
+    @classmethod
+    def referenced(cls, ast: Expression) -> bool:
+        return any(
+            isinstance(node, IdentifierExpression) and node.name.lexeme == cls.builtin_name
+            for node in walk(ast)
+        )
+
+    def install(self, ast: Expression, scope: 'ExecutionScope') -> None:
+        self.instrument(ast)
+        scope.create_variable(self.builtin_name).set_value(
+            NativeFunction(self.builtin_name, 0, lambda: float(self.count))  # type: ignore
+        )
+
+    def instrument(self, ast: Expression) -> None:
+        "counts the nodes of one more tree, e.g. a statement parsed after install"
+        self._swap.install(ast)
+
+    def uninstall(self) -> None:
+        self._swap.uninstall()
+
+    def _wrap(self, evaluate: Evaluate) -> Evaluate:
+        def counted(node: Expression, scope: Any) -> Any:
+            self.count += 1
+            return evaluate(node, scope)
+        return counted
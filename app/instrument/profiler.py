@@ -0,0 +1,174 @@
+from time import perf_counter_ns
+from typing import Any, Optional
+
+from ..expressions import Expression
+from ..optimize import walk, child_expressions
+from .class_swap import ClassSwap, Evaluate, plain_class
+
+
+class NodeStats:
+    __slots__ = ["node", "line", "hits", "self_ns", "total_ns"]
+    def __init__(self, node: Expression, line: Optional[int]) -> None:
+        self.node = node
+        self.line = line
+        self.hits = 0
+        self.self_ns = 0
+        # recursive evaluations of the same node are only timed by the outermost one
+        self.total_ns = 0
+
+
+class LineStats:
+    __slots__ = ["line", "hits", "self_ns", "total_ns"]
+    def __init__(self, line: Optional[int]) -> None:
+        self.line = line
+        self.hits = 0
+        self.self_ns = 0
+        self.total_ns = 0
+
+
+class Profiler:
+    """
+    Deterministic profiler for `run --profile`: times every evaluate of the nodes it is installed on
+    and attributes self time, total time and hits to each node and to its source line.
+    A line is hit each time a node of it is evaluated from a node of another line, e.g. a function
+    body line from the call site, so nested nodes of the same line are not counted twice.
+    Times include the profiler's own overhead, they are meant to compare nodes, not to be exact.
+    """
+    def __init__(self) -> None:
+        self._swap = ClassSwap("Profiled", self._wrap)
+        self._stats: dict[int, NodeStats] = {}
+        self._line_stats: dict[Optional[int], LineStats] = {}
+        self._active: dict[int, int] = {}
+        self._active_lines: dict[Optional[int], int] = {}
+        # time spent in the children of each evaluate on the stack, and the line of each
+        self._children_ns: list[int] = []
+        self._lines: list[Optional[int]] = []
+
+    def install(self, ast: Expression) -> None:
+        lines = source_lines(ast)
+        for node in walk(ast):
+            if id(node) not in self._stats:
+                line = lines.get(id(node))
+                self._stats[id(node)] = NodeStats(node, line)
+                if line not in self._line_stats:
+                    self._line_stats[line] = LineStats(line)
+        self._swap.install(ast)
+
+    def uninstall(self) -> None:
+        self._swap.uninstall()
+
+    def nodes(self) -> list[NodeStats]:
+        "every evaluated node, most self time first"
+        return sorted(
+            (stats for stats in self._stats.values() if stats.hits),
+            key=lambda stats: stats.self_ns, reverse=True,
+        )
+
+    def lines(self) -> list[LineStats]:
+        "every executed line, most self time first"
+        for line in self._line_stats.values():
+            line.self_ns = 0
+        for stats in self._stats.values():
+            self._line_stats[stats.line].self_ns += stats.self_ns
+        return sorted(
+            (line for line in self._line_stats.values() if line.hits),
+            key=lambda line: line.self_ns, reverse=True,
+        )
+
+    def _wrap(self, evaluate: Evaluate) -> Evaluate:
+        stats_of = self._stats
+        line_stats_of = self._line_stats
+        active = self._active
+        active_lines = self._active_lines
+        children_ns = self._children_ns
+        lines = self._lines
+
+        def profiled(node: Expression, scope: Any) -> Any:
+            key = id(node)
+            stats = stats_of[key]
+            line = stats.line
+            enters_line = not lines or lines[-1] != line
+            active[key] = active.get(key, 0) + 1
+            if enters_line:
+                active_lines[line] = active_lines.get(line, 0) + 1
+            lines.append(line)
+            children_ns.append(0)
+            start = perf_counter_ns()
+            try:
+                return evaluate(node, scope)
+            finally:
+                elapsed = perf_counter_ns() - start
+                lines.pop()
+                stats.hits += 1
+                stats.self_ns += elapsed - children_ns.pop()
+                active[key] -= 1
+                if not active[key]:
+                    stats.total_ns += elapsed
+                if enters_line:
+                    line_stats = line_stats_of[line]
+                    line_stats.hits += 1
+                    active_lines[line] -= 1
+                    if not active_lines[line]:
+                        line_stats.total_ns += elapsed
+                if children_ns:
+                    children_ns[-1] += elapsed
+        return profiled
+
+
+def source_lines(ast: Expression) -> dict[int, Optional[int]]:
+    "line of each node: the line of a token it keeps, else the line of its first child having one"
+    lines: dict[int, Optional[int]] = {}
+    # children before parents, a parent without tokens takes its first child's line
+    for node in reversed(list(walk(ast))):
+        line = None
+        for name in ("operator", "name", "value"):
+            line = getattr(getattr(node, name, None), "line", None)
+            if line is not None:
+                break
+        else:
+            for child in child_expressions(node):
+                line = lines.get(id(child))
+                if line is not None:
+                    break
+        lines[id(node)] = line
+    return lines
+
+
+def describe(node: Expression, width: int = 48) -> str:
+    text = " ".join(str(node).split())
+    if len(text) > width:
+        text = text[:width - 3] + "..."
+    # the profiler may share the node with other instruments, e.g. the node counter
+    return f"{plain_class(node.__class__).__name__} {text}"
+
+
+def format_report(profiler: Profiler, top: int) -> str:
+    rows = ["hot lines", f"{'line':>6} {'hits':>10} {'self ms':>10} {'total ms':>10}"]
+    for line in profiler.lines()[:top]:
+        rows.append(
+            f"{line.line if line.line is not None else '-':>6} {line.hits:>10} "
+            f"{line.self_ns / 1e6:>10.2f} {line.total_ns / 1e6:>10.2f}"
+        )
+    rows += ["", "hot nodes", f"{'line':>6} {'hits':>10} {'self ms':>10} {'total ms':>10}  node"]
+    for stats in profiler.nodes()[:top]:
+        rows.append(
+            f"{stats.line if stats.line is not None else '-':>6} {stats.hits:>10} "
+            f"{stats.self_ns / 1e6:>10.2f} {stats.total_ns / 1e6:>10.2f}  {describe(stats.node)}"
+        )
+    return "\n".join(rows)
+
+
+def report_json(profiler: Profiler, top: Optional[int] = None) -> dict[str, Any]:
+    return {
+        "lines": [
+            {"line": line.line, "hits": line.hits, "self_ns": line.self_ns, "total_ns": line.total_ns}
+            for line in profiler.lines()[:top]
+        ],
+        "nodes": [
+            {
+                "line": stats.line, "node": describe(stats.node), "hits": stats.hits,
+                "self_ns": stats.self_ns, "total_ns": stats.total_ns,
+            }
+            for stats in profiler.nodes()[:top]
+        ],
+    }
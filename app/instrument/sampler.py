@@ -0,0 +1,79 @@
+from collections import Counter
+import signal
+import sys
+import threading
+from types import FrameType
+from typing import Any, Optional
+
+from ..expressions import FunctionCallExpression
+
+
+# every Lox call, function or method, runs its body from this frame, with the definition in `funcdef`
+_CALL_CODE = FunctionCallExpression._call.__code__
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for `run --sample`: interrupts the interpreter every interval seconds of CPU
+    time and records the stack of Lox functions being run, read off the python frames of calls.
+    SIGPROF is used where the platform has it and the run is on the main thread, a thread polling
+    sys._current_frames() otherwise. The stacks come out as collapsed stack text for flamegraph tools.
+    """
+    ROOT = "<script>"
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self._previous_handler: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def start(self) -> None:
+        if hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread():
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+            return
+
+        target = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._poll, args=(target, ), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler)
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def collapsed(self) -> str:
+        "one `outer;inner count` line per distinct stack"
+        return "".join(
+            f"{';'.join(stack)} {count}\n" for stack, count in sorted(self.stacks.items())
+        )
+
+    def _on_signal(self, signum: int, frame: Optional[FrameType]) -> None:
+        self._record(frame)
+
+    def _poll(self, target: int) -> None:
+        while not self._stopped.wait(self.interval):
+            self._record(sys._current_frames().get(target))
+
+    def _record(self, frame: Optional[FrameType]) -> None:
+        names: list[str] = []
+        while frame is not None:
+            if frame.f_code is _CALL_CODE:
+                funcdef = frame.f_locals.get("funcdef")
+                # None until the call has read its definition
+                if funcdef is not None:
+                    names.append(funcdef.name)
+            frame = frame.f_back
+        names.append(self.ROOT)
+        names.reverse()
+        self.stacks[tuple(names)] += 1
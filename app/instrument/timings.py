@@ -0,0 +1,150 @@
+from contextlib import contextmanager
+from time import perf_counter, process_time
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from ..tokens import Tokenizer, Token
+
+
+T = TypeVar("T")
+
+
+class Phase:
+    __slots__ = ["name", "wall", "cpu", "peak_memory", "within"]
+    def __init__(self, name: str, within: Optional[str] = None) -> None:
+        self.name = name
+        self.wall = 0.0
+        # None for a share of another phase only timed on the wall clock
+        self.cpu: Optional[float] = None if within else 0.0
+        self.peak_memory: Optional[int] = None
+        self.within = within
+
+
+class Timings:
+    """
+    Wall and CPU time per phase of a command for `--timings`, with object counts and peak memory.
+    Python level memory is only traced with trace_memory, tracemalloc slows every allocation down
+    and would skew the times, otherwise the peak resident size of the process is reported.
+    """
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.phases: dict[str, Phase] = {}
+        self.counts: dict[str, int] = {}
+        self._patched: list[tuple[type, Callable[..., None]]] = []
+
+    def start(self) -> None:
+        if self.trace_memory:
+            # imported here, tracemalloc pulls in pickle which no other run needs
+            import tracemalloc
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        for cls, init in reversed(self._patched):
+            cls.__init__ = init  # type: ignore
+        self._patched.clear()
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.stop()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Phase]:
+        phase = self._phase(name)
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.reset_peak()
+        wall, cpu = perf_counter(), process_time()
+        try:
+            yield phase
+        finally:
+            phase.wall += perf_counter() - wall
+            phase.cpu += process_time() - cpu  # type: ignore
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                phase.peak_memory = max(phase.peak_memory or 0, peak)
+
+    def timed(self, items: Iterator[T], name: str, counted: str, within: Optional[str] = None) -> Iterator[T]:
+        "items, the time spent producing them going to phase `name`, their number to count `counted`"
+        phase = self._phase(name, within)
+        self.counts.setdefault(counted, 0)
+        while True:
+            wall, cpu = perf_counter(), (None if within else process_time())
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            finally:
+                phase.wall += perf_counter() - wall
+                if cpu is not None:
+                    phase.cpu += process_time() - cpu  # type: ignore
+            self.counts[counted] += 1
+            yield item
+
+    def add_count(self, name: str, count: int) -> None:
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def count_instances(self, cls: type, name: str) -> None:
+        "counts the instances of cls created until stop, by patching its __init__"
+        init = cls.__init__
+
+        def counting_init(instance: Any, *args: Any, **kwargs: Any) -> None:
+            self.counts[name] += 1
+            init(instance, *args, **kwargs)
+
+        self.counts.setdefault(name, 0)
+        self._patched.append((cls, init))
+        cls.__init__ = counting_init  # type: ignore
+
+    def peak_memory(self) -> tuple[str, Optional[int]]:
+        if self.trace_memory:
+            peaks = [phase.peak_memory for phase in self.phases.values() if phase.peak_memory is not None]
+            return "traced", max(peaks, default=None)
+        try:
+            import resource
+        except ImportError:
+            return "rss", None
+        # kilobytes on Linux
+        return "rss", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def format(self) -> str:
+        rows = [f"{'phase':<14} {'wall ms':>10} {'cpu ms':>10}" + (f" {'peak KiB':>10}" if self.trace_memory else "")]
+        for phase in self.phases.values():
+            name = f"  {phase.name}" if phase.within else phase.name
+            cpu = f"{phase.cpu * 1000:>10.2f}" if phase.cpu is not None else f"{'-':>10}"
+            row = f"{name:<14} {phase.wall * 1000:>10.2f} {cpu}"
+            if self.trace_memory:
+                row += f" {phase.peak_memory / 1024:>10.1f}" if phase.peak_memory is not None else f" {'-':>10}"
+            rows.append(row)
+        kind, peak = self.peak_memory()
+        rows.append(f"peak memory ({kind}): " + (f"{peak / 1024:.1f} KiB" if peak is not None else "unknown"))
+        rows.append(", ".join(f"{count} {name}" for name, count in self.counts.items()))
+        return "\n".join(rows)
+
+    def to_json(self) -> dict[str, Any]:
+        kind, peak = self.peak_memory()
+        return {
+            "phases": [
+                {
+                    "name": phase.name, "within": phase.within, "wall_s": phase.wall, "cpu_s": phase.cpu,
+                    "peak_memory": phase.peak_memory,
+                }
+                for phase in self.phases.values()
+            ],
+            "peak_memory": {"kind": kind, "bytes": peak},
+            "counts": self.counts,
+        }
+
+    def _phase(self, name: str, within: Optional[str] = None) -> Phase:
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Phase(name, within)
+        return phase
+
+
+class TimedTokenizer(Tokenizer):
+    "a Tokenizer whose tokens are counted and timed, on the wall clock only, as a share of a phase"
+    def __init__(self, s: str, timings: Timings, within: str) -> None:
+        super().__init__(s)
+        self.timings = timings
+        self.within = within
+
+    def __iter__(self) -> Iterator[Token]:
+        return self.timings.timed(super().__iter__(), "tokenizer", "tokens", self.within)
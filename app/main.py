@@ -1,58 +1,319 @@
+import argparse
 from argparse import ArgumentParser, Namespace
+import os
+from contextlib import nullcontext
+from time import perf_counter
 import sys
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Optional
 
+# the interpreter, the server and the batch runner are imported by the commands using them,
+# so a forwarded request or a short run only pays for what it touches
+if TYPE_CHECKING:
+    from .expressions import Expression, RootAST
+    from .execution import ExecutionBudget, ExecutionContext, ExecutionScope, ModuleLoader, Output
+    from .instrument import Coverage, Profiler, RuntimeMetrics, SamplingProfiler, Timings
+    from .tokens import Tokenizer
+
+
+# mirror FlushPolicy and Output.DEFAULT_BUFFER_SIZE without importing the interpreter to build the parser,
+# tests/test_startup.py checks they still match
+FLUSH_POLICIES = ["size", "line", "exit"]
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class HelpFormatter(argparse.HelpFormatter):
+    """
+    argparse builds a formatter for every added argument, and the default one imports shutil,
+    which costs more than the rest of argparse, only to read the terminal width.
+    """
+    def __init__(self, prog: str) -> None:
+        try:
+            width = int(os.environ["COLUMNS"])
+        except (KeyError, ValueError):
+            try:
+                width = os.get_terminal_size(sys.__stdout__.fileno()).columns
+            except (AttributeError, ValueError, OSError):
+                width = 80
+        super().__init__(prog, width=width - 2)
 
-from .expressions import Expression
-from .tokens import Tokenizer, EOFSymbol
-from .parse import Parser
-from .execution import ExecutionScope
-from .utils import RuntimeError, ParserBaseError
 
 def main():
     args = parse_args()
     args.entry(args)
 
 
-def parse_args() -> Namespace:
-    arg_parser = ArgumentParser()
-    sub_parser = arg_parser.add_subparsers()
+def parse_args(argv: Optional[list[str]] = None) -> Namespace:
+    arg_parser = ArgumentParser(formatter_class=HelpFormatter)
+    sub_parser = arg_parser.add_subparsers(required=True)
     
-    arg_parser.add_argument("file")
-    config_tokenize_parser(sub_parser.add_parser("tokenize"))
-    config_parse_parser(sub_parser.add_parser("parse"))
-    config_evaluate_parser(sub_parser.add_parser("evaluate"))
-    config_execute_parser(sub_parser.add_parser("run"))
+    config_tokenize_parser(sub_parser.add_parser("tokenize", formatter_class=HelpFormatter))
+    config_parse_parser(sub_parser.add_parser("parse", formatter_class=HelpFormatter))
+    config_evaluate_parser(sub_parser.add_parser("evaluate", formatter_class=HelpFormatter))
+    config_execute_parser(sub_parser.add_parser("run", formatter_class=HelpFormatter))
+    config_serve_parser(sub_parser.add_parser("serve", formatter_class=HelpFormatter))
+    config_batch_parser(sub_parser.add_parser("run-batch", formatter_class=HelpFormatter))
+    config_coverage_report_parser(sub_parser.add_parser("coverage-report", formatter_class=HelpFormatter))
     
-    return arg_parser.parse_args()
+    return arg_parser.parse_args(argv)
 
 
 def config_parse_parser(arg_parser: ArgumentParser) -> None:
-    arg_parser.set_defaults(entry=print_parse_result)
+    arg_parser.set_defaults(entry=with_timings(print_parse_result))
+    arg_parser.add_argument("file")
+    config_timings_arguments(arg_parser)
     
 def config_evaluate_parser(arg_parser: ArgumentParser) -> None:
-    arg_parser.set_defaults(entry=print_evalute_result)
+    arg_parser.set_defaults(entry=with_timings(print_evalute_result, count_runtime=True))
+    arg_parser.add_argument("file")
+    arg_parser.add_argument(
+        "--columns", metavar="DATA",
+        help="evaluate the expression for every row of DATA, a CSV file with a header or .npy / .npz arrays, "
+             "with the columns bound by name; the result column is written as CSV, or .npy for an --output "
+             "ending in .npy, and rows failing a type check are masked with their error"
+    )
+    config_output_arguments(arg_parser)
+    config_server_arguments(arg_parser)
+    config_timings_arguments(arg_parser)
     
 def config_tokenize_parser(arg_parser: ArgumentParser) -> None:
-    arg_parser.set_defaults(entry=print_tokens)
+    arg_parser.set_defaults(entry=with_timings(print_tokens))
+    arg_parser.add_argument("file")
+    config_output_arguments(arg_parser)
+    config_timings_arguments(arg_parser)
 
 def config_execute_parser(arg_parser: ArgumentParser) -> None:
-    arg_parser.set_defaults(entry=execute_file)
+    arg_parser.set_defaults(entry=with_timings(execute_file, count_runtime=True))
+    arg_parser.add_argument("file")
+    arg_parser.add_argument("--no-optimize", action="store_true", help="skip the static optimization passes")
+    arg_parser.add_argument(
+        "--optimization-report", action="store_true", 
+        help="print what the optimization passes removed or rewrote and the time they took to stderr, "
+             "compare run --timings with and without --no-optimize for their effect on the run itself"
+    )
+    arg_parser.add_argument(
+        "--prelude", metavar="FILE", 
+        help="run FILE first, the program sees its globals as its own"
+    )
+    arg_parser.add_argument(
+        "--snapshot", metavar="FILE", 
+        help="with --prelude, restore the prelude's globals and output from FILE instead of running it, "
+             "FILE is taken again whenever the prelude's source changed"
+    )
+    arg_parser.add_argument(
+        "--module-cache", metavar="DIR", 
+        help="keep the parsed trees of imported modules in DIR, later runs load them instead of parsing"
+    )
+    arg_parser.add_argument(
+        "--stream", action="store_true", 
+        help="run each top level statement as soon as it is parsed, "
+             "a later parse error exits with 65 after the statements before it ran"
+    )
+    arg_parser.add_argument(
+        "--profile", action="store_true", 
+        help="time every evaluated node and print the hottest lines and nodes to stderr"
+    )
+    arg_parser.add_argument("--profile-top", type=int, default=20, metavar="N", help="rows per profile table")
+    arg_parser.add_argument("--profile-json", metavar="FILE", help="also write the full profile to FILE as JSON")
+    arg_parser.add_argument(
+        "--sample", metavar="FILE", 
+        help="sample the stack of Lox function calls and write it to FILE as collapsed stacks for flamegraphs"
+    )
+    arg_parser.add_argument(
+        "--sample-interval", type=float, default=5, metavar="MS", help="CPU milliseconds between samples"
+    )
+    arg_parser.add_argument(
+        "--metrics", metavar="FILE", 
+        help="write runtime counters (nodes, calls, scopes, lookups, concatenations) to FILE as OpenMetrics text"
+    )
+    arg_parser.add_argument(
+        "--coverage", metavar="FILE", 
+        help="write the statements and branch arms run to FILE as JSON, see the coverage-report command; "
+             "unused functions are kept so they are reported"
+    )
+    config_budget_arguments(arg_parser)
+    config_output_arguments(arg_parser)
+    config_server_arguments(arg_parser)
+    config_timings_arguments(arg_parser)
+
+def config_budget_arguments(arg_parser: ArgumentParser) -> None:
+    group = arg_parser.add_argument_group(
+        "execution budget", "limits for untrusted scripts, going over one exits with 75"
+    )
+    group.add_argument("--max-steps", type=int, metavar="N", help="loop iterations and calls")
+    group.add_argument("--max-time", type=float, metavar="SECONDS", help="wall time of the run")
+    group.add_argument(
+        "--max-depth", type=int, metavar="N", help="nested calls, never more than the interpreter's stack allows"
+    )
+    group.add_argument("--max-memory", type=int, metavar="MIB", help="growth of the resident memory")
+    group.add_argument("--max-string", type=int, metavar="N", help="characters of a string a concatenation or a builtin makes")
+
+def config_output_arguments(arg_parser: ArgumentParser) -> None:
+    arg_parser.add_argument("--output", metavar="FILE", help="write the program output to FILE instead of stdout")
+    arg_parser.add_argument(
+        "--flush", choices=FLUSH_POLICIES, default=FLUSH_POLICIES[0],
+        help="when buffered output is written out: once the buffer is full, after each line or at exit"
+    )
+    arg_parser.add_argument(
+        "--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE, 
+        help="characters buffered before a size flush"
+    )
+
+def config_server_arguments(arg_parser: ArgumentParser) -> None:
+    arg_parser.set_defaults(ast_cache=None)
+    arg_parser.add_argument(
+        "--server", metavar="SOCKET", 
+        help="forward the request to the interpreter serving on SOCKET (see the serve command)"
+    )
+
+def config_timings_arguments(arg_parser: ArgumentParser) -> None:
+    arg_parser.add_argument(
+        "--timings", action="store_true", 
+        help="report wall and CPU time per phase, peak memory and object counts to stderr"
+    )
+    arg_parser.add_argument("--timings-json", metavar="FILE", help="write the timings report to FILE as JSON")
+    arg_parser.add_argument(
+        "--trace-memory", action="store_true", 
+        help="with timings, trace python allocations for a peak per phase, slows every phase down"
+    )
+
+def config_serve_parser(arg_parser: ArgumentParser) -> None:
+    arg_parser.set_defaults(entry=serve)
+    arg_parser.add_argument("socket", help="path of the Unix socket to listen on")
+    arg_parser.add_argument("--cache-size", type=int, default=256, help="parsed programs kept warm")
+
+def config_batch_parser(arg_parser: ArgumentParser) -> None:
+    arg_parser.set_defaults(entry=run_batch)
+    arg_parser.add_argument("source", help="a directory of .lox files, a glob pattern or a manifest listing scripts")
+    arg_parser.add_argument("--jobs", type=int, default=None, help="worker processes, every core by default")
+    arg_parser.add_argument("--timeout", type=float, default=None, help="seconds a single script may run")
+    arg_parser.add_argument("--no-optimize", action="store_true", help="skip the static optimization passes")
+    arg_parser.add_argument(
+        "--module-cache", metavar="DIR", help="keep the parsed trees of imported modules in DIR for every script"
+    )
+    config_budget_arguments(arg_parser)
+    arg_parser.add_argument("--summary", metavar="FILE", help="write the JSON summary to FILE instead of stdout")
+    arg_parser.add_argument(
+        "--max-output", type=int, default=1 << 16, help="characters of stdout / stderr kept per script"
+    )
+    arg_parser.add_argument(
+        "--metrics-dir", metavar="DIR", help="write the runtime counters of each script to DIR as OpenMetrics text"
+    )
+    arg_parser.add_argument(
+        "--coverage-dir", metavar="DIR", help="write the coverage of each script to DIR as JSON"
+    )
+
+def config_coverage_report_parser(arg_parser: ArgumentParser) -> None:
+    arg_parser.set_defaults(entry=coverage_report)
+    arg_parser.add_argument(
+        "reports", nargs="+", help="coverage files written by run --coverage, or directories of them"
+    )
+    arg_parser.add_argument("--json", metavar="FILE", help="write the merged coverage to FILE, it can be merged again")
+    arg_parser.add_argument("--lcov", metavar="FILE", help="write the merged coverage to FILE as an lcov tracefile")
+
+def with_timings(entry: Callable[[Namespace], None], count_runtime: bool = False) -> Callable[[Namespace], None]:
+    "entry with ns.phase_timings set, reported once the entry returns or exits"
+    def timed_entry(ns: Namespace) -> None:
+        ns.phase_timings = create_timings(ns, count_runtime)
+        if ns.phase_timings is None:
+            return entry(ns)
+        try:
+            entry(ns)
+        finally:
+            report_timings(ns, ns.phase_timings)
+    return timed_entry
+
+def create_timings(ns: Namespace, count_runtime: bool) -> Optional['Timings']:
+    # a forwarded request is timed by the server running it
+    if not (ns.timings or ns.timings_json) or getattr(ns, "server", None):
+        return None
+    
+    from .instrument import Timings
+    timings = Timings(ns.trace_memory)
+    if count_runtime:
+        from .execution import ExecutionScope, Variable
+        timings.count_instances(ExecutionScope, "scopes")
+        timings.count_instances(Variable, "variables")
+    timings.start()
+    return timings
+
+def phase(timings: Optional['Timings'], name: str) -> ContextManager[Any]:
+    return timings.phase(name) if timings else nullcontext()
+
+def create_tokenizer(file_contents: str, timings: Optional['Timings'], within: str) -> 'Tokenizer':
+    if timings:
+        from .instrument import TimedTokenizer
+        return TimedTokenizer(file_contents, timings, within)
+    
+    from .tokens import Tokenizer
+    return Tokenizer(file_contents)
+
+def report_timings(ns: Namespace, timings: 'Timings') -> None:
+    import json
+    
+    timings.stop()
+    if ns.timings:
+        print(timings.format(), file=sys.stderr)
+    if ns.timings_json:
+        with open(ns.timings_json, "w") as fd:
+            json.dump(timings.to_json(), fd, indent=2)
+
+def read_file(ns: Namespace) -> str:
+    with phase(ns.phase_timings, "read"):
+        with open(ns.file) as fd:
+            return fd.read()
+
+def create_budget(ns: Namespace) -> Optional['ExecutionBudget']:
+    "the limits asked for on the command line, None for an unlimited run"
+    limits = (ns.max_steps, ns.max_time, ns.max_depth, ns.max_memory, ns.max_string)
+    if all(limit is None for limit in limits):
+        return None
+    from .execution import ExecutionBudget
+    
+    return ExecutionBudget(
+        max_steps=ns.max_steps,
+        max_seconds=ns.max_time,
+        max_depth=ns.max_depth,
+        max_memory=ns.max_memory << 20 if ns.max_memory is not None else None,
+        max_string=ns.max_string,
+    )
+
+def create_modules(ns: Namespace) -> 'ModuleLoader':
+    "the loader of the program's imports, which resolve from the program's directory"
+    from .execution import ModuleLoader, ModuleCacheError
+    
+    directory = os.path.dirname(os.path.realpath(ns.file))
+    try:
+        return ModuleLoader(directory, ns.ast_cache, ns.module_cache, optimize=not ns.no_optimize)
+    except ModuleCacheError as e:
+        print(f"can not use the module cache: {e}", file=sys.stderr)
+        exit(1)
+
+def create_output(ns: Namespace) -> 'Output':
+    from .execution import Output, StdoutSink, FileSink, FlushPolicy
+    
+    sink = FileSink(ns.output) if ns.output else StdoutSink()
+    return Output(sink, FlushPolicy(ns.flush), ns.buffer_size)
     
     
 def print_parse_result(ns: Namespace) -> None:
-    with open(ns.file) as fd:
-        file_contents = fd.read()
+    from .expressions import Expression
+    from .tokens import EOFSymbol
+    from .utils import ParserBaseError
+    
+    file_contents = read_file(ns)
     
     try:
-        tokenizer = Tokenizer(file_contents)
+        tokenizer = create_tokenizer(file_contents, ns.phase_timings, "parse")
         token_iter = iter(tokenizer)
         expression = None
-        for token in token_iter:
-            if isinstance(token, EOFSymbol):
-                break
-            expression = Expression.from_token(token, expression, token_iter)
+        with phase(ns.phase_timings, "parse"):
+            for token in token_iter:
+                if isinstance(token, EOFSymbol):
+                    break
+                expression = Expression.from_token(token, expression, token_iter)
         if expression:
-            print(expression)
+            with phase(ns.phase_timings, "print"):
+                print(expression)
     except ParserBaseError as e:
         print(f"[line 1] {e}", file=sys.stderr)
         exit(65)
@@ -61,62 +322,496 @@ def print_parse_result(ns: Namespace) -> None:
         exit(65)
 
 def print_evalute_result(ns: Namespace) -> None:
-    with open(ns.file) as fd:
-        file_contents = fd.read()
+    if ns.server:
+        exit(forward_to_server(ns))
+    
+    if ns.columns:
+        return evaluate_columns(ns)
     
+    from .expressions import stringify
+    from .execution import ExecutionContext
+    from .utils import RuntimeError, ParserBaseError
+    
+    context = ExecutionContext(create_output(ns))
     try:
-        token_iter = iter(Tokenizer(file_contents))
-        scope = ExecutionScope()
-        expression = None
-        for token in token_iter:
-            if isinstance(token, EOFSymbol):
-                break
-            expression = Expression.from_token(token, expression, token_iter)
+        if ns.ast_cache is not None:
+            expression = ns.ast_cache.load(ns.file, "evaluate", lambda: parse_expression(ns))
+        else:
+            expression = parse_expression(ns)
         if expression:
-            result = expression.evaluate(scope)
-            
-            if isinstance(result, bool):
-                print(str(result).lower())
-            elif result is None:
-                print("nil")
-            else:
-                print(result)
+            with phase(ns.phase_timings, "evaluate"):
+                context.output.print(stringify(expression.evaluate(context.root_scope)))
+        with phase(ns.phase_timings, "flush"):
+            context.output.close()
 
     except RuntimeError as e:
+        context.output.close()
         print(e, file=sys.stderr)
         exit(70)
     except ParserBaseError as e:
         print(f"[line 1] {e}", file=sys.stderr)
         exit(65)
 
+def evaluate_columns(ns: Namespace) -> None:
+    import io
+    from .columnar import ColumnsError, evaluate_columns, load_columns, write_csv, write_npy
+    from .utils import RuntimeError, ParserBaseError
+    
+    try:
+        with phase(ns.phase_timings, "read"):
+            columns = load_columns(ns.columns)
+    except (OSError, ValueError, ColumnsError) as e:
+        print(f"can not read the columns: {e}", file=sys.stderr)
+        exit(1)
+    
+    try:
+        expression = parse_expression(ns)
+        with phase(ns.phase_timings, "evaluate"):
+            result = evaluate_columns(expression, columns)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        exit(70)
+    except ParserBaseError as e:
+        print(f"[line 1] {e}", file=sys.stderr)
+        exit(65)
+    
+    with phase(ns.phase_timings, "print"):
+        if ns.output and ns.output.endswith(".npy"):
+            try:
+                write_npy(result, ns.output)
+            except ColumnsError as e:
+                print(e, file=sys.stderr)
+                exit(1)
+        else:
+            text = io.StringIO()
+            write_csv(result, text)
+            output = create_output(ns)
+            output.write(text.getvalue())
+            output.close()
+    if result.masked:
+        print(f"{result.masked} of {len(result)} rows masked by runtime errors", file=sys.stderr)
+
+
+def parse_expression(ns: Namespace) -> Optional['Expression']:
+    from .expressions import Expression
+    from .tokens import EOFSymbol
+    
+    file_contents = read_file(ns)
+    
+    token_iter = iter(create_tokenizer(file_contents, ns.phase_timings, "parse"))
+    expression = None
+    with phase(ns.phase_timings, "parse"):
+        for token in token_iter:
+            if isinstance(token, EOFSymbol):
+                break
+            expression = Expression.from_token(token, expression, token_iter)
+    return expression
+
 
 def print_tokens(ns: Namespace) -> None:
-    with open(ns.file) as fd:
-        file_contents = fd.read()
+    file_contents = read_file(ns)
     
-    tokenized = Tokenizer(file_contents)
-    for token in tokenized:
-        print(token)
+    output = create_output(ns)
+    tokenized = create_tokenizer(file_contents, ns.phase_timings, "tokenize")
+    with phase(ns.phase_timings, "tokenize"):
+        for token in tokenized:
+            output.print(str(token))
+    with phase(ns.phase_timings, "flush"):
+        output.close()
     
     if tokenized.error:
         exit(65)
     
     
 def execute_file(ns: Namespace) -> None:
-    with open(ns.file) as fd:
-        file_contents = fd.read()
+    if ns.optimization_report and ns.no_optimize:
+        print("--optimization-report has nothing to report with --no-optimize", file=sys.stderr)
+        exit(1)
+    if ns.server:
+        exit(forward_to_server(ns))
     
-    parser = Parser(file_contents)
-    if parser.error:
+    if ns.stream:
+        return execute_stream(ns, read_file(ns))
+    
+    from .execution import ExecutionContext
+    from .instrument import Coverage, NodeCounter, Profiler, RuntimeMetrics, SamplingProfiler
+    from .utils import RuntimeError
+    
+    if ns.ast_cache is not None:
+        # an optimized tree differs from a plain one, each is cached on its own
+        parsed = ns.ast_cache.load_reported(
+            ns.file, ("run", ns.no_optimize, bool(ns.coverage), bool(ns.prelude)), lambda: parse_program(ns)
+        )
+    else:
+        parsed = parse_program(ns)
+    if parsed is None:
         exit(65)
+    ast, report = parsed
+    if ns.optimization_report:
+        print(report, file=sys.stderr)
+    
+    context = ExecutionContext(create_output(ns), create_budget(ns), create_modules(ns))
+    coverage: Optional[Coverage] = None
+    if ns.coverage:
+        coverage = Coverage()
+        coverage.install(ast)
+    counter: Optional[NodeCounter] = None
+    if NodeCounter.referenced(ast):
+        counter = NodeCounter()
+        counter.install(ast, context.root_scope)
+    profiler: Optional[Profiler] = None
+    if ns.profile:
+        profiler = Profiler()
+        profiler.install(ast)
+    metrics: Optional[RuntimeMetrics] = None
+    if ns.metrics:
+        metrics = RuntimeMetrics()
+        metrics.install(ast)
+    sampler = SamplingProfiler(ns.sample_interval / 1000) if ns.sample else None
     
     try:
-        parser.ast.evaluate(ExecutionScope())
+        if sampler:
+            sampler.start()
+        if context.budget:
+            context.budget.start()
+        # the program's globals are a child of the prelude's, like of the root scope without one
+        outer_scope = run_prelude(ns, context) if ns.prelude else context.root_scope
+        with phase(ns.phase_timings, "evaluate"):
+            ast.evaluate(outer_scope)
+        with phase(ns.phase_timings, "flush"):
+            context.output.close()
     except RuntimeError as e:
+        # everything printed before the error goes out first
+        context.output.close()
         print(e, file=sys.stderr)
-        exit(70)
+        exit(runtime_error_exit_code(e))
+    except BaseException:
+        # a python error such as RecursionError still lets out what the program printed before it
+        context.output.close()
+        raise
+    finally:
+        if sampler:
+            sampler.stop()
+            report_samples(ns, sampler)
+        # a cached tree is run again by later requests, instruments come off in reverse order
+        if metrics:
+            metrics.uninstall()
+            report_metrics(ns, metrics)
+        if profiler:
+            profiler.uninstall()
+            report_profile(ns, profiler)
+        if counter:
+            counter.uninstall()
+        if coverage:
+            coverage.uninstall()
+            report_coverage(ns, coverage)
+
+def run_prelude(ns: Namespace, context: 'ExecutionContext') -> 'ExecutionScope':
+    "the scope of the globals the prelude leaves behind, restored from the snapshot when taken from the same source"
+    from .execution import (
+        ExecutionScope, FlushPolicy, MemorySink, Output, SnapshotError, load_snapshot, save_snapshot, snapshot_key
+    )
+    from .parse import Parser
+    from .optimize import optimize
+    
+    with phase(ns.phase_timings, "prelude"):
+        with open(ns.prelude) as fd:
+            source = fd.read()
+        key = snapshot_key(source, not ns.no_optimize)
+        if ns.snapshot:
+            try:
+                restored = load_snapshot(ns.snapshot, key, context)
+            except SnapshotError as e:
+                print(f"can not use the snapshot: {e}", file=sys.stderr)
+                exit(1)
+            if restored is not None:
+                scope, printed = restored
+                context.output.write(printed)
+                return scope
+        
+        parser = Parser(source)
+        if parser.error:
+            exit(65)
+        if not ns.no_optimize:
+            # the prelude's functions are there for the program, none of them is unused
+            optimize(parser.ast, remove_unused_functions=False)
+        
+        scope = ExecutionScope(context.root_scope)
+        # its imports are relative to the prelude, not to the program
+        scope.module_path = os.path.realpath(ns.prelude)
+        # what the prelude prints is kept in the snapshot, a restored run prints it again
+        output = context.output
+        sink = MemorySink()
+        context.output = Output(sink, FlushPolicy.EXIT)
+        try:
+            parser.ast.evaluate_in(scope)
+        finally:
+            context.output.flush()
+            context.output = output
+            output.write(sink.getvalue())
+        
+        if ns.snapshot:
+            try:
+                save_snapshot(ns.snapshot, key, scope, sink.getvalue(), context)
+            except (OSError, SnapshotError) as e:
+                print(f"snapshot not written: {e}", file=sys.stderr)
+    return scope
+
+def parse_program(ns: Namespace) -> Optional[tuple['RootAST', str]]:
+    "the parsed and optimized program with the optimizer's report, None after reporting a parse error"
+    from .parse import Parser
+    from .optimize import optimize, walk
+    
+    file_contents = read_file(ns)
+    timings = ns.phase_timings
+    
+    parse_start = perf_counter()
+    with phase(timings, "parse"):
+        parser = Parser(file_contents, create_tokenizer(file_contents, timings, "parse"))
+    if parser.error:
+        return None
+    parse_time = perf_counter() - parse_start
+    if timings:
+        timings.add_count("nodes", sum(1 for _ in walk(parser.ast)))
+
+    if not ns.no_optimize:
+        with phase(timings, "optimize"):
+            # a prelude's functions are unknown to this tree, calling one may change any global
+            report = optimize(
+                parser.ast, remove_unused_functions=not ns.coverage, foreign_functions=bool(ns.prelude)
+            )
+        return parser.ast, (
+            f"{report}\n"
+            f"parse time: {parse_time * 1000:.2f} ms, "
+            f"the program starts after {(parse_time + report.elapsed) * 1000:.2f} ms"
+        )
+    return parser.ast, ""
 
 
+def execute_stream(ns: Namespace, file_contents: str) -> None:
+    from .parse import StreamingParser
+    from .optimize import IncrementalOptimizer, walk
+    from .execution import ExecutionContext
+    from .instrument import Coverage, NodeCounter, Profiler, RuntimeMetrics, SamplingProfiler
+    from .utils import RuntimeError
+    
+    timings = ns.phase_timings
+    parser = StreamingParser(file_contents, create_tokenizer(file_contents, timings, "parse"))
+    optimizer = None if ns.no_optimize else IncrementalOptimizer(foreign_functions=bool(ns.prelude))
+    context = ExecutionContext(create_output(ns), create_budget(ns), create_modules(ns))
+    coverage = Coverage() if ns.coverage else None
+    counter: Optional[NodeCounter] = None
+    profiler = Profiler() if ns.profile else None
+    metrics = RuntimeMetrics() if ns.metrics else None
+    sampler = SamplingProfiler(ns.sample_interval / 1000) if ns.sample else None
+    
+    try:
+        if metrics:
+            metrics.install()
+        if sampler:
+            sampler.start()
+        if context.budget:
+            context.budget.start()
+        # globals live in a child of the root scope or of the prelude's, like RootAST.evaluate
+        scope = (run_prelude(ns, context) if ns.prelude else context.root_scope).create_child_scope()
+        # statements are dropped once run, functions stay alive through the scopes binding them
+        statements = timings.timed(iter(parser), "parse", "statements") if timings else parser
+        for statement in statements:
+            if timings:
+                timings.add_count("nodes", sum(1 for _ in walk(statement)))
+            if optimizer:
+                with phase(timings, "optimize"):
+                    optimizer.optimize(statement)
+            if coverage:
+                coverage.install(statement)
+            if counter is None and NodeCounter.referenced(statement):
+                counter = NodeCounter()
+                counter.install(statement, context.root_scope)
+            elif counter is not None:
+                counter.instrument(statement)
+            if profiler:
+                profiler.install(statement)
+            if metrics:
+                metrics.instrument(statement)
+            
+            with phase(timings, "evaluate"):
+                statement.evaluate(scope)
+            # the next statement may be a parse error reported on stderr, output comes out in order
+            with phase(timings, "flush"):
+                context.output.flush()
+            if scope.function_return_value[0]:
+                break
+        with phase(timings, "flush"):
+            context.output.close()
+    except RuntimeError as e:
+        context.output.close()
+        print(e, file=sys.stderr)
+        exit(runtime_error_exit_code(e))
+    except BaseException:
+        # a python error such as RecursionError still lets out what the program printed before it
+        context.output.close()
+        raise
+    finally:
+        if sampler:
+            sampler.stop()
+            report_samples(ns, sampler)
+        if metrics:
+            metrics.uninstall()
+            report_metrics(ns, metrics)
+        if profiler:
+            profiler.uninstall()
+            report_profile(ns, profiler)
+        if counter:
+            counter.uninstall()
+        if coverage:
+            coverage.uninstall()
+            report_coverage(ns, coverage)
+    
+    if optimizer and ns.optimization_report:
+        print(optimizer.report, file=sys.stderr)
+    if parser.error:
+        exit(65)
+
+def runtime_error_exit_code(error: Exception) -> int:
+    from .utils import BudgetExceededError, ModuleSyntaxError
+    
+    # EX_TEMPFAIL, the script may well succeed with a larger budget
+    if isinstance(error, BudgetExceededError):
+        return 75
+    # a module that does not parse fails like the program not parsing
+    return 65 if isinstance(error, ModuleSyntaxError) else 70
+
+
+def report_profile(ns: Namespace, profiler: 'Profiler') -> None:
+    import json
+    from .instrument import format_report, report_json
+    
+    print(format_report(profiler, ns.profile_top), file=sys.stderr)
+    if ns.profile_json:
+        with open(ns.profile_json, "w") as fd:
+            json.dump(report_json(profiler), fd, indent=2)
+
+
+def report_samples(ns: Namespace, sampler: 'SamplingProfiler') -> None:
+    with open(ns.sample, "w") as fd:
+        fd.write(sampler.collapsed())
+    print(f"{sampler.samples} samples written to {ns.sample}", file=sys.stderr)
+
+
+def report_metrics(ns: Namespace, metrics: 'RuntimeMetrics') -> None:
+    with open(ns.metrics, "w") as fd:
+        fd.write(metrics.to_openmetrics(ns.file))
+
+
+def report_coverage(ns: Namespace, coverage: 'Coverage') -> None:
+    import json
+    
+    with open(ns.coverage, "w") as fd:
+        json.dump(coverage.to_json(ns.file), fd)
+
+
+def forward_to_server(ns: Namespace) -> int:
+    from .server import request_server
+    
+    # the server parses the same command line, minus the forwarding itself
+    argv = sys.argv[1:]
+    index = argv.index("--server") if "--server" in argv else -1
+    if index >= 0:
+        del argv[index:index + 2]
+    else:
+        argv = [arg for arg in argv if not arg.startswith("--server=")]
+    
+    try:
+        return request_server(ns.server, argv)
+    except OSError as e:
+        print(f"can not reach the server at {ns.server}: {e}", file=sys.stderr)
+        return 1
+
+
+def serve(ns: Namespace) -> None:
+    import signal
+    from .server import LoxServer, SocketPathError
+    
+    try:
+        server = LoxServer(ns.socket, parse_args, ns.cache_size)
+    except (SocketPathError, OSError) as e:
+        print(f"can not serve: {e}", file=sys.stderr)
+        exit(1)
+    # a plain kill still removes the socket file
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"serving on {ns.socket}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def run_batch(ns: Namespace) -> None:
+    import json
+    from .batch import BatchRunner, collect_scripts, summarize
+    
+    scripts = collect_scripts(ns.source)
+    run_options = ["--no-optimize"] if ns.no_optimize else []
+    if ns.module_cache:
+        from .execution import ModuleLoader, ModuleCacheError
+        try:
+            # refused once here rather than by every script
+            ModuleLoader(cache_dir=ns.module_cache)
+        except ModuleCacheError as e:
+            print(f"can not use the module cache: {e}", file=sys.stderr)
+            exit(1)
+        run_options += ["--module-cache", ns.module_cache]
+    for name in ("max_steps", "max_time", "max_depth", "max_memory", "max_string"):
+        if getattr(ns, name) is not None:
+            run_options += ["--" + name.replace("_", "-"), str(getattr(ns, name))]
+    runner = BatchRunner(
+        parse_args, 
+        run_options, 
+        jobs=ns.jobs, 
+        timeout=ns.timeout, 
+        max_output=ns.max_output,
+        metrics_dir=ns.metrics_dir,
+        coverage_dir=ns.coverage_dir,
+    )
+    for directory in (ns.metrics_dir, ns.coverage_dir):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    start = perf_counter()
+    summary = summarize(runner.run(scripts), perf_counter() - start)
+    
+    if ns.summary:
+        with open(ns.summary, "w") as fd:
+            json.dump(summary, fd, indent=2)
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    print(
+        f"{summary['total']} scripts in {summary['elapsed']:.2f} s: " + 
+        ", ".join(f"{count} {status}" for status, count in sorted(summary["counts"].items())),
+        file=sys.stderr
+    )
+
+
+def coverage_report(ns: Namespace) -> None:
+    import json
+    from .instrument import format_summary, load_reports, merge_reports, to_lcov
+    
+    try:
+        merged = merge_reports(load_reports(ns.reports))
+    except (OSError, ValueError) as e:
+        print(f"can not read the coverage reports: {e}", file=sys.stderr)
+        exit(1)
+    
+    print(format_summary(merged))
+    if ns.json:
+        with open(ns.json, "w") as fd:
+            json.dump(merged, fd)
+    if ns.lcov:
+        with open(ns.lcov, "w") as fd:
+            fd.write(to_lcov(merged))
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,17 @@
+from .optimizer import optimize, OptimizationReport, IncrementalOptimizer
+from .dead_code import DeadCodeEliminator
+from .type_inference import TypeInference, StaticType
+from .loops import LoopOptimizer
+from .traversal import walk, child_expressions
+
+__all__ = [
+    optimize.__name__,
+    OptimizationReport.__name__,
+    IncrementalOptimizer.__name__,
+    DeadCodeEliminator.__name__,
+    TypeInference.__name__,
+    StaticType.__name__,
+    LoopOptimizer.__name__,
+    walk.__name__,
+    child_expressions.__name__,
+]
@@ -0,0 +1,181 @@
+import sys
+from collections import Counter
+from typing import Any, Optional
+
+from ..expressions import (
+    Expression,
+    AST,
+    LiteralExpression,
+    GroupExpression,
+    BangExpression,
+    IdentifierExpression,
+    IfExpression,
+    ElseExpression,
+    WhileExpression,
+    ForExpression,
+    FunctionDefinitionExpression,
+    NilLiteralExpression,
+)
+from ..expressions.expressions import ReturnExpression
+from .traversal import walk
+
+
+class DeadCodeEliminator:
+    """
+    Removes code that can never run or never be observed:
+      - if / while / for statements with a constant predicate,
+      - statements following an unconditional return in the same block,
+      - function declarations whose name is never looked up outside their own body.
+    Else branches are evaluated against a flag the preceding if leaves on the scope, so an if
+    with a constant predicate is only pruned when the rewritten statements leave every else
+    reading the same flag value.
+    """
+    def __init__(self, ast: Expression, remove_unused_functions: bool = True) -> None:
+        self.ast = ast
+        self.remove_unused_functions = remove_unused_functions
+        self.pruned_branches = 0
+        self.unreachable_statements = 0
+        self.unused_functions = 0
+        self.nodes_removed = 0
+        self.bytes_removed = 0
+
+    def run(self) -> None:
+        before = {id(node): node for node in walk(self.ast)}
+
+        for node in walk(self.ast):
+            if isinstance(node, AST):
+                node.children = self._prune_statements(node.children)
+        while self.remove_unused_functions and self._remove_unused_functions():
+            pass
+
+        after = {id(node) for node in walk(self.ast)}
+        removed = [node for key, node in before.items() if key not in after]
+        self.nodes_removed = len(removed)
+        self.bytes_removed = sum(sys.getsizeof(node) for node in removed)
+
+    def _prune_statements(self, children: list[Expression]) -> list[Expression]:
+        result: list[Expression] = []
+        i = 0
+        while i < len(children):
+            stmt = children[i]
+            replacement: Optional[list[Expression]] = None
+            consumed = 1
+
+            if isinstance(stmt, IfExpression):
+                rewritten = self._prune_if(children, i)
+                if rewritten is not None:
+                    replacement, consumed = rewritten
+            elif isinstance(stmt, WhileExpression) and _constant_predicate(stmt.predicates) is False:
+                replacement = []
+            elif isinstance(stmt, ForExpression) and _constant_predicate(stmt.predicates) is False:
+                replacement = [] if isinstance(stmt.initialization, NilLiteralExpression) else [stmt.initialization]
+
+            if replacement is None:
+                result.append(stmt)
+            else:
+                self.pruned_branches += 1
+                result.extend(replacement)
+            i += consumed
+
+            if result and _always_returns(result[-1]):
+                self.unreachable_statements += len(children) - i
+                break
+
+        return result
+
+    def _prune_if(self, children: list[Expression], i: int) -> Optional[tuple[list[Expression], int]]:
+        "statements replacing children[i:i + consumed], None to keep the if as it is"
+        stmt = children[i]
+        assert isinstance(stmt, IfExpression)
+        predicate = _constant_predicate(stmt.predicates)
+        if predicate is None:
+            return None
+
+        elses: list[ElseExpression] = []
+        for child in children[i + 1:]:
+            if not isinstance(child, ElseExpression):
+                break
+            elses.append(child)
+        # a later else still reads this if's flag unless another if resets it first
+        for child in children[i + 1 + len(elses):]:
+            if isinstance(child, IfExpression):
+                break
+            if isinstance(child, ElseExpression):
+                return None
+
+        if predicate:
+            # the body sets the flag itself, the else chain keeps reading it
+            if isinstance(stmt.expression, IfExpression):
+                return [stmt.expression], 1
+            if _sets_predicate_flag(stmt.expression):
+                return None
+            return [stmt.expression], 1 + len(elses)
+
+        if not elses:
+            return [], 1
+        if len(elses) == 1:
+            return [elses[0].expression], 2
+        if isinstance(elses[0].expression, IfExpression):
+            return [elses[0].expression], 2
+        return None
+
+    def _remove_unused_functions(self) -> bool:
+        references = Counter(
+            node.name.lexeme for node in walk(self.ast) if isinstance(node, IdentifierExpression)
+        )
+        changed = False
+        for node in walk(self.ast):
+            if not isinstance(node, AST):
+                continue
+            kept: list[Expression] = []
+            for child in node.children:
+                if isinstance(child, FunctionDefinitionExpression) and not _referenced_outside(child, references):
+                    self.unused_functions += 1
+                    changed = True
+                else:
+                    kept.append(child)
+            node.children = kept
+        return changed
+
+
+def _constant_predicate(expr: Expression) -> Optional[bool]:
+    "truthiness of a predicate that can be decided without running it, None otherwise"
+    value = _constant_value(expr)
+    if value is _NOT_CONSTANT:
+        return None
+    return not (value is None or value is False)
+
+
+_NOT_CONSTANT = object()
+
+
+def _constant_value(expr: Optional[Expression]) -> Any:
+    if isinstance(expr, LiteralExpression):
+        return expr.evaluate(None)  # type: ignore
+    if isinstance(expr, GroupExpression):
+        return _constant_value(expr.expr) if expr.expr else None
+    if isinstance(expr, BangExpression):
+        value = _constant_value(expr.right)
+        return value if value is _NOT_CONSTANT else (value is None or value is False)
+    return _NOT_CONSTANT
+
+
+def _sets_predicate_flag(stmt: Expression) -> bool:
+    # statements that may evaluate an if directly in the current scope
+    return isinstance(stmt, (IfExpression, ElseExpression, WhileExpression, ForExpression))
+
+
+def _always_returns(stmt: Expression) -> bool:
+    if isinstance(stmt, ReturnExpression):
+        return True
+    if isinstance(stmt, AST):
+        return any(_always_returns(child) for child in stmt.children)
+    return False
+
+
+def _referenced_outside(funcdef: FunctionDefinitionExpression, references: Counter[str]) -> bool:
+    inside = sum(
+        1 for node in walk(funcdef.body)
+        if isinstance(node, IdentifierExpression) and node.name.lexeme == funcdef.name
+    )
+    return references[funcdef.name] > inside
@@ -0,0 +1,185 @@
+from typing import Union
+
+from ..tokens import NilReservedWord
+from ..expressions import (
+    Expression,
+    LiteralExpression,
+    NumberLiteralExpression,
+    GroupExpression,
+    IdentifierExpression,
+    BangExpression,
+    AndExpression,
+    OrExpression,
+    EqualEqualExpression,
+    BangEqualExpression,
+    AssignExpression,
+    VarExpression,
+    WhileExpression,
+    ForExpression,
+    FunctionDefinitionExpression,
+    FunctionCallExpression,
+    ClassExpression,
+    NumericNegativeExpression,
+    NumericPlusExpression,
+    StringPlusExpression,
+    NumericMinusExpression,
+    NumericMultiplyExpression,
+    NumericDivideExpression,
+    NumericLessExpression,
+    NumericLessEqualExpression,
+    NumericGreaterExpression,
+    NumericGreaterEqualExpression,
+    LoopInvariantExpression,
+    IncrementExpression,
+)
+from .traversal import walk, transform_children
+from .type_inference import TypeInference, StaticType
+
+
+# operators that can neither fail nor have side effects once their operands are proven
+_SAFE_OPERATORS = (
+    NumericNegativeExpression,
+    BangExpression,
+    NumericPlusExpression,
+    StringPlusExpression,
+    NumericMinusExpression,
+    NumericMultiplyExpression,
+    NumericLessExpression,
+    NumericLessEqualExpression,
+    NumericGreaterExpression,
+    NumericGreaterEqualExpression,
+    EqualEqualExpression,
+    BangEqualExpression,
+    AndExpression,
+    OrExpression,
+)
+
+
+class LoopOptimizer:
+    """
+    Hoists loop invariant expressions and reduces induction variable steps, relies on the node
+    specialization and expression types produced by TypeInference.
+
+    Only loops without any call are touched: a call could both change variables behind the loop's
+    back and re-enter the loop, which would clobber the hoisted values kept on the nodes.
+    An expression is hoisted only if it can not fail, so evaluating it before the first iteration
+    (or when the loop runs zero times) is unobservable.
+    """
+    def __init__(self, types: TypeInference) -> None:
+        self.types = types
+        self.hoisted = 0
+        self.reduced = 0
+
+    def run(self) -> None:
+        for expr in walk(self.types.ast):
+            if isinstance(expr, (WhileExpression, ForExpression)):
+                self._optimize_loop(expr)
+
+    def _optimize_loop(self, loop: Union[WhileExpression, ForExpression]) -> None:
+        parts = _loop_parts(loop)
+        if any(isinstance(node, FunctionCallExpression) for part in parts for node in walk(part)):
+            return
+
+        variant = set[str]()
+        for part in parts:
+            variant |= _written_names(part)
+
+        def hoist(expr: Expression) -> Expression:
+            if isinstance(expr, (FunctionDefinitionExpression, ClassExpression)):
+                return expr
+            if isinstance(expr, (LoopInvariantExpression, IncrementExpression)):
+                # already rewritten by an enclosing loop, which evaluates the invariant before this loop
+                # ever runs: hoisting its inside again into this loop would leave it reading nil
+                return expr
+            if isinstance(expr, VarExpression):
+                # the declaration evaluates its assignment's right side directly
+                if expr.assignment:
+                    expr.assignment.right = hoist(expr.assignment.right)
+                return expr
+            if not _is_trivial(expr) and self._is_invariant(expr, variant):
+                invariant = LoopInvariantExpression(NilReservedWord(), expr, iter([]))
+                loop.invariants.append(invariant)
+                self.hoisted += 1
+                return invariant
+
+            if isinstance(expr, AssignExpression) and (step := _induction_step(expr)) is not None:
+                increment = IncrementExpression(NilReservedWord(), expr, iter([]))
+                increment._amount = step
+                self.reduced += 1
+                return increment
+
+            transform_children(expr, hoist)
+            return expr
+
+        if isinstance(loop, ForExpression):
+            loop.predicates = hoist(loop.predicates)
+            loop.expression = hoist(loop.expression)
+            loop.step = hoist(loop.step)
+        else:
+            loop.predicates = hoist(loop.predicates)
+            loop.expression = hoist(loop.expression)
+
+    def _is_invariant(self, expr: Expression, variant: set[str]) -> bool:
+        if isinstance(expr, (LiteralExpression, LoopInvariantExpression)):
+            return True
+        if isinstance(expr, IdentifierExpression):
+            # a known type also proves the variable is defined, so the lookup can not fail
+            return (
+                expr.name.lexeme not in variant and
+                self.types.type_of(expr) != StaticType.UNKNOWN
+            )
+        if isinstance(expr, GroupExpression):
+            return expr.expr is not None and self._is_invariant(expr.expr, variant)
+        if isinstance(expr, NumericDivideExpression):
+            # dividing by zero fails, so only literal non zero divisors are safe
+            return (
+                isinstance(expr.right, NumberLiteralExpression) and
+                expr.right.evaluate(None) != 0 and  # type: ignore
+                self._is_invariant(expr.left, variant)
+            )
+        if isinstance(expr, _SAFE_OPERATORS):
+            operands = [expr.right] if not hasattr(expr, "left") else [expr.left, expr.right]  # type: ignore
+            return all(self._is_invariant(operand, variant) for operand in operands)
+        return False
+
+
+def _loop_parts(loop: Union[WhileExpression, ForExpression]) -> list[Expression]:
+    if isinstance(loop, ForExpression):
+        return [loop.predicates, loop.expression, loop.step]
+    return [loop.predicates, loop.expression]
+
+
+def _written_names(expr: Expression) -> set[str]:
+    names = set[str]()
+    for node in walk(expr):
+        if isinstance(node, AssignExpression) and isinstance(node.left, IdentifierExpression):
+            names.add(node.left.name.lexeme)
+        elif isinstance(node, VarExpression):
+            names.add(node.identifier.name.lexeme)
+        elif isinstance(node, (FunctionDefinitionExpression, ClassExpression)):
+            names.add(node.name)
+        elif isinstance(node, IncrementExpression):
+            names.add(node._name)
+    return names
+
+
+def _is_trivial(expr: Expression) -> bool:
+    if isinstance(expr, GroupExpression):
+        return expr.expr is None or _is_trivial(expr.expr)
+    return isinstance(expr, (LiteralExpression, IdentifierExpression, LoopInvariantExpression))
+
+
+def _induction_step(expr: AssignExpression) -> Union[int, float, None]:
+    "the constant added by `i = i + c` or `i = i - c` on a proven number, None for anything else"
+    right = expr.right
+    if not (
+        isinstance(expr.left, IdentifierExpression) and
+        isinstance(right, (NumericPlusExpression, NumericMinusExpression)) and
+        isinstance(right.left, IdentifierExpression) and
+        right.left.name.lexeme == expr.left.name.lexeme and
+        isinstance(right.right, NumberLiteralExpression)
+    ):
+        return None
+
+    amount = right.right.evaluate(None)  # type: ignore
+    return -amount if isinstance(right, NumericMinusExpression) else amount
@@ -0,0 +1,101 @@
+from time import perf_counter
+from typing import Optional
+
+from ..expressions import AST, Expression
+from .dead_code import DeadCodeEliminator
+from .type_inference import TypeInference
+from .loops import LoopOptimizer
+
+
+class OptimizationReport:
+    def __init__(self) -> None:
+        self.pruned_branches = 0
+        self.unreachable_statements = 0
+        self.unused_functions = 0
+        self.nodes_removed = 0
+        self.bytes_removed = 0
+        self.specialized = 0
+        self.hoisted = 0
+        self.reduced = 0
+        self.elapsed = 0.0
+
+    def record(
+        self,
+        dead_code: DeadCodeEliminator,
+        types: TypeInference,
+        loops: LoopOptimizer,
+        elapsed: float,
+    ) -> None:
+        self.pruned_branches += dead_code.pruned_branches
+        self.unreachable_statements += dead_code.unreachable_statements
+        self.unused_functions += dead_code.unused_functions
+        self.nodes_removed += dead_code.nodes_removed
+        self.bytes_removed += dead_code.bytes_removed
+        self.specialized += types.specialized
+        self.hoisted += loops.hoisted
+        self.reduced += loops.reduced
+        self.elapsed += elapsed
+
+    def __str__(self) -> str:
+        return "\n".join([
+            f"dead code: {self.pruned_branches} constant branches pruned, "
+            f"{self.unreachable_statements} unreachable statements, "
+            f"{self.unused_functions} unused functions, "
+            f"{self.nodes_removed} nodes removed (~{self.bytes_removed / 1024:.1f} KiB)",
+            f"type inference: {self.specialized} nodes specialized",
+            f"loops: {self.hoisted} invariants hoisted, {self.reduced} induction steps reduced",
+            f"optimization time: {self.elapsed * 1000:.2f} ms",
+        ])
+
+
+def optimize(ast: AST, remove_unused_functions: bool = True, foreign_functions: bool = False) -> OptimizationReport:
+    """
+    remove_unused_functions=False keeps every function declaration, e.g. for coverage to report them.
+    foreign_functions tells the program may call functions it does not define, e.g. a prelude's.
+    """
+    report = OptimizationReport()
+    _run_passes(ast, report, remove_unused_functions=remove_unused_functions, foreign_functions=foreign_functions)
+    return report
+
+
+class IncrementalOptimizer:
+    """
+    Optimizes a program one top level statement at a time, as `run --stream` parses it.
+    No fact crosses a statement boundary and functions are never removed as unused, a later
+    statement may still call them. Names assigned inside function bodies accumulate over the
+    statements, since any function parsed so far may be called. So do the functions and classes
+    declared so far, and once a statement imports a module, later ones may call its functions.
+    """
+    def __init__(self, foreign_functions: bool = False) -> None:
+        self.report = OptimizationReport()
+        self.foreign_functions = foreign_functions
+        self._assigned_in_functions: set[str] = set()
+        self._declared_callables: set[str] = set()
+
+    def optimize(self, statement: Expression) -> None:
+        types = _run_passes(
+            statement, self.report, self._assigned_in_functions, 
+            foreign_functions=self.foreign_functions, declared_callables=self._declared_callables,
+        )
+        self.foreign_functions = types.foreign_functions
+
+
+def _run_passes(
+    ast: Expression,
+    report: OptimizationReport,
+    assigned_in_functions: Optional[set[str]] = None,
+    remove_unused_functions: bool = True,
+    foreign_functions: bool = False,
+    declared_callables: Optional[set[str]] = None,
+) -> TypeInference:
+    start = perf_counter()
+    dead_code = DeadCodeEliminator(
+        ast, remove_unused_functions=remove_unused_functions and assigned_in_functions is None
+    )
+    dead_code.run()
+    types = TypeInference(ast, assigned_in_functions, foreign_functions, declared_callables)
+    types.run()
+    loops = LoopOptimizer(types)
+    loops.run()
+    report.record(dead_code, types, loops, perf_counter() - start)
+    return types
@@ -0,0 +1,56 @@
+from functools import cache
+from typing import Callable, Iterator, Type
+
+from ..expressions import Expression
+
+
+@cache
+def _child_slots(cls: Type[Expression]) -> tuple[str, ...]:
+    # every node keeps its sub expressions in __slots__, underscore slots hold runtime caches
+    slots: list[str] = []
+    for klass in reversed(cls.__mro__):
+        declared = klass.__dict__.get("__slots__", ())
+        if isinstance(declared, str):
+            declared = (declared, )
+        for name in declared:
+            if not name.startswith("_") and name not in slots:
+                slots.append(name)
+    return tuple(slots)
+
+
+def child_expressions(expr: Expression) -> Iterator[Expression]:
+    for name in _child_slots(expr.__class__):
+        value = getattr(expr, name, None)
+        if isinstance(value, Expression):
+            yield value
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, Expression):
+                    yield item
+
+
+def walk(expr: Expression) -> Iterator[Expression]:
+    "pre-order walk, nodes shared by several parents (e.g. VarExpression.identifier) are yielded once"
+    seen: set[int] = set()
+    stack = [expr]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        stack.extend(reversed(list(child_expressions(current))))
+
+
+def transform_children(expr: Expression, transform: Callable[[Expression], Expression]) -> None:
+    "replaces every direct sub expression of expr by transform(sub expression)"
+    for name in _child_slots(expr.__class__):
+        value = getattr(expr, name, None)
+        if isinstance(value, Expression):
+            replaced = transform(value)
+            if replaced is not value:
+                setattr(expr, name, replaced)
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                if isinstance(item, Expression):
+                    value[i] = transform(item)
@@ -0,0 +1,378 @@
+from enum import Enum
+from typing import Optional, Type
+
+from ..expressions import (
+    Expression,
+    AST,
+    GroupExpression,
+    IdentifierExpression,
+    StringLiteralExpression,
+    NumberLiteralExpression,
+    BooleanLiteralExpression,
+    NilLiteralExpression,
+    NegativeExpression,
+    BangExpression,
+    PlusExpression,
+    MinusExpression,
+    MultiplyExpression,
+    DivideExpression,
+    AndExpression,
+    OrExpression,
+    EqualEqualExpression,
+    BangEqualExpression,
+    LessExpression,
+    LessEqualExpression,
+    GreaterExpression,
+    GreaterEqualExpression,
+    AssignExpression,
+    VarExpression,
+    IfExpression,
+    ElseExpression,
+    WhileExpression,
+    FunctionDefinitionExpression,
+    FunctionCallExpression,
+    ClassExpression,
+    GetExpression,
+    SuperExpression,
+    NumericNegativeExpression,
+    NumericPlusExpression,
+    StringPlusExpression,
+    NumericMinusExpression,
+    NumericMultiplyExpression,
+    NumericDivideExpression,
+    NumericLessExpression,
+    NumericLessEqualExpression,
+    NumericGreaterExpression,
+    NumericGreaterEqualExpression,
+)
+from ..expressions.expressions import PrintExpression, ForExpression, ReturnExpression, ImportExpression
+from .traversal import walk
+
+
+class StaticType(Enum):
+    NUMBER = "number"
+    STRING = "string"
+    BOOLEAN = "boolean"
+    NIL = "nil"
+    CALLABLE = "callable"
+    UNKNOWN = "unknown"
+
+
+def join(left: StaticType, right: StaticType) -> StaticType:
+    return left if left == right else StaticType.UNKNOWN
+
+
+_NUMERIC_SPECIALIZATION: dict[Type[Expression], Type[Expression]] = {
+    MinusExpression: NumericMinusExpression,
+    MultiplyExpression: NumericMultiplyExpression,
+    DivideExpression: NumericDivideExpression,
+    LessExpression: NumericLessExpression,
+    LessEqualExpression: NumericLessEqualExpression,
+    GreaterExpression: NumericGreaterExpression,
+    GreaterEqualExpression: NumericGreaterEqualExpression,
+}
+
+
+class TypeEnvironment:
+    "flow facts for variable names, a missing name means nothing is known about it"
+    def __init__(self) -> None:
+        self.facts: dict[str, StaticType] = {}
+        # per open block, the facts of outer variables shadowed by declarations in that block
+        self._shadowed: list[dict[str, Optional[StaticType]]] = [{}]
+
+    def lookup(self, name: str) -> StaticType:
+        return self.facts.get(name, StaticType.UNKNOWN)
+
+    def assign(self, name: str, static_type: StaticType) -> None:
+        if static_type == StaticType.UNKNOWN:
+            self.facts.pop(name, None)
+        else:
+            self.facts[name] = static_type
+
+    def declare(self, name: str, static_type: StaticType) -> None:
+        shadowed = self._shadowed[-1]
+        if name not in shadowed:
+            shadowed[name] = self.facts.get(name)
+        self.assign(name, static_type)
+
+    def kill(self, names: set[str]) -> None:
+        for name in names:
+            self.facts.pop(name, None)
+
+    def enter_block(self) -> None:
+        self._shadowed.append({})
+
+    def exit_block(self) -> None:
+        for name, previous in self._shadowed.pop().items():
+            if previous is None:
+                self.facts.pop(name, None)
+            else:
+                self.facts[name] = previous
+
+    def snapshot(self) -> dict[str, StaticType]:
+        return dict(self.facts)
+
+    def restore(self, facts: dict[str, StaticType]) -> None:
+        self.facts = dict(facts)
+
+    def join_with(self, facts: dict[str, StaticType]) -> None:
+        self.facts = {
+            name: static_type for name, static_type in self.facts.items()
+            if facts.get(name) == static_type
+        }
+
+
+class TypeInference:
+    """
+    Flow sensitive type inference over a parsed program.
+    Nodes whose operands are proven to be numbers (or strings for `+`) are swapped to their
+    check-free variants, everything else keeps the checked evaluate and its error messages.
+    Calls may run any function body, so they drop the facts of every name assigned inside one.
+    With foreign_functions, functions defined outside the tree (by a prelude or an imported module)
+    may be called too: a call whose callee is not a function or class declared in the tree drops
+    every fact, as does an import. A tree with an import always has foreign functions.
+    """
+    def __init__(
+        self,
+        ast: Expression,
+        assigned_in_functions: Optional[set[str]] = None,
+        foreign_functions: bool = False,
+        declared_callables: Optional[set[str]] = None,
+    ) -> None:
+        self.ast = ast
+        self.env = TypeEnvironment()
+        self.specialized = 0
+        self.expression_types: dict[int, StaticType] = {}
+        self._speculating = 0
+        self._analyzed_functions: set[int] = set()
+        # callers analyzing a program piecewise share this set between the pieces
+        self._assigned_in_functions = assigned_in_functions if assigned_in_functions is not None else set()
+        self._declared_callables = declared_callables if declared_callables is not None else set()
+        self.foreign_functions = foreign_functions
+        for expr in walk(ast):
+            if isinstance(expr, FunctionDefinitionExpression):
+                self._assigned_in_functions.update(_assigned_names(expr.body))
+                self._declared_callables.add(expr.name)
+            elif isinstance(expr, ClassExpression):
+                self._declared_callables.add(expr.name)
+            elif isinstance(expr, ImportExpression):
+                self.foreign_functions = True
+
+    def run(self) -> None:
+        self.infer(self.ast)
+
+    def type_of(self, expr: Expression) -> StaticType:
+        return self.expression_types.get(id(expr), StaticType.UNKNOWN)
+
+    def infer(self, expr: Expression) -> StaticType:
+        static_type = self._infer(expr)
+        if not self._speculating:
+            self.expression_types[id(expr)] = static_type
+        return static_type
+
+    def _specialize(self, expr: Expression, specialized_cls: Type[Expression]) -> None:
+        if not self._speculating and expr.__class__ is not specialized_cls:
+            expr.__class__ = specialized_cls
+            self.specialized += 1
+
+    def _infer(self, expr: Expression) -> StaticType:
+        if isinstance(expr, NumberLiteralExpression):
+            return StaticType.NUMBER
+        if isinstance(expr, StringLiteralExpression):
+            return StaticType.STRING
+        if isinstance(expr, BooleanLiteralExpression):
+            return StaticType.BOOLEAN
+        if isinstance(expr, NilLiteralExpression):
+            return StaticType.NIL
+        if isinstance(expr, GroupExpression):
+            return self.infer(expr.expr) if expr.expr else StaticType.NIL
+        if isinstance(expr, IdentifierExpression):
+            return self.env.lookup(expr.name.lexeme)
+
+        if isinstance(expr, NegativeExpression):
+            if self.infer(expr.right) == StaticType.NUMBER:
+                self._specialize(expr, NumericNegativeExpression)
+            return StaticType.NUMBER
+        if isinstance(expr, BangExpression):
+            self.infer(expr.right)
+            return StaticType.BOOLEAN
+
+        if isinstance(expr, (AndExpression, OrExpression)):
+            left_t = self.infer(expr.left)
+            after_left = self.env.snapshot()
+            right_t = self.infer(expr.right)
+            self.env.join_with(after_left)
+            if isinstance(expr, AndExpression):
+                return join(StaticType.BOOLEAN, right_t)
+            return join(left_t, right_t)
+        if isinstance(expr, AssignExpression):
+            return self._infer_assign(expr)
+        if isinstance(expr, PlusExpression):
+            return self._infer_plus(expr)
+        if isinstance(expr, tuple(_NUMERIC_SPECIALIZATION)):
+            return self._infer_numeric_binary(expr)
+        if isinstance(expr, (EqualEqualExpression, BangEqualExpression)):
+            self.infer(expr.left)
+            self.infer(expr.right)
+            return StaticType.BOOLEAN
+
+        if isinstance(expr, PrintExpression):
+            self.infer(expr.body)
+            return StaticType.NIL
+        if isinstance(expr, ReturnExpression):
+            self.infer(expr.body)
+            return StaticType.NIL
+        if isinstance(expr, VarExpression):
+            value_t = self.infer(expr.assignment.right) if expr.assignment else StaticType.NIL
+            self.env.declare(expr.identifier.name.lexeme, value_t)
+            return value_t
+        if isinstance(expr, IfExpression):
+            self.infer(expr.predicates)
+            self._infer_branch(expr.expression)
+            return StaticType.NIL
+        if isinstance(expr, ElseExpression):
+            self._infer_branch(expr.expression)
+            return StaticType.NIL
+        if isinstance(expr, WhileExpression):
+            self._infer_loop(expr.predicates, [expr.expression])
+            return StaticType.NIL
+        if isinstance(expr, ForExpression):
+            self.infer(expr.initialization)
+            self._infer_loop(expr.predicates, [expr.expression, expr.step])
+            return StaticType.NIL
+        if isinstance(expr, FunctionDefinitionExpression):
+            self.env.declare(expr.name, StaticType.CALLABLE)
+            self._infer_function(expr)
+            return StaticType.NIL
+        if isinstance(expr, ClassExpression):
+            if expr.superclass:
+                self.infer(expr.superclass)
+            self.env.declare(expr.name, StaticType.CALLABLE)
+            for method in expr.methods:
+                self._infer_function(method)
+            return StaticType.NIL
+        if isinstance(expr, GetExpression):
+            # fields are untyped, only the owner is analyzed
+            self.infer(expr.owner)
+            return StaticType.UNKNOWN
+        if isinstance(expr, SuperExpression):
+            return StaticType.UNKNOWN
+        if isinstance(expr, FunctionCallExpression):
+            if expr.identifier:
+                self.infer(expr.identifier)
+            for param in expr.call_parameters:
+                self.infer(param)
+            if self.foreign_functions and not self._calls_declared(expr):
+                # the callee may assign anything its own file can see
+                self.env.facts.clear()
+            else:
+                self.env.kill(self._assigned_in_functions)
+            return StaticType.UNKNOWN
+        if isinstance(expr, AST):
+            self.env.enter_block()
+            for child in expr.children:
+                self.infer(child)
+            self.env.exit_block()
+            return StaticType.NIL
+
+        # nothing is known about this node, assume it could have changed anything
+        self.env.facts.clear()
+        return StaticType.UNKNOWN
+
+    def _calls_declared(self, expr: FunctionCallExpression) -> bool:
+        callee = expr.identifier
+        while isinstance(callee, GroupExpression):
+            callee = callee.expr
+        return (
+            isinstance(callee, IdentifierExpression) and 
+            callee.name.lexeme in self._declared_callables
+        )
+
+    def _infer_plus(self, expr: PlusExpression) -> StaticType:
+        left_t = self.infer(expr.left)
+        right_t = self.infer(expr.right)
+        if left_t == right_t == StaticType.NUMBER:
+            self._specialize(expr, NumericPlusExpression)
+        elif left_t == right_t == StaticType.STRING:
+            self._specialize(expr, StringPlusExpression)
+
+        # if evaluation succeeded at all, one known operand decides the result
+        if StaticType.NUMBER in (left_t, right_t):
+            return StaticType.NUMBER
+        if StaticType.STRING in (left_t, right_t):
+            return StaticType.STRING
+        return StaticType.UNKNOWN
+
+    def _infer_numeric_binary(self, expr: Expression) -> StaticType:
+        assert isinstance(expr, (MinusExpression, MultiplyExpression, DivideExpression, LessExpression,
+                                 LessEqualExpression, GreaterExpression, GreaterEqualExpression))
+        left_t = self.infer(expr.left)
+        right_t = self.infer(expr.right)
+        if left_t == right_t == StaticType.NUMBER:
+            for generic_cls, specialized_cls in _NUMERIC_SPECIALIZATION.items():
+                if isinstance(expr, generic_cls):
+                    self._specialize(expr, specialized_cls)
+                    break
+
+        if isinstance(expr, (MinusExpression, MultiplyExpression, DivideExpression)):
+            return StaticType.NUMBER
+        return StaticType.BOOLEAN
+
+    def _infer_assign(self, expr: AssignExpression) -> StaticType:
+        if isinstance(expr.left, GetExpression):
+            # a field write evaluates its owner first and leaves every variable alone
+            self.infer(expr.left.owner)
+            return self.infer(expr.right)
+        value_t = self.infer(expr.right)
+        if isinstance(expr.left, IdentifierExpression):
+            self.env.assign(expr.left.name.lexeme, value_t)
+        elif isinstance(expr.left, VarExpression):
+            self.infer(expr.left)
+            self.env.assign(expr.left.identifier.name.lexeme, value_t)
+        else:
+            self.env.facts.clear()
+        return value_t
+
+    def _infer_branch(self, body: Expression) -> None:
+        before = self.env.snapshot()
+        self.infer(body)
+        self.env.join_with(before)
+
+    def _infer_loop(self, predicates: Expression, body: list[Expression]) -> None:
+        # iterate to a fixed point without touching the tree, the facts at the loop head
+        # must hold for every iteration before any node may be specialized
+        self._speculating += 1
+        while True:
+            head = self.env.snapshot()
+            self.infer(predicates)
+            for expr in body:
+                self.infer(expr)
+            self.env.join_with(head)
+            if self.env.facts == head:
+                break
+        self._speculating -= 1
+
+        self.infer(predicates)
+        after_predicates = self.env.snapshot()
+        for expr in body:
+            self.infer(expr)
+        self.env.restore(after_predicates)
+
+    def _infer_function(self, funcdef: FunctionDefinitionExpression) -> None:
+        # bodies see an unknown outer world, so they are analyzed once regardless of call site
+        if id(funcdef) in self._analyzed_functions:
+            return
+        self._analyzed_functions.add(id(funcdef))
+
+        outer_env, outer_speculating = self.env, self._speculating
+        self.env, self._speculating = TypeEnvironment(), 0
+        self.infer(funcdef.body)
+        self.env, self._speculating = outer_env, outer_speculating
+
+
+def _assigned_names(expr: Expression) -> set[str]:
+    return {
+        node.left.name.lexeme
+        for node in walk(expr)
+        if isinstance(node, AssignExpression) and isinstance(node.left, IdentifierExpression)
+    }
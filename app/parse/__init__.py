@@ -1,5 +1,6 @@
-from .parser import Parser
+from .parser import Parser, StreamingParser
 
 __all__ = [
-    Parser.__name__
+    Parser.__name__,
+    StreamingParser.__name__,
 ]
\ No newline at end of file
@@ -1,13 +1,14 @@
 import sys
-from typing import Iterator
+from typing import Iterator, Optional
 
 from ..utils import ParserBaseError
 from ..tokens import Tokenizer, EOFSymbol
 from ..expressions import RootAST, Expression
+from ..expressions.expressions import expression_from_iter_till_end
 
 class Parser:
-    def __init__(self, s:str) -> None:
-        self.tokenizer = Tokenizer(s)
+    def __init__(self, s:str, tokenizer: Optional[Tokenizer] = None) -> None:
+        self.tokenizer = tokenizer if tokenizer is not None else Tokenizer(s)
         self._error = False
         try:
             token_iter = iter(self.tokenizer)
@@ -26,3 +27,32 @@ class Parser:
     def __iter__(self) -> Iterator[Expression]:
         for exp in self.ast.children:
             yield exp
+
+
+class StreamingParser:
+    """
+    Parses a program one top level statement at a time, so each statement can run before the
+    rest of the file is even tokenized. Iteration stops at the first tokenize or parse error.
+    """
+    def __init__(self, s:str, tokenizer: Optional[Tokenizer] = None) -> None:
+        self.tokenizer = tokenizer if tokenizer is not None else Tokenizer(s)
+        self._error = False
+    
+    @property
+    def error(self) -> bool:
+        return self._error or self.tokenizer.error
+    
+    def __iter__(self) -> Iterator[Expression]:
+        token_iter = iter(self.tokenizer)
+        try:
+            for token in token_iter:
+                if isinstance(token, EOFSymbol) or self.tokenizer.error:
+                    return
+                statement = expression_from_iter_till_end(token, token_iter)
+                if self.tokenizer.error:
+                    return
+                yield statement
+        except ParserBaseError as e:
+            print(f"[line {self.tokenizer.line}] {e}", file=sys.stderr)
+            self._error = True
+
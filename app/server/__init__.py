@@ -0,0 +1,20 @@
+from typing import Any
+
+from .cache import ASTCache
+from .client import request_server
+
+
+def __getattr__(name: str) -> Any:
+    # the daemon pulls in socketserver and traceback, a client forwarding a request never needs them
+    if name in ("LoxServer", "SocketPathError"):
+        from . import daemon
+        return getattr(daemon, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    ASTCache.__name__,
+    "LoxServer",
+    "SocketPathError",
+    request_server.__name__,
+]
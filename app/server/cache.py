@@ -0,0 +1,66 @@
+from collections import OrderedDict
+import os
+from typing import TYPE_CHECKING, Callable, Hashable, Optional
+
+if TYPE_CHECKING:
+    from ..expressions import Expression
+
+
+class ASTCache:
+    """
+    Parsed programs kept warm between requests, keyed by path and parse variant.
+    An entry is reused while the file keeps its mtime and size, the least recently used
+    entry is evicted once the cache holds `capacity` programs.
+    Entries are kept as dump_tree text and every load hands out a tree of its own: a tree that ran
+    holds inline caches and hoisted values of that run, the next request must not see them.
+    """
+    def __init__(self, capacity: int = 256) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[int, int, str, str]] = OrderedDict()
+
+    def load(
+        self, path: str, variant: Hashable, parse: Callable[[], Optional['Expression']]
+    ) -> Optional['Expression']:
+        "the cached program for path, parse() on a miss, None results (parse errors) are not kept"
+        def parse_reported() -> Optional[tuple['Expression', str]]:
+            tree = parse()
+            return None if tree is None else (tree, "")
+
+        loaded = self.load_reported(path, variant, parse_reported)
+        return None if loaded is None else loaded[0]
+
+    def load_reported(
+        self, path: str, variant: Hashable, parse: Callable[[], Optional[tuple['Expression', str]]]
+    ) -> Optional[tuple['Expression', str]]:
+        "like load for a parse() that also returns its report, e.g. the optimizer's, kept with the tree"
+        from ..expressions.serialize import TreeFormatError, dump_tree, load_tree
+
+        stat = os.stat(path)
+        key = (os.path.realpath(path), variant)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return load_tree(entry[2]), entry[3]
+
+        self.misses += 1
+        parsed = parse()
+        if parsed is None:
+            self._entries.pop(key, None)
+            return None
+        try:
+            # written before the tree runs, the text never holds the state of a run
+            text = dump_tree(parsed[0])
+        except TreeFormatError:
+            self._entries.pop(key, None)
+            return parsed
+        self._entries[key] = (stat.st_mtime_ns, stat.st_size, text, parsed[1])
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return parsed
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,20 @@
+import os
+import socket
+import sys
+
+from .protocol import read_message, send_message
+
+
+def request_server(socket_path: str, argv: list[str]) -> int:
+    "runs argv on the server listening at socket_path, relays its output and returns its exit code"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        with connection.makefile("rwb") as stream:
+            send_message(stream, {"cwd": os.getcwd(), "argv": argv})
+            while True:
+                message = read_message(stream)
+                if "exit" in message:
+                    return message["exit"]
+                target = sys.stdout if message["stream"] == "stdout" else sys.stderr
+                target.write(message["data"])
+                target.flush()
@@ -0,0 +1,131 @@
+from argparse import Namespace
+from contextlib import redirect_stderr, redirect_stdout
+import io
+import os
+import socket
+import socketserver
+import stat
+import sys
+import traceback
+from typing import Any, BinaryIO, Callable
+
+from .cache import ASTCache
+from .protocol import read_message, send_message
+
+
+class SocketPathError(Exception):
+    "the socket path is taken by a live server or by something that is not a socket"
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    "unlinks the socket a server that is gone left behind, anything else at the path is left alone"
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise SocketPathError(f"{socket_path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.unlink(socket_path)
+        return
+    except OSError as e:
+        raise SocketPathError(f"{socket_path} can not be checked: {e.strerror or e}")
+    finally:
+        probe.close()
+    raise SocketPathError(f"a server is already serving on {socket_path}")
+
+
+class _ForwardedStream(io.TextIOBase):
+    "text stream replacing stdout / stderr during a request, flushes become protocol messages"
+    def __init__(self, wfile: BinaryIO, name: str) -> None:
+        self._wfile = wfile
+        self._name = name
+        self._parts: list[str] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:  # type: ignore
+        self._parts.append(text)
+        return len(text)
+
+    def flush(self) -> None:
+        if self._parts:
+            send_message(self._wfile, {"stream": self._name, "data": "".join(self._parts)})
+            self._parts = []
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: 'LoxServer'
+
+    def handle(self) -> None:
+        request = read_message(self.rfile)
+        stdout = _ForwardedStream(self.wfile, "stdout")
+        stderr = _ForwardedStream(self.wfile, "stderr")
+        code: Any = 0
+
+        cwd = os.getcwd()
+        stdin = sys.stdin
+        try:
+            os.chdir(request["cwd"])
+            # scripts have no terminal to read from
+            sys.stdin = io.StringIO("")
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                try:
+                    self.server.run_request(request["argv"])
+                except SystemExit as e:
+                    code = e.code
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+                stdout.flush()
+                stderr.flush()
+        finally:
+            sys.stdin = stdin
+            os.chdir(cwd)
+
+        if code is None:
+            code = 0
+        elif not isinstance(code, int):
+            send_message(self.wfile, {"stream": "stderr", "data": f"{code}\n"})
+            code = 1
+        send_message(self.wfile, {"exit": code})
+
+
+class LoxServer(socketserver.UnixStreamServer):
+    """
+    Long lived interpreter serving `run` / `evaluate` requests over a Unix socket.
+    Requests are handled one at a time in this process: the parsed (and optimized) programs stay
+    cached between requests, every request still executes in a fresh ExecutionContext.
+    """
+    def __init__(
+        self,
+        socket_path: str,
+        parse_args: Callable[[list[str]], Namespace],
+        cache_size: int = 256,
+    ) -> None:
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+        self.socket_path = socket_path
+        self.parse_args = parse_args
+        self.cache = ASTCache(cache_size)
+
+    def run_request(self, argv: list[str]) -> None:
+        ns = self.parse_args(argv)
+        if getattr(ns, "server", None):
+            raise SystemExit("requests can not be forwarded again")
+        if not hasattr(ns, "ast_cache"):
+            raise SystemExit(f"{argv[0] if argv else 'request'} is not served, only run and evaluate are")
+        ns.ast_cache = self.cache
+        ns.entry(ns)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            if stat.S_ISSOCK(os.lstat(self.socket_path).st_mode):
+                os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
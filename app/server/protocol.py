@@ -0,0 +1,20 @@
+"""
+Line delimited JSON over a Unix stream socket.
+The client sends one request `{"cwd": ..., "argv": [...]}`, argv being the command line it would
+have run locally. The server answers with any number of `{"stream": "stdout" | "stderr", "data": ...}`
+messages followed by a single `{"exit": code}`.
+"""
+import json
+from typing import Any, BinaryIO
+
+
+def send_message(stream: BinaryIO, message: dict[str, Any]) -> None:
+    stream.write(json.dumps(message).encode() + b"\n")
+    stream.flush()
+
+
+def read_message(stream: BinaryIO) -> dict[str, Any]:
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("connection closed before the exit code was sent")
+    return json.loads(line)
@@ -0,0 +1,30 @@
+from .clocks import CLOCK_FUNCTIONS
+from .arrays import LoxArray, ARRAY_FUNCTIONS
+from .maps import LoxMap, MAP_FUNCTIONS
+from .maths import MATH_FUNCTIONS
+from .strings import STRING_FUNCTIONS
+from .streams import IO_FUNCTIONS
+
+
+# every native function installed in the root scope
+BUILT_IN_FUNCTIONS = [
+    *CLOCK_FUNCTIONS,
+    *ARRAY_FUNCTIONS,
+    *MAP_FUNCTIONS,
+    *MATH_FUNCTIONS,
+    *STRING_FUNCTIONS,
+    *IO_FUNCTIONS,
+]
+
+
+__all__ = [
+    LoxArray.__name__,
+    LoxMap.__name__,
+    "CLOCK_FUNCTIONS",
+    "ARRAY_FUNCTIONS",
+    "MAP_FUNCTIONS",
+    "MATH_FUNCTIONS",
+    "STRING_FUNCTIONS",
+    "IO_FUNCTIONS",
+    "BUILT_IN_FUNCTIONS",
+]
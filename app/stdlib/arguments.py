@@ -0,0 +1,25 @@
+from typing import Any
+
+from ..expressions import Rope
+from ..utils import ArgumentTypeError
+
+
+def checked_number(function: str, value: Any) -> float:
+    if value.__class__ is not float:
+        raise ArgumentTypeError(function, "a number")
+    return value
+
+
+def checked_count(function: str, value: Any) -> int:
+    "a non negative integral number, as used for sizes and positions"
+    if value.__class__ is not float or not value.is_integer() or value < 0:
+        raise ArgumentTypeError(function, "a non negative integral number")
+    return int(value)
+
+
+def checked_string(function: str, value: Any) -> str:
+    if value.__class__ is str:
+        return value
+    if value.__class__ is Rope:
+        return value.flatten()
+    raise ArgumentTypeError(function, "a string")
@@ -0,0 +1,141 @@
+from array import array
+from itertools import repeat
+import operator
+from typing import TYPE_CHECKING, Any, Callable, Union
+
+from ..expressions import NativeFunction, divide, stringify
+from ..utils import ArrayIndexError, ArgumentTypeError, OutOfMemoryError
+from .arguments import checked_count
+
+if TYPE_CHECKING:
+    from ..execution import ExecutionContext
+
+
+class LoxArray:
+    """
+    Lox list value.
+    Elements are packed doubles while every element is a number, so the bulk builtins run as C loops
+    over the buffer. Storing anything else switches the array to a python list for good.
+    """
+    __slots__ = ["items"]
+    items: Union['array[float]', list[Any]]
+
+    def __init__(self, items: Union['array[float]', list[Any]]) -> None:
+        self.items = items
+
+    @property
+    def numeric(self) -> bool:
+        return self.items.__class__ is array
+
+    def get(self, index: int) -> Any:
+        return self.items[index]
+
+    def set(self, index: int, value: Any) -> Any:
+        if value.__class__ is not float and self.numeric:
+            self.items = list(self.items)
+        self.items[index] = value
+        return value
+
+    def push(self, value: Any) -> None:
+        if value.__class__ is not float and self.numeric:
+            self.items = list(self.items)
+        self.items.append(value)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __str__(self) -> str:
+        return "[" + ", ".join(stringify(item) for item in self.items) + "]"
+
+
+def _checked_index(function: str, arr: LoxArray, index: Any) -> int:
+    if index.__class__ is not float or not index.is_integer():
+        raise ArgumentTypeError(function, "an integral index")
+    if not 0 <= index < len(arr.items):
+        raise ArrayIndexError()
+    return int(index)
+
+
+def _checked_array(function: str, value: Any) -> LoxArray:
+    if value.__class__ is not LoxArray:
+        raise ArgumentTypeError(function, "an array")
+    return value
+
+
+# *********************************************** Builtins ***********************************************
+def array_new(context: 'ExecutionContext', size: Any) -> LoxArray:
+    count = checked_count("array", size)
+    if context.budget is not None:
+        context.budget.check_allocation(8 * count)
+    try:
+        return LoxArray(array("d", bytes(8 * count)))
+    except (MemoryError, OverflowError):
+        # more than the machine has, or than an index can count
+        raise OutOfMemoryError("array")
+
+
+def array_get(arr: Any, index: Any) -> Any:
+    arr = _checked_array("array_get", arr)
+    return arr.get(_checked_index("array_get", arr, index))
+
+
+def array_set(arr: Any, index: Any, value: Any) -> Any:
+    arr = _checked_array("array_set", arr)
+    return arr.set(_checked_index("array_set", arr, index), value)
+
+
+def array_length(arr: Any) -> float:
+    return float(len(_checked_array("array_length", arr)))
+
+
+def array_push(arr: Any, value: Any) -> None:
+    _checked_array("array_push", arr).push(value)
+
+
+def array_sum(arr: Any) -> float:
+    arr = _checked_array("array_sum", arr)
+    if not arr.numeric:
+        raise ArgumentTypeError("array_sum", "an array of numbers")
+    return sum(arr.items, 0.0)
+
+
+_NATIVE_OPERATORS: dict[str, Callable[[float, float], float]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+
+
+def array_map(arr: Any, op: Any, operand: Any) -> LoxArray:
+    "applies `element op operand` to every element, op is one of + - * /"
+    arr = _checked_array("array_map", arr)
+    if not arr.numeric or operand.__class__ is not float:
+        raise ArgumentTypeError("array_map", "an array of numbers and a number operand")
+    function = _NATIVE_OPERATORS.get(str(op))
+    if function is None:
+        raise ArgumentTypeError("array_map", "one of the operators + - * /")
+    if function is operator.truediv and operand == 0:
+        # python refuses to divide by zero, fall back to the interpreter's IEEE division
+        function = divide
+    return LoxArray(array("d", map(function, arr.items, repeat(operand))))
+
+
+def array_slice(arr: Any, start: Any, end: Any) -> LoxArray:
+    arr = _checked_array("array_slice", arr)
+    begin, stop = checked_count("array_slice", start), checked_count("array_slice", end)
+    if not begin <= stop <= len(arr.items):
+        raise ArrayIndexError()
+    return LoxArray(arr.items[begin:stop])
+
+
+ARRAY_FUNCTIONS: list[NativeFunction] = [
+    NativeFunction("array", 1, array_new, takes_context=True),
+    NativeFunction("array_get", 2, array_get),
+    NativeFunction("array_set", 3, array_set),
+    NativeFunction("array_length", 1, array_length),
+    NativeFunction("array_push", 2, array_push),
+    NativeFunction("array_sum", 1, array_sum),
+    NativeFunction("array_map", 3, array_map),
+    NativeFunction("array_slice", 3, array_slice),
+]
@@ -0,0 +1,13 @@
+from time import perf_counter_ns, process_time, time
+
+from ..expressions import NativeFunction
+
+
+CLOCK_FUNCTIONS: list[NativeFunction] = [
+    # wall clock seconds, kept at the one second resolution Lox scripts expect
+    NativeFunction("clock", 0, lambda: float(int(time()))),
+    # monotonic, for timing code from inside a script
+    NativeFunction("clock_ns", 0, lambda: float(perf_counter_ns())),
+    # seconds of CPU time used by the interpreter process
+    NativeFunction("cpu_clock", 0, process_time),
+]
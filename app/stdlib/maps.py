@@ -0,0 +1,108 @@
+from array import array
+from typing import Any
+
+from ..expressions import NativeFunction, Rope, stringify
+from ..utils import ArgumentTypeError
+from .arrays import LoxArray
+
+
+class _BooleanKey:
+    "python hashes True like 1.0, Lox booleans get keys of their own"
+    __slots__ = ["value"]
+    def __init__(self, value: bool) -> None:
+        self.value = value
+
+
+TRUE_KEY = _BooleanKey(True)
+FALSE_KEY = _BooleanKey(False)
+
+
+class LoxMap:
+    "Lox hash map value, a python dict keyed by numbers, strings, booleans and nil"
+    __slots__ = ["entries"]
+    entries: dict[Any, Any]
+
+    def __init__(self) -> None:
+        self.entries = {}
+
+    def keys(self) -> list[Any]:
+        return [key.value if key.__class__ is _BooleanKey else key for key in self.entries]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __str__(self) -> str:
+        return "{" + ", ".join(
+            f"{stringify(key)}: {stringify(value)}" for key, value in zip(self.keys(), self.entries.values())
+        ) + "}"
+
+
+def _checked_key(function: str, key: Any) -> Any:
+    cls = key.__class__
+    if cls is float or cls is str or key is None:
+        return key
+    if cls is Rope:
+        return key.flatten()
+    if key is True:
+        return TRUE_KEY
+    if key is False:
+        return FALSE_KEY
+    raise ArgumentTypeError(function, "a number, string, boolean or nil key")
+
+
+def _checked_map(function: str, value: Any) -> LoxMap:
+    if value.__class__ is not LoxMap:
+        raise ArgumentTypeError(function, "a map")
+    return value
+
+
+# *********************************************** Builtins ***********************************************
+def map_new() -> LoxMap:
+    return LoxMap()
+
+
+def map_get(m: Any, key: Any) -> Any:
+    "the value stored under key, nil when there is none"
+    return _checked_map("map_get", m).entries.get(_checked_key("map_get", key))
+
+
+def map_set(m: Any, key: Any, value: Any) -> Any:
+    _checked_map("map_set", m).entries[_checked_key("map_set", key)] = value
+    return value
+
+
+def map_has(m: Any, key: Any) -> bool:
+    return _checked_key("map_has", key) in _checked_map("map_has", m).entries
+
+
+def map_delete(m: Any, key: Any) -> bool:
+    "removes key, false when it was not there"
+    entries = _checked_map("map_delete", m).entries
+    key = _checked_key("map_delete", key)
+    if key not in entries:
+        return False
+    del entries[key]
+    return True
+
+
+def map_size(m: Any) -> float:
+    return float(len(_checked_map("map_size", m)))
+
+
+def map_keys(m: Any) -> LoxArray:
+    "the keys in insertion order, as an array to iterate with the array builtins"
+    keys = _checked_map("map_keys", m).keys()
+    if all(key.__class__ is float for key in keys):
+        return LoxArray(array("d", keys))
+    return LoxArray(keys)
+
+
+MAP_FUNCTIONS: list[NativeFunction] = [
+    NativeFunction("map", 0, map_new),
+    NativeFunction("map_get", 2, map_get),
+    NativeFunction("map_set", 3, map_set),
+    NativeFunction("map_has", 2, map_has),
+    NativeFunction("map_delete", 2, map_delete),
+    NativeFunction("map_size", 1, map_size),
+    NativeFunction("map_keys", 1, map_keys),
+]
@@ -0,0 +1,58 @@
+import math
+import random
+from typing import Callable
+
+from ..expressions import NativeFunction
+from .arguments import checked_number
+
+
+def _ieee(function: Callable[..., float]) -> Callable[..., float]:
+    "python raises where IEEE 754 answers NaN or infinity, Lox answers like IEEE"
+    def wrapped(*args: float) -> float:
+        try:
+            return float(function(*args))
+        except ValueError:
+            return math.nan
+        except OverflowError:
+            return math.inf
+    return wrapped
+
+
+def _pow(x: float, y: float) -> float:
+    try:
+        return math.pow(x, y)
+    except OverflowError:
+        # an odd integral power keeps the sign of its base, the only way an overflow goes negative
+        odd = y.is_integer() and y % 2 == 1
+        return math.copysign(math.inf, x) if odd else math.inf
+
+
+def _unary(name: str, function: Callable[[float], float]) -> NativeFunction:
+    function = _ieee(function)
+    return NativeFunction(name, 1, lambda x: function(checked_number(name, x)))
+
+
+def _binary(name: str, function: Callable[[float, float], float]) -> NativeFunction:
+    function = _ieee(function)
+    return NativeFunction(name, 2, lambda x, y: function(checked_number(name, x), checked_number(name, y)))
+
+
+def _rounding(function: Callable[[float], int]) -> Callable[[float], float]:
+    # infinities and NaN are already integral, math.floor would refuse them
+    return lambda x: x if not math.isfinite(x) else float(function(x))
+
+
+MATH_FUNCTIONS: list[NativeFunction] = [
+    _unary("abs", abs),
+    _unary("floor", _rounding(math.floor)),
+    _unary("ceil", _rounding(math.ceil)),
+    _unary("sqrt", math.sqrt),
+    _unary("exp", math.exp),
+    _unary("log", lambda x: -math.inf if x == 0 else math.log(x)),
+    _unary("sin", math.sin),
+    _unary("cos", math.cos),
+    _binary("pow", _pow),
+    _binary("min", min),
+    _binary("max", max),
+    NativeFunction("random", 0, random.random),
+]
@@ -0,0 +1,60 @@
+import os
+import sys
+from typing import TYPE_CHECKING, Any, Optional
+
+from ..expressions import NativeFunction, stringify
+from ..utils import NativeIOError
+from .arguments import checked_string
+
+if TYPE_CHECKING:
+    from ..execution import ExecutionContext
+
+
+def read_line(context: 'ExecutionContext') -> Optional[str]:
+    "the next line of stdin without its line break, nil at the end of input"
+    # whatever the program printed so far may be the prompt for this line
+    context.output.flush()
+    budget = context.budget
+    if budget is None or budget.max_string is None:
+        line = sys.stdin.readline()
+    else:
+        # never reads past the limit, the line break and the one character telling the line is longer
+        line = sys.stdin.readline(budget.max_string + 2)
+        budget.check_string(len(line.rstrip("\n")))
+    if not line:
+        return None
+    return line.rstrip("\n")
+
+
+def write(context: 'ExecutionContext', value: Any) -> None:
+    "print without the trailing line break"
+    context.output.write(stringify(value))
+
+
+def read_file(context: 'ExecutionContext', path: Any) -> str:
+    try:
+        with open(checked_string("read_file", path)) as fd:
+            if context.budget is not None:
+                # a character takes at least a byte, the size bounds the length before reading
+                context.budget.check_string(os.fstat(fd.fileno()).st_size)
+            return fd.read()
+    except OSError as e:
+        raise NativeIOError("read_file", e.strerror or str(e))
+    except UnicodeDecodeError:
+        raise NativeIOError("read_file", "not a text file")
+
+
+def write_file(path: Any, content: Any) -> None:
+    try:
+        with open(checked_string("write_file", path), "w") as fd:
+            fd.write(stringify(content))
+    except OSError as e:
+        raise NativeIOError("write_file", e.strerror or str(e))
+
+
+IO_FUNCTIONS: list[NativeFunction] = [
+    NativeFunction("read_line", 0, read_line, takes_context=True),
+    NativeFunction("write", 1, write, takes_context=True),
+    NativeFunction("read_file", 1, read_file, takes_context=True),
+    NativeFunction("write_file", 2, write_file),
+]
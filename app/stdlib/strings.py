@@ -0,0 +1,67 @@
+import re
+from typing import TYPE_CHECKING, Any, Optional
+
+from ..expressions import NativeFunction, stringify
+from ..utils import ArgumentTypeError, StringIndexError
+from .arguments import checked_count, checked_number, checked_string
+
+if TYPE_CHECKING:
+    from ..execution import ExecutionContext
+
+
+# the same syntax the tokenizer accepts for number literals, with an optional sign,
+# compiled by the re cache on first use rather than on every interpreter start
+_NUMBER = r"\s*-?[0-9]+(\.[0-9]+)?\s*"
+
+
+def string_length(s: Any) -> float:
+    return float(len(checked_string("len", s)))
+
+
+def substring(s: Any, start: Any, end: Any) -> str:
+    "characters start (included) to end (excluded)"
+    text = checked_string("substring", s)
+    begin, stop = checked_count("substring", start), checked_count("substring", end)
+    if not begin <= stop <= len(text):
+        raise StringIndexError()
+    return text[begin:stop]
+
+
+def char_code(s: Any, index: Any) -> float:
+    text = checked_string("char_code", s)
+    i = checked_count("char_code", index)
+    if i >= len(text):
+        raise StringIndexError()
+    return float(ord(text[i]))
+
+
+def from_char_code(code: Any) -> str:
+    value = checked_number("from_char_code", code)
+    if not value.is_integer() or not 0 <= value <= 0x10FFFF:
+        raise ArgumentTypeError("from_char_code", "a unicode code point")
+    return chr(int(value))
+
+
+def to_number(s: Any) -> Optional[float]:
+    "the number spelled by s, nil when s is not a number"
+    text = checked_string("to_number", s)
+    if not re.fullmatch(_NUMBER, text):
+        return None
+    return float(text)
+
+
+def to_string(context: 'ExecutionContext', value: Any) -> str:
+    text = stringify(value)
+    if context.budget is not None:
+        context.budget.check_string(len(text))
+    return text
+
+
+STRING_FUNCTIONS: list[NativeFunction] = [
+    NativeFunction("len", 1, string_length),
+    NativeFunction("substring", 3, substring),
+    NativeFunction("char_code", 2, char_code),
+    NativeFunction("from_char_code", 1, from_char_code),
+    NativeFunction("to_number", 1, to_number),
+    NativeFunction("to_string", 1, to_string, takes_context=True),
+]
@@ -45,4 +45,5 @@ __all__=[
     TrueReservedWord.__name__,
     VarReservedWord.__name__,
     WhileReservedWord.__name__,
+    ImportReservedWord.__name__,
 ]
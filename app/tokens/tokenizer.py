@@ -22,13 +22,19 @@ class Tokenizer:
             
             if self.__forward_until_next_valid():
                 continue
+            line = self.line
             try:
-                yield Token.from_iter(self.cp)
+                token = Token.from_iter(self.cp)
             except TokenizerBaseError as e:
                 self.error = True
                 print(f"[line {self.line}] {e}", file=sys.stderr)
+                continue
+            token.line = line
+            yield token
                 
-        yield EOFSymbol()
+        eof = EOFSymbol()
+        eof.line = self.line
+        yield eof
         
     # return value: consumed any characters
     def __forward_until_next_valid(self) -> bool:
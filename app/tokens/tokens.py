@@ -1,18 +1,20 @@
 
 from abc import ABC
-from typing import Type, Union, cast
+from typing import Type, cast
 
 from ..utils import UnexpectedCharacterError, UnterminatedStringError
 from .character_provider import CharacterProvider
 
 class Token(ABC):
-    __slots__ = ["literal", "token_type", "lexeme"]
+    # line is set by the Tokenizer, tokens made up by the parser or the optimizer have none
+    __slots__ = ["literal", "token_type", "lexeme", "line"]
     _type2symbol_class: dict[str, Type['Symbol']] = {}
     _type2reserved_class: dict[str, Type['ReservedWord']] = {}
 
     token_type: str
     lexeme: str
     literal: str
+    line: int
     
     @staticmethod
     def is_symbol(cp: CharacterProvider) -> bool:
@@ -107,10 +109,18 @@ class StringLiteral(Token):
 
 
 class NumberLiteral(Token):
+    __slots__ = ["value"]
     token_type = "NUMBER"
-    def __init__(self, str_expression: str, value: Union[int, float]) -> None:
+    value: float
+
+    def __init__(self, str_expression: str, value: float) -> None:
         self.lexeme = str_expression
-        self.literal = str(float(value))
+        self.value = value
+
+    @property  # type: ignore
+    def literal(self) -> str:
+        # only the tokenize output needs the formatted literal
+        return str(self.value)
     
     @classmethod
     def from_iter(cls, cp: CharacterProvider) -> "NumberLiteral":
@@ -122,7 +132,7 @@ class NumberLiteral(Token):
             num += cp.forward()
             
         if cp.top() != ".":
-            return NumberLiteral(num, int(num))
+            return NumberLiteral(num, float(num))
         
         num += cp.forward() # "."
         
@@ -310,3 +320,7 @@ class WhileReservedWord(ReservedWord):
     token_type = "WHILE"
     lexeme = "while"
 
+class ImportReservedWord(ReservedWord):
+    token_type = "IMPORT"
+    lexeme = "import"
+
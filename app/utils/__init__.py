@@ -8,6 +8,20 @@ __all__=[
     UndefinedVariableError.__name__,
     MissingScopeExpressionError.__name__,
     FunctionScopeExpressionError, __name__,
+    ImportPathError.__name__,
     NotCallableError.__name__,
     ArgumentsNotMatchError.__name__,
+    NotInstanceError.__name__,
+    NotInstanceFieldError.__name__,
+    UndefinedPropertyError.__name__,
+    SuperclassNotClassError.__name__,
+    ArrayIndexError.__name__,
+    ArgumentTypeError.__name__,
+    StringIndexError.__name__,
+    OutOfMemoryError.__name__,
+    StackOverflowError.__name__,
+    NativeIOError.__name__,
+    BudgetExceededError.__name__,
+    ModuleLoadError.__name__,
+    ModuleSyntaxError.__name__,
 ]
@@ -46,6 +46,13 @@ class FunctionScopeExpressionError(ParserBaseError):
     def __str__(self):
         return super().__str__() + "Expect '{' before function body."
 
+class ImportPathError(ParserBaseError):
+    def __init__(self, token: 'Token') -> None:
+        self.token = token
+        
+    def __str__(self) -> str:
+        return super().__str__() + f"Error at '{self.token.lexeme}': Expect module path string."
+
 class RuntimeError(BaseError):
     msg: str = "General RuntimeError"
     def __init__(self) -> None:
@@ -75,3 +82,59 @@ class ArgumentsNotMatchError(RuntimeError):
     def __init__(self, expected: int, got: int) -> None:
         super().__init__()
         self.msg = f"Expected {expected} arguments but got {got}."
+
+class NotInstanceError(RuntimeError):
+    msg = "Only instances have properties."
+
+class NotInstanceFieldError(RuntimeError):
+    msg = "Only instances have fields."
+
+class UndefinedPropertyError(RuntimeError):
+    def __init__(self, name: str) -> None:
+        super().__init__()
+        self.msg = f"Undefined property '{name}'."
+
+class SuperclassNotClassError(RuntimeError):
+    msg = "Superclass must be a class."
+
+class ArrayIndexError(RuntimeError):
+    msg = "Array index out of range."
+
+class ArgumentTypeError(RuntimeError):
+    def __init__(self, function: str, expected: str) -> None:
+        super().__init__()
+        self.msg = f"{function}() expects {expected}."
+
+class StringIndexError(RuntimeError):
+    msg = "String index out of range."
+
+class OutOfMemoryError(RuntimeError):
+    def __init__(self, function: str) -> None:
+        super().__init__()
+        self.msg = f"{function}() ran out of memory."
+
+class StackOverflowError(RuntimeError):
+    msg = "Stack overflow."
+
+class NativeIOError(RuntimeError):
+    def __init__(self, function: str, reason: str) -> None:
+        super().__init__()
+        self.msg = f"{function}() failed: {reason}."
+
+class BudgetExceededError(RuntimeError):
+    "a limit of the execution budget was hit, reported with its own exit code"
+    def __init__(self, limit: str, detail: str) -> None:
+        super().__init__()
+        self.limit = limit
+        self.msg = f"Execution budget exceeded: {detail}."
+
+class ModuleLoadError(RuntimeError):
+    def __init__(self, path: str, reason: str) -> None:
+        super().__init__()
+        self.path = path
+        self.msg = f"Could not import '{path}': {reason}."
+
+class ModuleSyntaxError(ModuleLoadError):
+    "the module was read but does not parse, reported like a parse error of the program itself"
+    def __init__(self, path: str) -> None:
+        super().__init__(path, "syntax error")
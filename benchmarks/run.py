@@ -0,0 +1,212 @@
+"""
+Runs the Lox benchmark suite and tracks regressions against a saved baseline.
+
+    python benchmarks/run.py [--repeat N] [--mode MODE ...] [--engine PYTHON ...] [--filter TEXT] [--all]
+                             [--save FILE] [--compare FILE] [--threshold 0.1]
+
+Every benchmark runs as a fresh `python -m app.main` process once to warm up, then --repeat times, for
+each engine (python executable) and mode. Statistics of the wall times are printed, and saved as JSON
+with --save. With --compare the median of each benchmark is checked against the same benchmark in a
+saved baseline, the run fails when one is more than --threshold slower or is missing from the baseline.
+A median of fewer than MIN_COMPARE_REPEAT runs moves by more than any useful threshold on an unchanged
+tree, so --compare needs at least that many runs, in this run and in the baseline. The run also fails
+when a benchmark exits with an error or prints something else in one mode than in the others.
+"""
+from argparse import ArgumentParser
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from typing import Any, Callable, Optional, Union
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# fewest timed runs whose median is compared against a baseline
+MIN_COMPARE_REPEAT = 5
+
+# command line options of each mode, after the subcommand
+MODES: dict[str, list[str]] = {
+    "optimized": [],
+    "no-optimize": ["--no-optimize"],
+    "stream": ["--stream"],
+}
+
+
+def generated_program(lines: int) -> str:
+    "a large program that does almost nothing once parsed, for the cost of tokenizing and parsing"
+    chunks = []
+    for i in range(lines // 4):
+        chunks.append(
+            f"fun f{i}(a, b) {{ return a * {i} + b - (a / 2); }}\n"
+            f"var v{i} = {i} * 2 + 3 - {i} / 7;\n"
+            f"var s{i} = \"value {i}\";\n"
+            f"if (v{i} > {i * 3}) {{ v{i} = v{i} - 1; }}\n"
+        )
+    return "".join(chunks)
+
+
+class Benchmark:
+    __slots__ = ["name", "source", "command", "modes", "slow"]
+    def __init__(
+        self,
+        name: str,
+        source: Union[str, Callable[[], str]],
+        command: str = "run",
+        modes: Optional[list[str]] = None,
+        slow: bool = False,
+    ) -> None:
+        self.name = name
+        # a file under benchmarks/ or a function generating the program text
+        self.source = source
+        self.command = command
+        self.modes = modes if modes is not None else list(MODES)
+        self.slow = slow
+
+
+SUITE = [
+    Benchmark("fib", "fib.lox"),
+    Benchmark("nested_loops", "nested_loops.lox"),
+    Benchmark("closures", "closures.lox"),
+    Benchmark("small_functions", "small_functions.lox"),
+    Benchmark("binary_trees", "binary_trees.lox"),
+    Benchmark("array_bulk", "array_bulk.lox"),
+    Benchmark("map_lookup", "map_lookup.lox"),
+    Benchmark("string_building", "string_building.lox", slow=True),
+    Benchmark("map_lookup_closures", "map_lookup_closures.lox", modes=["optimized"], slow=True),
+    Benchmark("large_source_tokenize", lambda: generated_program(4000), command="tokenize", modes=["default"]),
+    Benchmark("large_source_parse", lambda: generated_program(4000), modes=["optimized", "no-optimize"]),
+]
+
+
+def engine_label(python: str) -> str:
+    "implementation and version of a python executable, the engine part of a result key"
+    return subprocess.run(
+        [python, "-c", "import platform; print(platform.python_implementation(), platform.python_version())"],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+
+
+def run_once(python: str, argv: list[str]) -> tuple[float, subprocess.CompletedProcess]:
+    start = perf_counter()
+    process = subprocess.run([python, "-m", "app.main", *argv], cwd=ROOT, capture_output=True, text=True)
+    return perf_counter() - start, process
+
+
+def measure(python: str, argv: list[str], repeat: int) -> dict[str, Any]:
+    _, warmup = run_once(python, argv)
+    if warmup.returncode != 0:
+        return {"error": f"exit {warmup.returncode}: {warmup.stderr.strip()[-200:]}"}
+
+    times = []
+    for _ in range(repeat):
+        elapsed, process = run_once(python, argv)
+        if process.returncode != 0:
+            return {"error": f"exit {process.returncode}: {process.stderr.strip()[-200:]}"}
+        times.append(elapsed)
+    return {
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "min": min(times),
+        "max": max(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "repeat": repeat,
+        "times": times,
+        "output": warmup.stdout,
+    }
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark and mode")
+    arg_parser.add_argument("--mode", action="append", choices=list(MODES), help="modes to run, all by default")
+    arg_parser.add_argument("--engine", action="append", help="python executables to run with, this one by default")
+    arg_parser.add_argument("--filter", default="", help="only benchmarks whose name contains TEXT")
+    arg_parser.add_argument("--all", action="store_true", help="include the slow benchmarks")
+    arg_parser.add_argument("--save", metavar="FILE", help="write the results to FILE as a JSON baseline")
+    arg_parser.add_argument("--compare", metavar="FILE", help="compare against the baseline saved in FILE")
+    arg_parser.add_argument(
+        "--threshold", type=float, default=0.10, help="fraction a median may grow before it is a regression"
+    )
+    ns = arg_parser.parse_args()
+    if ns.compare and ns.repeat < MIN_COMPARE_REPEAT:
+        arg_parser.error(f"--compare needs --repeat {MIN_COMPARE_REPEAT} or more, fewer runs are too noisy")
+
+    baseline = None
+    if ns.compare:
+        with open(ns.compare) as fd:
+            baseline = json.load(fd)["results"]
+
+    results: dict[str, dict[str, Any]] = {}
+    failures: list[str] = []
+    print(f"{'benchmark':<48} {'median':>9} {'min':>9} {'stdev':>8} {'baseline':>9} {'change':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for python in ns.engine or [sys.executable]:
+            engine = engine_label(python)
+            for benchmark in SUITE:
+                if ns.filter not in benchmark.name or (benchmark.slow and not ns.all):
+                    continue
+                path = _source_path(benchmark, tmp)
+                outputs: dict[str, str] = {}
+                for mode in benchmark.modes:
+                    if mode in MODES and ns.mode and mode not in ns.mode:
+                        continue
+                    key = f"{engine}:{benchmark.name}/{mode}"
+                    argv = [benchmark.command, *MODES.get(mode, []), path]
+                    if benchmark.command == "tokenize":
+                        argv += ["--output", os.devnull]
+                    result = measure(python, argv, ns.repeat)
+                    if "error" in result:
+                        failures.append(f"{key} failed, {result['error']}")
+                        print(f"{key:<48} {'failed':>9}")
+                        continue
+                    outputs[mode] = result.pop("output")
+                    results[key] = result
+                    failures += _report(key, result, baseline, ns.threshold)
+                if len(set(outputs.values())) > 1:
+                    failures.append(f"{engine}:{benchmark.name} prints different output in {', '.join(outputs)}")
+
+    if ns.save:
+        with open(ns.save, "w") as fd:
+            json.dump({"python": sys.version, "machine": platform.platform(), "results": results}, fd, indent=2)
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+def _source_path(benchmark: Benchmark, tmp: str) -> str:
+    if isinstance(benchmark.source, str):
+        return os.path.join(HERE, benchmark.source)
+    path = os.path.join(tmp, f"{benchmark.name}.lox")
+    with open(path, "w") as fd:
+        fd.write(benchmark.source())
+    return path
+
+
+def _report(key: str, result: dict[str, Any], baseline: Optional[dict[str, Any]], threshold: float) -> list[str]:
+    "prints one result row, returns the regression it shows if any"
+    row = f"{key:<48} {result['median']:>8.3f}s {result['min']:>8.3f}s {result['stdev']:>7.3f}s"
+    if baseline is None:
+        print(row)
+        return []
+    previous = baseline.get(key)
+    if previous is None:
+        print(f"{row} {'missing':>9}")
+        return [f"{key} is not in the baseline, save a new one to compare it"]
+
+    change = result["median"] / previous["median"] - 1
+    print(f"{row} {previous['median']:>8.3f}s {change:>+7.1%}")
+    if previous.get("repeat", 0) < MIN_COMPARE_REPEAT:
+        return [f"{key} has a baseline of {previous.get('repeat', 0)} runs, at least {MIN_COMPARE_REPEAT} are needed"]
+    if change > threshold:
+        return [f"{key} regressed {change:+.1%}, median {previous['median']:.3f}s -> {result['median']:.3f}s"]
+    return []
+
+
+if __name__ == "__main__":
+    main()
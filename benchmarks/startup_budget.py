@@ -0,0 +1,111 @@
+"""
+Checks the interpreter's start up against a budget: the import time reported by `python -X importtime`
+for a few short command lines, and the modules each of them must not import at all.
+
+    python benchmarks/startup_budget.py [--repeat N] [--json]
+
+Exits with 1 when a scenario goes over its budget or imports a forbidden module. The budgets include
+the interpreter's own start up (site, runpy) and were set on a machine where the full import of the
+previous release took about 150 ms, most of it xmlrpc.client for a type alias.
+"""
+from argparse import ArgumentParser
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# only the pool, the daemon and the removed xmlrpc alias ever needed these
+_NEVER_AT_STARTUP = [
+    "xmlrpc.client", "http.client", "email", "ssl", "datetime",
+    "concurrent.futures", "multiprocessing", "socketserver",
+]
+
+# name: (arguments after `-m app.main`, import budget in ms, forbidden modules)
+SCENARIOS: dict[str, tuple[list[str], float, list[str]]] = {
+    "tokenize": (["tokenize", "{script}"], 60, _NEVER_AT_STARTUP),
+    "run": (["run", "{script}"], 70, _NEVER_AT_STARTUP),
+    # forwarding to a server never needs the interpreter itself
+    "client": (
+        ["run", "--server", "{socket}", "{script}"], 50,
+        _NEVER_AT_STARTUP + ["app.expressions", "app.execution", "app.stdlib", "app.optimize"],
+    ),
+}
+
+
+def parse_importtime(stderr: str) -> tuple[float, set[str]]:
+    "total import time in ms and the imported module names"
+    total_us = 0
+    modules = set[str]()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "| cumulative |" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        # top level imports are not indented, their cumulative times add up to the whole
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def measure(argv: list[str], env: dict[str, str]) -> tuple[float, float, set[str]]:
+    start = perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "app.main", *argv],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = (perf_counter() - start) * 1000
+    import_ms, modules = parse_importtime(process.stderr)
+    return import_ms, wall, modules
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=5, help="runs per scenario, the fastest one counts")
+    arg_parser.add_argument("--json", action="store_true", help="print the measurements as JSON")
+    ns = arg_parser.parse_args()
+
+    # the first run writes the bytecode caches, the budget is about a normal warm start
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    results = []
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, "empty.lox")
+        open(script, "w").close()
+        for name, (argv, budget, forbidden) in SCENARIOS.items():
+            argv = [arg.format(script=script, socket=os.path.join(tmp, "no.sock")) for arg in argv]
+            measure(argv, env)
+            runs = [measure(argv, env) for _ in range(ns.repeat)]
+            import_ms = min(run[0] for run in runs)
+            wall = min(run[1] for run in runs)
+            imported = sorted(
+                module for module in forbidden
+                if any(seen == module or seen.startswith(module + ".") for seen in runs[0][2])
+            )
+            ok = import_ms <= budget and not imported
+            failed = failed or not ok
+            results.append({
+                "scenario": name, "import_ms": round(import_ms, 2), "wall_ms": round(wall, 2),
+                "budget_ms": budget, "forbidden_imports": imported, "ok": ok,
+            })
+
+    if ns.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"{'scenario':<10} {'imports':>10} {'wall':>10} {'budget':>10}")
+        for result in results:
+            print(
+                f"{result['scenario']:<10} {result['import_ms']:>8.1f}ms {result['wall_ms']:>8.1f}ms "
+                f"{result['budget_ms']:>8.0f}ms  {'ok' if result['ok'] else 'OVER BUDGET'}"
+                + (f"  imports {', '.join(result['forbidden_imports'])}" if result["forbidden_imports"] else "")
+            )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
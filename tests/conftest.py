@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from typing import Callable, NamedTuple
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Run(NamedTuple):
+    stdout: str
+    stderr: str
+    code: int
+
+
+def run_lox(*args: str, cwd: str = ROOT, timeout: float = 60) -> Run:
+    "runs `python -m app.main *args` the way the command line does, the program's exit code included"
+    process = subprocess.run(
+        [sys.executable, "-m", "app.main", *args],
+        cwd=cwd, capture_output=True, text=True, timeout=timeout, stdin=subprocess.DEVNULL,
+        env={**os.environ, "PYTHONPATH": ROOT},
+    )
+    return Run(process.stdout, process.stderr, process.returncode)
+
+
+@pytest.fixture
+def lox() -> Callable[..., Run]:
+    return run_lox
+
+
+@pytest.fixture
+def write(tmp_path: str) -> Callable[[str, str], str]:
+    "writes a file under tmp_path, returns its path"
+    def write(name: str, source: str) -> str:
+        path = os.path.join(tmp_path, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fd:
+            fd.write(source)
+        return path
+    return write
@@ -0,0 +1,60 @@
+import json
+import os
+
+from app.batch import BatchRunner, collect_scripts, summarize
+from app.main import parse_args
+
+
+def scripts(write):
+    return [
+        write("suite/ok.lox", "print 1 + 1;\n"),
+        write("suite/nested/runtime.lox", 'print "a" - 1;\n'),
+        write("suite/compile.lox", "var = ;\n"),
+        write("suite/forever.lox", "while (true) {}\n"),
+    ]
+
+
+def test_collect_scripts(write, tmp_path):
+    ok, runtime, compile_error, forever = scripts(write)
+    suite = os.path.join(tmp_path, "suite")
+    assert collect_scripts(suite) == sorted([ok, runtime, compile_error, forever])
+    assert collect_scripts(ok) == [ok]
+    assert collect_scripts(os.path.join(suite, "*.lox")) == sorted([ok, compile_error, forever])
+    manifest = write("suite/manifest.txt", "# comment\nok.lox\n\nnested/runtime.lox\n")
+    assert collect_scripts(manifest) == [ok, runtime]
+
+
+def test_run_script_in_process(write):
+    ok, runtime, compile_error, forever = scripts(write)
+    runner = BatchRunner(parse_args, [], jobs=1, timeout=0.5, max_output=10)
+    results = {os.path.basename(path): runner.run_script(path) for path in (ok, runtime, compile_error, forever)}
+    assert (results["ok.lox"].status, results["ok.lox"].stdout) == ("ok", "2\n")
+    assert (results["runtime.lox"].status, results["runtime.lox"].exit_code) == ("runtime_error", 70)
+    assert results["compile.lox"].status == "compile_error"
+    assert (results["forever.lox"].status, results["forever.lox"].exit_code) == ("timeout", None)
+    summary = summarize(list(results.values()), 1.0)
+    assert summary["total"] == 4
+    assert summary["counts"] == {"ok": 1, "runtime_error": 1, "compile_error": 1, "timeout": 1}
+
+
+def test_output_is_truncated(write):
+    source = write("loud.lox", 'for (var i = 0; i < 100; i = i + 1) print "line";\n')
+    result = BatchRunner(parse_args, [], max_output=20).run_script(source)
+    assert result.stdout.startswith("line\nline\nline\nline\n")
+    assert result.stdout.endswith("characters truncated")
+
+
+def test_run_batch_command(lox, write, tmp_path):
+    scripts(write)
+    summary = tmp_path / "summary.json"
+    run = lox(
+        "run-batch", os.path.join(tmp_path, "suite"), "--jobs", "2", "--timeout", "1",
+        "--summary", str(summary), "--max-steps", "1000000",
+    )
+    assert run.code == 0
+    assert run.stderr.startswith("4 scripts in ")
+    data = json.loads(summary.read_text())
+    assert data["total"] == 4
+    assert data["counts"]["ok"] == 1
+    statuses = {os.path.basename(result["file"]): result["status"] for result in data["results"]}
+    assert statuses["forever.lox"] in ("timeout", "budget_exceeded")
@@ -0,0 +1,31 @@
+import importlib.util
+import os
+
+import pytest
+
+from conftest import ROOT
+
+spec = importlib.util.spec_from_file_location("benchmark_run", os.path.join(ROOT, "benchmarks", "run.py"))
+bench = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench)
+
+
+def result(median, repeat=bench.MIN_COMPARE_REPEAT):
+    return {"median": median, "min": median, "stdev": 0.0, "repeat": repeat}
+
+
+def test_compare_flags_regressions_and_missing_keys(capsys):
+    baseline = {"py:fib/optimized": result(1.0)}
+    assert bench._report("py:fib/optimized", result(1.05), baseline, 0.1) == []
+    assert "regressed" in bench._report("py:fib/optimized", result(1.2), baseline, 0.1)[0]
+    assert "not in the baseline" in bench._report("py:new/optimized", result(1.0), baseline, 0.1)[0]
+    assert bench._report("py:new/optimized", result(1.0), None, 0.1) == []
+
+
+def test_compare_needs_enough_runs(monkeypatch):
+    baseline = {"py:fib/optimized": result(1.0, repeat=2)}
+    assert "at least" in bench._report("py:fib/optimized", result(1.0), baseline, 0.1)[0]
+    monkeypatch.setattr("sys.argv", ["run.py", "--compare", os.devnull, "--repeat", "2"])
+    with pytest.raises(SystemExit) as error:
+        bench.main()
+    assert error.value.code == 2
@@ -0,0 +1,86 @@
+import io
+import sys
+
+import pytest
+
+from app.execution import ExecutionBudget, ExecutionContext
+from app.stdlib.streams import read_line
+from app.utils import BudgetExceededError
+
+RECURSE = "var d = 0;\nfun f(n) { d = n; return f(n + 1); }\nf(0);\n"
+
+
+@pytest.mark.parametrize("options", [(), ("--no-optimize", ), ("--stream", )])
+def test_unbounded_recursion_is_a_stack_overflow(lox, write, options):
+    run = lox("run", *options, write("recurse.lox", RECURSE))
+    assert run.code == 70
+    assert run.stderr.startswith("Stack overflow.")
+    assert "Traceback" not in run.stderr
+
+
+@pytest.mark.parametrize("options", [("--max-depth", "100000"), ("--max-steps", "100000000")])
+def test_unbounded_recursion_goes_over_the_depth_limit(lox, write, options):
+    run = lox("run", *options, write("recurse.lox", RECURSE))
+    assert run.code == 75
+    assert run.stderr.startswith("Execution budget exceeded: calls nested deeper than the interpreter's stack allows.")
+    assert "Traceback" not in run.stderr
+
+
+def test_max_depth(lox, write):
+    source = write("depth.lox", "fun f(n) { if (n == 0) return 0; return 1 + f(n - 1); }\nprint f(20);\n")
+    assert lox("run", "--max-depth", "21", source) == ("20\n", "", 0)
+    assert lox("run", "--max-depth", "20", source).code == 75
+
+
+def test_depth_is_taken_back_after_the_error():
+    budget = ExecutionBudget(max_depth=1)
+    budget.enter_call()
+    with pytest.raises(BudgetExceededError) as error:
+        budget.enter_call()
+    assert error.value.limit == "depth"
+    assert budget.depth == 1
+
+
+def test_steps_count_iterations_and_calls(lox, write):
+    source = write("loop.lox", "var i = 0;\nwhile (i < 100) i = i + 1;\nprint i;\n")
+    assert lox("run", "--max-steps", "100", source).stdout == "100\n"
+    over = lox("run", "--max-steps", "99", source)
+    assert over.code == 75
+    assert "more than 99 steps" in over.stderr
+
+
+def test_time_and_string_limits(lox, write):
+    forever = write("forever.lox", "while (true) {}\n")
+    run = lox("run", "--max-time", "0.2", forever)
+    assert run.code == 75 and "seconds" in run.stderr
+    strings = write("strings.lox", 'var s = "x";\nfor (var i = 0; i < 20; i = i + 1) s = s + s;\nprint len(s);\n')
+    assert lox("run", "--max-string", "2000000", strings).stdout == "1048576\n"
+    assert lox("run", "--max-string", "1000", strings).code == 75
+
+
+def test_allocations_and_builtin_strings_are_checked_first(lox, write, tmp_path):
+    big = lox("run", "--max-memory", "100", write("big.lox", "var a = array(100000000);\n"))
+    assert big.code == 75 and "allocating 762 MiB" in big.stderr
+    text = write("text.txt", "x" * 2000)
+    for source in (f'read_file("{text}");', "to_string(array(500));"):
+        run = lox("run", "--max-string", "1000", write("string.lox", source))
+        assert run.code == 75 and "limit is 1000" in run.stderr
+
+
+def test_read_line_stops_reading_past_the_string_limit(monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO("abc\n" + "x" * 100000))
+    context = ExecutionContext(budget=ExecutionBudget(max_string=3))
+    assert read_line(context) == "abc"
+    with pytest.raises(BudgetExceededError):
+        read_line(context)
+    assert len(sys.stdin.read()) == 100000 - 5
+
+
+def test_checks_are_batched_by_interval():
+    budget = ExecutionBudget(max_steps=ExecutionBudget.CHECK_INTERVAL * 3)
+    budget.start()
+    for _ in range(ExecutionBudget.CHECK_INTERVAL * 3):
+        budget.tick()
+    with pytest.raises(BudgetExceededError) as error:
+        budget.tick()
+    assert error.value.limit == "steps"
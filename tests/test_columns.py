@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from app.columnar import evaluate_columns, load_columns
+from app.columnar.columns import _evaluate_rows
+from app.expressions import Expression, stringify
+from app.tokens import EOFSymbol, Tokenizer
+
+
+def parse(source):
+    expression = None
+    token_iter = iter(Tokenizer(source))
+    for token in token_iter:
+        if isinstance(token, EOFSymbol):
+            break
+        expression = Expression.from_token(token, expression, token_iter)
+    return expression
+
+
+def test_csv_cells(write):
+    path = write("data.csv", "n,s\n1e3,x\n.5,inf\n+2,nan\n-0.25,\n1_0,true\n 7 ,nil\n")
+    columns = load_columns(path)
+    assert columns["n"] == [1000.0, 0.5, 2.0, -0.25, 10.0, 7.0]
+    # non-finite spellings stay strings
+    assert columns["s"] == ["x", "inf", "nan", None, True, None]
+
+
+def test_evaluate_columns_command(lox, write):
+    data = write("data.csv", "a,b\n1,2\n1e1,x\n")
+    expression = write("expr.lox", "a * 2 + b")
+    run = lox("evaluate", "--columns", data, expression)
+    assert run.stdout == "result,error\n4,\n,Operands must be two numbers or two strings.\n"
+    assert run.stderr == "1 of 2 rows masked by runtime errors\n"
+
+
+COLUMNS = {
+    "a": [1.0, -2.5, 0.0, 3.0, 1e300, -0.0, 7.0, 2.0],
+    "b": [0.0, 2.0, -1.0, 3.0, 1e300, 4.0, 0.5, 2.0],
+    "s": ["x", "", "yz", "x", "a", "b", "x", "x"],
+    "m": [1.0, "one", None, True, False, 2.0, "x", 0.0],
+}
+
+
+def random_expression(rng, depth=0):
+    if depth > 3 or rng.random() < 0.3:
+        return rng.choice(["a", "b", "s", "m", "1", "0", "2.5", '"x"', "true", "false", "nil"])
+    kind = rng.random()
+    if kind < 0.15:
+        return rng.choice(["-", "!"]) + random_expression(rng, depth + 1)
+    if kind < 0.25:
+        return "(" + random_expression(rng, depth + 1) + ")"
+    operator = rng.choice(["+", "-", "*", "/", "<", "<=", ">", ">=", "==", "!=", "and", "or"])
+    return f"{random_expression(rng, depth + 1)} {operator} {random_expression(rng, depth + 1)}"
+
+
+def rows(result):
+    return [
+        (None, error) if error is not None else (stringify(value), None)
+        for value, error in zip(result.values, result.errors)
+    ]
+
+
+def test_vectorized_evaluation_matches_the_tree_walk():
+    pytest.importorskip("numpy")
+    rng = random.Random(48)
+    vectorized = 0
+    for _ in range(500):
+        source = random_expression(rng)
+        expression = parse(source)
+        result = evaluate_columns(expression, COLUMNS)
+        vectorized += result.vector is not None
+        expected = _evaluate_rows(expression, COLUMNS, len(COLUMNS["a"]))
+        assert rows(result) == rows(expected), source
+    assert vectorized == 500
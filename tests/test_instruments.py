@@ -0,0 +1,118 @@
+import json
+
+from app.execution import ExecutionContext, MemorySink, Output
+from app.expressions import Expression
+from app.instrument import ClassSwap, Coverage, NodeCounter, Profiler, merge_reports, format_summary, to_lcov
+from app.optimize import walk
+from app.parse import Parser
+
+SOURCE = (
+    "fun f(n) {\n"
+    "    if (n > 1) return n;\n"
+    "    return 0;\n"
+    "}\n"
+    "var t = 0;\n"
+    "for (var i = 0; i < 3; i = i + 1) t = t + f(i);\n"
+    "if (t > 100) print \"big\";\n"
+    "print t;\n"
+)
+
+
+def evaluate(ast):
+    "runs ast, returns what it printed"
+    sink = MemorySink()
+    context = ExecutionContext(Output(sink))
+    ast.evaluate(context.root_scope)
+    context.output.close()
+    return sink.getvalue()
+
+
+def classes(ast):
+    return [node.__class__ for node in walk(ast)]
+
+
+def test_class_swap_wraps_evaluate_and_uninstalls():
+    ast = Parser(SOURCE).ast
+    before = classes(ast)
+    calls = []
+
+    def wrap(evaluate):
+        def wrapped(node, scope):
+            calls.append(node)
+            return evaluate(node, scope)
+        return wrapped
+
+    swap = ClassSwap("Traced", wrap)
+    swap.install(ast)
+    assert all(cls.__name__.startswith("Traced") for cls in classes(ast))
+    assert evaluate(ast) == "2\n"
+    assert calls
+    swap.uninstall()
+    assert classes(ast) == before
+    assert all(issubclass(cls, Expression) for cls in before)
+
+
+def test_node_counter_counts_evaluated_nodes():
+    ast = Parser("var a = 1;\nprint node_count() > 2;\n").ast
+    assert NodeCounter.referenced(ast)
+    counter = NodeCounter()
+    sink = MemorySink()
+    context = ExecutionContext(Output(sink))
+    counter.install(ast, context.root_scope)
+    ast.evaluate(context.root_scope)
+    context.output.close()
+    counter.uninstall()
+    assert sink.getvalue() == "true\n"
+    assert counter.count > 2
+
+
+def test_coverage_reports_lines_and_arms():
+    ast = Parser(SOURCE).ast
+    coverage = Coverage()
+    coverage.install(ast)
+    evaluate(ast)
+    coverage.uninstall()
+    report = coverage.to_json("program.lox")
+    [(_, file)] = report["files"].items()
+    assert file["lines"]["8"] == 1
+    # the if of line 7 never took its branch
+    assert file["branches"]["7"] == [0]
+    assert file["branches"]["2"] == [1]
+    merged = merge_reports(iter([report, json.loads(json.dumps(report))]))
+    assert merged["runs"] == 2
+    assert "program.lox" in format_summary(merged)
+    assert "DA:8,2" in to_lcov(merged)
+
+
+def test_profiler_counts_hits_per_node_and_line():
+    ast = Parser(SOURCE).ast
+    profiler = Profiler()
+    profiler.install(ast)
+    assert evaluate(ast) == "2\n"
+    profiler.uninstall()
+    lines = {stats.line: stats for stats in profiler.lines()}
+    assert lines[6].hits >= 1
+    assert lines[2].hits >= 3
+    assert all(stats.total_ns >= stats.self_ns >= 0 for stats in profiler.nodes())
+
+
+def test_instrument_options(lox, write, tmp_path):
+    source = write("program.lox", SOURCE)
+    metrics, sample = tmp_path / "m.prom", tmp_path / "s.txt"
+    run = lox("run", "--metrics", str(metrics), "--sample", str(sample), "--profile", source)
+    assert run.stdout == "2\n" and run.code == 0
+    assert "hot lines" in run.stderr
+    assert 'lox_calls_total{script="' + source + '"} 3' in metrics.read_text()
+    assert sample.exists()
+    timings = lox("run", "--timings", source)
+    assert timings.stdout == "2\n"
+    assert all(phase in timings.stderr for phase in ("parse", "optimize", "evaluate"))
+
+
+def test_profile_names_nodes_by_their_plain_class(lox, write):
+    # the node counter and coverage swap the same nodes' classes as the profiler
+    source = write("counted.lox", "var t = 0;\nfor (var i = 0; i < 3; i = i + 1) t = t + i;\nprint node_count() > 0;\n")
+    run = lox("run", "--profile", "--coverage", write("c.json", ""), source)
+    assert run.code == 0
+    assert "ForExpression" in run.stderr
+    assert "Counted" not in run.stderr and "Covered" not in run.stderr and "Profiled" not in run.stderr
@@ -0,0 +1,136 @@
+import os
+import pickle
+
+import pytest
+
+from app.execution import ExecutionContext, ExecutionScope, ModuleCacheError, ModuleLoader
+from app.expressions.serialize import TreeFormatError, dump_tree, load_tree
+from app.optimize import optimize
+from app.parse import Parser
+
+
+def test_module_runs_once_and_binds_its_globals(lox, write):
+    write("lib/util.lox", 'print "loading util";\nfun helper(v) { return v * 10; }\n')
+    write("lib/math.lox", 'import "util.lox";\nvar PI = 3;\nfun square(x) { return x * x; }\n')
+    main = write("main.lox", 'import "lib/math.lox";\nimport "lib/math.lox";\nprint square(PI);\nprint helper(2);\n')
+    assert lox("run", main) == ("loading util\n9\n20\n", "", 0)
+
+
+def test_assignments_are_shared_with_the_module(lox, write):
+    write("m.lox", "var n = 0;\nfun next() { n = n + 1; return n; }\n")
+    main = write("main.lox", 'import "m.lox";\nnext();\nprint n;\nn = 10;\nprint next();\n')
+    assert lox("run", main).stdout == "1\n11\n"
+
+
+def test_import_inside_a_function_resolves_from_its_module(lox, write):
+    write("lib/sub/util.lox", "fun helper(v) { return v * 10; }\n")
+    write("lib/lazy.lox", 'fun later() { import "sub/util.lox"; return helper(2); }\n')
+    main = write("main.lox", 'import "lib/lazy.lox";\nprint later();\n')
+    assert lox("run", main).stdout == "20\n"
+
+
+def test_import_cycle_sees_the_names_bound_so_far(lox, write):
+    write("a.lox", 'var fromA = "a";\nimport "b.lox";\n')
+    write("b.lox", 'import "a.lox";\nvar fromB = "b";\nprint fromA;\n')
+    main = write("main.lox", 'import "a.lox";\nprint fromA + fromB;\n')
+    assert lox("run", main).stdout == "a\nab\n"
+
+
+def test_import_errors(lox, write):
+    assert lox("run", write("path.lox", "import x;\n")).code == 65
+    missing = lox("run", write("missing.lox", 'import "nope.lox";\n'))
+    assert missing.code == 70
+    assert "Could not import 'nope.lox': No such file or directory." in missing.stderr
+    write("broken.lox", "var = ;\n")
+    assert lox("run", write("syntax.lox", 'import "broken.lox";\n')).code == 65
+
+
+def test_functions_of_a_module_are_opaque_to_type_inference(lox, write):
+    # clobber changes the type of an imported global, the optimized program must not assume a number
+    write("m.lox", 'var counter = 0;\nfun clobber() { counter = "oops"; }\n')
+    main = write("main.lox", 'import "m.lox";\ncounter = 1;\nclobber();\nprint counter - 1;\n')
+    expected = ("", "Operands must be numbers.\n1\n", 70)
+    assert lox("run", main) == expected
+    assert lox("run", "--no-optimize", main) == expected
+    assert lox("run", "--stream", main) == expected
+
+
+def test_module_cache_on_disk(lox, write, tmp_path):
+    write("m.lox", "fun f(x) { return x + 1; }\n")
+    main = write("main.lox", 'import "m.lox";\nprint f(1);\n')
+    cache = os.path.join(tmp_path, "cache")
+    assert lox("run", "--module-cache", cache, main).stdout == "2\n"
+    assert len(os.listdir(cache)) == 1
+    assert lox("run", "--module-cache", cache, main).stdout == "2\n"
+    # an edit changes the mtime and size of the module, the cached tree is stale
+    write("m.lox", "fun f(x) { return x + 100; }\n")
+    assert lox("run", "--module-cache", cache, main).stdout == "101\n"
+
+
+class _Planted:
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __reduce__(self):
+        return (open, (self.marker, "w"))
+
+
+def test_module_cache_never_runs_planted_code(lox, write, tmp_path):
+    write("m.lox", "fun f(x) { return x + 1; }\n")
+    main = write("main.lox", 'import "m.lox";\nprint f(1);\n')
+    cache = os.path.join(tmp_path, "cache")
+    assert lox("run", "--module-cache", cache, main).stdout == "2\n"
+    [entry] = os.listdir(cache)
+    marker = os.path.join(tmp_path, "planted")
+    with open(os.path.join(cache, entry), "wb") as file:
+        pickle.dump(_Planted(marker), file)
+    # the planted entry is no tree, the module is parsed again
+    assert lox("run", "--module-cache", cache, main) == ("2\n", "", 0)
+    assert not os.path.exists(marker)
+
+
+def test_module_cache_refuses_a_shared_directory(lox, write, tmp_path):
+    main = write("main.lox", "print 1;\n")
+    cache = os.path.join(tmp_path, "cache")
+    os.mkdir(cache)
+    os.chmod(cache, 0o777)
+    run = lox("run", "--module-cache", cache, main)
+    assert run.code == 1
+    assert "writable by other users" in run.stderr
+    with pytest.raises(ModuleCacheError):
+        ModuleLoader(cache_dir=cache)
+    os.chmod(cache, 0o700)
+    assert lox("run", "--module-cache", cache, main).stdout == "1\n"
+
+
+def test_tree_dump_round_trip():
+    source = (
+        "class A { init(x) { this.x = x; } get() { return this.x; } }\n"
+        'fun f(n) { var s = ""; for (var i = 0; i < n; i = i + 1) s = s + "a"; return s; }\n'
+        "print A(2).get() * 3;\nprint f(3);\nprint -0.5;\n"
+    )
+    parser = Parser(source)
+    optimize(parser.ast, remove_unused_functions=False)
+    tree = load_tree(dump_tree(parser.ast))
+    assert tree.__class__ is parser.ast.__class__
+    assert str(tree) == str(parser.ast)
+
+
+def test_tree_load_refuses_other_classes():
+    text = dump_tree(Parser("print 1;\n").ast)
+    with pytest.raises(TreeFormatError):
+        load_tree(text.replace('"app.expressions.expressions"', '"os"', 1))
+    with pytest.raises(TreeFormatError):
+        load_tree(text[:len(text) // 2])
+    with pytest.raises(TreeFormatError):
+        load_tree('{"classes": [], "objects": [], "root": ["X", 1]}')
+
+
+def test_loader_resolves_from_the_closest_module_scope(tmp_path):
+    context = ExecutionContext()
+    loader = ModuleLoader(str(tmp_path))
+    module = ExecutionScope(context.root_scope)
+    module.module_path = os.path.join(str(tmp_path), "lib", "m.lox")
+    inner = module.create_child_scope().create_child_scope()
+    assert loader.resolve("x.lox", context.root_scope.create_child_scope()) == os.path.join(str(tmp_path), "x.lox")
+    assert loader.resolve("x.lox", inner) == os.path.join(str(tmp_path), "lib", "x.lox")
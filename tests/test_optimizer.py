@@ -0,0 +1,114 @@
+from app.expressions.expressions import ForExpression, LoopInvariantExpression
+from app.optimize import optimize, walk
+from app.parse import Parser
+
+
+def optimized(source):
+    parser = Parser(source)
+    report = optimize(parser.ast)
+    return parser.ast, report
+
+
+def test_an_invariant_of_an_outer_loop_is_not_hoisted_again():
+    source = (
+        "var w = 7;\nvar total = 0;\n"
+        "for (var y = 0; y < 2; y = y + 1) {\n"
+        "    for (var x = 0; x < 3; x = x + 1) total = total + w * w + x;\n"
+        "}\nprint total;\n"
+    )
+    ast, report = optimized(source)
+    outer, inner = [node for node in walk(ast) if isinstance(node, ForExpression)]
+    assert len(outer.invariants) == 1 and not inner.invariants
+    assert report.hoisted == 1
+    assert not any(isinstance(node.expr, LoopInvariantExpression) for node in outer.invariants)
+
+
+def kinds(ast):
+    return [node.__class__.__name__ for node in walk(ast)]
+
+
+def test_dead_code_prunes_constant_branches_and_unreachable_statements():
+    source = (
+        'if (false) print "no"; else print "yes";\n'
+        'while (false) print "never";\n'
+        "fun f() { return 1; print 2; }\nprint f();\n"
+    )
+    ast, report = optimized(source)
+    assert report.pruned_branches >= 2
+    assert report.unreachable_statements == 1
+    assert report.nodes_removed > 0
+    assert "WhileExpression" not in kinds(ast)
+    assert '"no"' not in str(ast) and "never" not in str(ast)
+
+
+def test_dead_code_removes_unused_functions_unless_asked_to_keep_them():
+    source = "fun unused() { print 1; }\nfun used() { return 2; }\nprint used();\n"
+    ast, report = optimized(source)
+    assert report.unused_functions == 1
+    assert "unused" not in str(ast)
+    parser = Parser(source)
+    assert optimize(parser.ast, remove_unused_functions=False).unused_functions == 0
+
+
+def test_type_inference_specializes_proven_numbers_only():
+    ast, report = optimized("var a = 1;\nvar b = a * 2 - 1;\nvar s = \"x\";\nprint s + s;\nprint a < b;\n")
+    names = kinds(ast)
+    assert {"NumericMultiplyExpression", "NumericMinusExpression", "StringPlusExpression"} <= set(names)
+    assert "NumericLessExpression" in names
+    assert report.specialized >= 4
+    # v may be a string once f ran, the subtraction keeps its checks
+    ast, _ = optimized("var v = 1;\nfun f() { v = \"s\"; }\nf();\nprint v - 1;\n")
+    assert "NumericMinusExpression" not in kinds(ast)
+
+
+def test_type_inference_joins_branches():
+    ast, _ = optimized("var v = 1;\nif (v > 0) v = \"s\";\nprint v - 1;\nvar n = 1;\nif (n > 0) n = 2;\nprint n - 1;\n")
+    minus = [name for name in kinds(ast) if name.endswith("MinusExpression")]
+    assert minus == ["MinusExpression", "NumericMinusExpression"]
+
+
+def test_type_inference_treats_calls_as_unknown_with_foreign_functions():
+    source = "var v = 1;\nfun local() { return 0; }\nlocal();\nprint v - 1;\nprelude_function();\nprint v - 1;\n"
+    parser = Parser(source)
+    optimize(parser.ast, foreign_functions=True)
+    minus = [name for name in kinds(parser.ast) if name.endswith("MinusExpression")]
+    assert minus == ["NumericMinusExpression", "MinusExpression"]
+
+
+def test_loops_hoist_invariants_and_reduce_induction_steps():
+    ast, report = optimized(
+        "var n = 3;\nvar total = 0;\nfor (var i = 0; i < 10; i = i + 1) total = total + n * n;\nprint total;\n"
+    )
+    assert report.hoisted == 1
+    assert report.reduced == 1
+    assert "IncrementExpression" in kinds(ast)
+    # a call may change n behind the loop's back, such loops are left alone
+    _, report = optimized(
+        "var n = 3;\nfun f() { n = 4; }\nvar total = 0;\n"
+        "for (var i = 0; i < 10; i = i + 1) { f(); total = total + n * n; }\n"
+    )
+    assert report.hoisted == 0 and report.reduced == 0
+
+
+def test_incremental_optimizer_keeps_facts_within_statements():
+    from app.optimize import IncrementalOptimizer
+    from app.parse import StreamingParser
+
+    optimizer = IncrementalOptimizer()
+    source = "fun f() { v = \"s\"; }\nvar v = 1;\nprint v - 1;\n"
+    statements = list(StreamingParser(source))
+    for statement in statements:
+        optimizer.optimize(statement)
+    # facts never cross a statement, v is unknown in the print
+    assert "NumericMinusExpression" not in kinds(statements[-1])
+    assert optimizer.report.unused_functions == 0
+
+
+def test_optimization_report(lox, write):
+    source = write("dead.lox", 'if (false) print "no";\nprint "yes";\n')
+    run = lox("run", "--optimization-report", source)
+    assert run.stdout == "yes\n"
+    assert "1 constant branches pruned" in run.stderr
+    assert "the program starts after" in run.stderr
+    refused = lox("run", "--optimization-report", "--no-optimize", source)
+    assert refused == ("", "--optimization-report has nothing to report with --no-optimize\n", 1)
@@ -0,0 +1,36 @@
+from app.execution import FlushPolicy, MemorySink, Output
+
+
+def test_size_policy_flushes_once_the_buffer_is_full():
+    sink = MemorySink()
+    output = Output(sink, FlushPolicy.SIZE, buffer_size=4)
+    output.write("ab")
+    assert sink.getvalue() == ""
+    output.write("cd")
+    assert sink.getvalue() == "abcd"
+
+
+def test_line_policy_flushes_complete_lines():
+    sink = MemorySink()
+    output = Output(sink, FlushPolicy.LINE)
+    output.write("partial")
+    assert sink.getvalue() == ""
+    output.print(" line")
+    assert sink.getvalue() == "partial line\n"
+
+
+def test_exit_policy_waits_for_close():
+    sink = MemorySink()
+    output = Output(sink, FlushPolicy.EXIT, buffer_size=1)
+    output.print("a" * 10)
+    assert sink.getvalue() == ""
+    output.close()
+    assert sink.getvalue() == "a" * 10 + "\n"
+
+
+def test_output_before_a_runaway_recursion_comes_out(lox, write):
+    program = write("recursion.lox", 'fun f(n) { return f(n + 1); }\nprint "before";\nf(0);\n')
+    for mode in ([], ["--stream"], ["--flush", "exit"]):
+        result = lox("run", *mode, program)
+        assert result.stdout == "before\n"
+        assert result.code != 0
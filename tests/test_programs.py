@@ -0,0 +1,32 @@
+import glob
+import os
+import re
+
+import pytest
+
+from conftest import ROOT
+
+PROGRAMS = sorted(glob.glob(os.path.join(ROOT, "tests", "programs", "*.lox")))
+
+# every mode must print the same as the plain tree walk, errors and exit code included
+MODES = [("--no-optimize", ), (), ("--stream", ), ("--stream", "--no-optimize")]
+
+
+def expectations(path):
+    "the stdout and exit code a program's `// expect: ...` and `// expect exit: N` comments ask for"
+    with open(path) as fd:
+        source = fd.read()
+    stdout = "".join(line + "\n" for line in re.findall(r"// expect: (.*)", source))
+    codes = re.findall(r"// expect exit: (\d+)", source)
+    return stdout, int(codes[0]) if codes else 0
+
+
+@pytest.mark.parametrize("path", PROGRAMS, ids=os.path.basename)
+def test_program(lox, path):
+    stdout, code = expectations(path)
+    # a stream runs the statements before a syntax error, only the whole program is refused up front
+    modes = MODES if code != 65 else [mode for mode in MODES if "--stream" not in mode]
+    plain, *others = [lox("run", *mode, path) for mode in modes]
+    assert (plain.stdout, plain.code) == (stdout, code)
+    for mode, run in zip(modes[1:], others):
+        assert run == plain, f"run {' '.join(mode)} differs from run --no-optimize"
@@ -0,0 +1,41 @@
+from app.expressions import Rope
+from app.expressions.rope import concat
+
+
+def long(n):
+    return "x" * n
+
+
+def test_short_concatenations_stay_plain_strings():
+    assert concat("ab", "cd") == "abcd"
+    assert concat("ab", "cd").__class__ is str
+
+
+def test_long_concatenations_build_a_rope():
+    rope = concat(long(Rope.FLAT_THRESHOLD), "a")
+    assert rope.__class__ is Rope
+    assert len(rope) == Rope.FLAT_THRESHOLD + 1
+    rope = rope + "b"
+    assert str(rope) == long(Rope.FLAT_THRESHOLD) + "ab"
+
+
+def test_older_ropes_keep_their_prefix():
+    base = concat(long(300), "-")
+    first = base + "first"
+    second = base + "second"
+    assert str(base) == long(300) + "-"
+    assert str(first) == long(300) + "-first"
+    assert str(second) == long(300) + "-second"
+    # appending to the older rope again continued on a copy, the newer one is intact
+    assert str(first + "!") == long(300) + "-first!"
+
+
+def test_ropes_compare_and_hash_like_their_text():
+    rope = concat(long(300), "y")
+    text = long(300) + "y"
+    assert rope == text and rope == concat(long(300), "y")
+    assert rope != long(301)
+    assert hash(rope) == hash(text)
+    assert {text: 1}[rope] == 1
+    assert concat("prefix ", rope) == "prefix " + text
+    assert concat(rope, concat(long(300), "z")) == text + long(300) + "z"
@@ -0,0 +1,114 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.execution import ExecutionContext
+from app.expressions import Expression, GetExpression
+from app.optimize import walk
+from app.parse import Parser
+from app.server import ASTCache, SocketPathError
+from app.server.daemon import _remove_stale_socket
+
+from conftest import ROOT
+
+
+def test_serve_refuses_a_path_that_is_not_a_socket(lox, write):
+    path = write("important.txt", "keep me\n")
+    result = lox("serve", path)
+    assert result.code == 1
+    assert "is not a socket" in result.stderr
+    with open(path) as fd:
+        assert fd.read() == "keep me\n"
+
+
+def test_stale_socket_is_removed(tmp_path):
+    path = os.path.join(tmp_path, "stale.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.close()
+    _remove_stale_socket(path)
+    assert not os.path.exists(path)
+
+
+def test_live_socket_is_kept(tmp_path):
+    path = os.path.join(tmp_path, "live.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+    try:
+        with pytest.raises(SocketPathError):
+            _remove_stale_socket(path)
+        assert os.path.exists(path)
+    finally:
+        listener.close()
+
+
+def test_requests_are_served(lox, write, tmp_path):
+    program = write("main.lox", "print 1 + 2;\n")
+    path = os.path.join(tmp_path, "lox.sock")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.main", "serve", path], cwd=ROOT, stderr=subprocess.DEVNULL,
+        env={**os.environ, "PYTHONPATH": ROOT},
+    )
+    try:
+        for _ in range(100):
+            if os.path.exists(path):
+                break
+            time.sleep(0.05)
+        assert lox("run", "--server", path, program) == ("3\n", "", 0)
+        assert lox("run", "--server", path, write("error.lox", "print -nil;\n")).code == 70
+        # a cache hit reports the optimizations the miss made
+        for _ in range(2):
+            reported = lox("run", "--server", path, "--optimization-report", program)
+            assert reported.stdout == "3\n"
+            assert "parse time" in reported.stderr
+    finally:
+        server.terminate()
+        server.wait(10)
+    assert not os.path.exists(path)
+
+
+def parse(source: str) -> Expression:
+    parser = Parser(source)
+    assert not parser.error
+    return parser.ast
+
+
+def test_ast_cache_reuses_until_the_file_changes(write):
+    path = write("main.lox", "print 1;\n")
+    cache = ASTCache(capacity=1)
+    assert str(cache.load(path, "run", lambda: parse("print 1;"))) == str(parse("print 1;"))
+    assert str(cache.load(path, "run", lambda: parse("print 2;"))) == str(parse("print 1;"))
+    assert (cache.hits, cache.misses) == (1, 1)
+    write("main.lox", "print 12;\n")
+    assert str(cache.load(path, "run", lambda: parse("print 3;"))) == str(parse("print 3;"))
+    # parse errors are not cached
+    assert cache.load(path, "other", lambda: None) is None
+    assert len(cache) == 1
+
+
+def test_ast_cache_hands_out_a_tree_per_request(write):
+    source = "class A {}\nvar a = A();\na.x = 1;\nprint a.x;\n"
+    path = write("main.lox", source)
+    cache = ASTCache()
+    first = cache.load(path, "run", lambda: parse(source))
+    second = cache.load(path, "run", lambda: parse(source))
+    assert first is not None and second is not None
+    shared = {id(node) for node in walk(first)} & {id(node) for node in walk(second)}
+    assert not shared
+    # the property reads of a run fill their inline caches, a later request starts without them
+    first.evaluate(ExecutionContext().root_scope)
+    third = cache.load(path, "run", lambda: parse(source))
+    gets = [node for node in walk(third) if isinstance(node, GetExpression)]
+    assert gets and all(node._cached_shape is None for node in gets)
+
+
+def test_optimization_report_is_kept_with_the_cached_tree(write):
+    path = write("main.lox", "print 1;\n")
+    cache = ASTCache()
+    assert cache.load_reported(path, "run", lambda: (parse("print 1;"), "folded 1"))[1] == "folded 1"
+    assert cache.load_reported(path, "run", lambda: (parse("print 1;"), "other"))[1] == "folded 1"
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from app.execution import ExecutionContext, SnapshotError, load_snapshot, save_snapshot, snapshot_key
+from app.expressions import NativeFunction
+from app.parse import Parser
+
+
+PRELUDE = """\
+fun adder(k) { fun add(x) { return x + k; } return add; }
+class Point { init(x, y) { this.x = x; this.y = y; } sum() { return this.x + this.y; } }
+var add5 = adder(5);
+var origin = Point(1, 2);
+print "prelude loaded";
+"""
+PROGRAM = "print add5(10);\nprint origin.sum();\nprint Point(3, 4).sum();\n"
+
+
+def test_restored_run_matches_a_fresh_one(lox, write, tmp_path):
+    prelude = write("prelude.lox", PRELUDE)
+    program = write("main.lox", PROGRAM)
+    snapshot = os.path.join(tmp_path, "prelude.snapshot")
+    fresh = lox("run", program, "--prelude", prelude)
+    assert fresh == ("prelude loaded\n15\n3\n7\n", "", 0)
+    assert lox("run", program, "--prelude", prelude, "--snapshot", snapshot) == fresh
+    assert os.path.exists(snapshot)
+    assert lox("run", program, "--prelude", prelude, "--snapshot", snapshot) == fresh
+    assert lox("run", "--stream", program, "--prelude", prelude, "--snapshot", snapshot) == fresh
+
+
+def test_snapshot_of_another_prelude_source_is_stale(tmp_path):
+    context = ExecutionContext()
+    scope = context.root_scope.create_child_scope()
+    Parser("var a = 1;").ast.evaluate_in(scope)
+    path = os.path.join(tmp_path, "s")
+    save_snapshot(path, snapshot_key("var a = 1;", True), scope, "", context)
+    assert load_snapshot(path, snapshot_key("var a = 2;", True), ExecutionContext()) is None
+    assert load_snapshot(path, snapshot_key("var a = 1;", False), ExecutionContext()) is None
+    restored = load_snapshot(path, snapshot_key("var a = 1;", True), ExecutionContext())
+    assert restored is not None and restored[0].fetch_variable("a").value == 1.0
+
+
+def test_natives_that_are_not_builtins_can_not_be_saved(tmp_path):
+    context = ExecutionContext()
+    scope = context.root_scope.create_child_scope()
+    scope.create_variable("f").set_value(NativeFunction("f", 0, lambda: None))  # type: ignore
+    with pytest.raises(SnapshotError):
+        save_snapshot(os.path.join(tmp_path, "s"), "key", scope, "", context)
+    assert os.listdir(tmp_path) == []
+
+
+def test_prelude_functions_are_opaque_to_type_inference(lox, write):
+    # clobber changes the type of g, the optimized program must not assume a number
+    prelude = write("prelude.lox", 'var g = 0;\nfun clobber() { g = "oops"; }\n')
+    program = write("main.lox", "g = 1;\nclobber();\nprint -g;\n")
+    expected = ("", "Operands must be numbers.\n1\n", 70)
+    assert lox("run", program, "--prelude", prelude) == expected
+    assert lox("run", "--stream", program, "--prelude", prelude) == expected
+    assert lox("run", "--no-optimize", program, "--prelude", prelude) == expected
+
+
+def test_restored_values_keep_working(lox, write, tmp_path):
+    prelude = write("prelude.lox", (
+        'var m = map();\nmap_set(m, true, "yes");\nmap_set(m, 1, "one");\n'
+        'var a = array(2);\narray_set(a, 1, 2.5);\nvar s = "";\n'
+        'for (var i = 0; i < 200; i = i + 1) s = s + "ab";\n'
+    ))
+    program = write("main.lox", 'print map_get(m, true);\nprint map_get(m, 1);\nprint a;\nprint len(s + "c");\n')
+    snapshot = os.path.join(tmp_path, "prelude.snapshot")
+    for _ in range(2):
+        assert lox("run", program, "--prelude", prelude, "--snapshot", snapshot) == ("yes\none\n[0, 2.5]\n401\n", "", 0)
+
+
+def test_planted_snapshot_never_runs_code(lox, write, tmp_path):
+    prelude = write("prelude.lox", 'var a = 1;\n')
+    program = write("main.lox", "print a;\n")
+    snapshot = os.path.join(tmp_path, "prelude.snapshot")
+    marker = os.path.join(tmp_path, "planted")
+    with open(snapshot, "w") as file:
+        file.write(f"cbuiltins\nopen\n(S'{marker}'\nS'w'\ntR.")
+    assert lox("run", program, "--prelude", prelude, "--snapshot", snapshot) == ("1\n", "", 0)
+    assert not os.path.exists(marker)
+    # a current key in front of a graph naming another class is taken again from the prelude as well
+    with open(snapshot) as file:
+        key, text = file.read().split("\n", 1)
+    with open(snapshot, "w") as file:
+        file.write(key + "\n" + text.replace('"app.execution.execution_context"', '"os"', 1))
+    assert load_snapshot(snapshot, key, ExecutionContext()) is None
+
+
+def test_snapshot_other_users_can_write_is_refused(lox, write, tmp_path):
+    prelude = write("prelude.lox", 'var a = 1;\n')
+    program = write("main.lox", "print a;\n")
+    snapshot = os.path.join(tmp_path, "prelude.snapshot")
+    assert lox("run", program, "--prelude", prelude, "--snapshot", snapshot).stdout == "1\n"
+    os.chmod(snapshot, 0o666)
+    run = lox("run", program, "--prelude", prelude, "--snapshot", snapshot)
+    assert run.code == 1
+    assert "writable by other users" in run.stderr
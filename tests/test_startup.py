@@ -0,0 +1,30 @@
+import inspect
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def imported_by(code):
+    "names of the app modules imported by running code in a fresh interpreter"
+    result = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys\nprint(*sorted(m for m in sys.modules if m.startswith('app')))"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_building_the_parser_does_not_import_the_interpreter():
+    modules = imported_by("from app.main import parse_args\nparse_args(['run', 'script.lox'])")
+    assert "app.main" in modules
+    assert not {"app.expressions", "app.execution", "app.server.daemon", "app.batch"} & modules
+
+
+def test_command_line_defaults_match_the_output():
+    from app.execution import FlushPolicy, Output
+    from app.main import DEFAULT_BUFFER_SIZE, FLUSH_POLICIES
+
+    assert FLUSH_POLICIES == [policy.value for policy in FlushPolicy]
+    # the --flush default is the policy Output starts with
+    assert FLUSH_POLICIES[0] == inspect.signature(Output).parameters["policy"].default.value
+    assert DEFAULT_BUFFER_SIZE == Output.DEFAULT_BUFFER_SIZE
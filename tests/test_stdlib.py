@@ -0,0 +1,140 @@
+import math
+from array import array
+
+import pytest
+
+from app.execution import ExecutionContext
+from app.expressions import NativeFunction, Rope
+from app.expressions.rope import concat
+from app.parse import Parser
+from app.stdlib import BUILT_IN_FUNCTIONS, LoxArray, LoxMap
+from app.stdlib.arrays import array_get, array_map, array_new, array_push, array_set, array_slice, array_sum
+from app.stdlib.maps import map_delete, map_get, map_has, map_keys, map_set, map_size
+from app.stdlib.strings import char_code, from_char_code, string_length, substring, to_number
+from app.utils import ArgumentTypeError, ArrayIndexError, OutOfMemoryError, StringIndexError
+
+BUILTINS = {function.name: function for function in BUILT_IN_FUNCTIONS}
+CONTEXT = ExecutionContext()
+
+
+def call(name, *args):
+    return BUILTINS[name].callback(*args)
+
+
+def test_builtin_names_are_unique():
+    names = [function.name for function in BUILT_IN_FUNCTIONS]
+    assert len(names) == len(set(names))
+
+
+def test_arrays_stay_packed_while_numeric():
+    arr = array_new(CONTEXT, 3.0)
+    assert arr.numeric and len(arr) == 3
+    array_set(arr, 1.0, 2.5)
+    assert array_sum(arr) == 2.5
+    assert str(array_map(arr, "*", 2.0)) == "[0, 5, 0]"
+    assert array_map(arr, "/", 0.0).items[1] == math.inf
+    array_push(arr, "text")
+    assert not arr.numeric
+    assert array_get(arr, 3.0) == "text"
+    assert str(array_slice(arr, 1.0, 4.0)) == "[2.5, 0, text]"
+
+
+def test_array_errors():
+    arr = LoxArray(array("d", [1.0]))
+    with pytest.raises(ArrayIndexError):
+        array_get(arr, 1.0)
+    with pytest.raises(ArgumentTypeError):
+        array_get(arr, 0.5)
+    with pytest.raises(ArgumentTypeError):
+        array_get("not an array", 0.0)
+    with pytest.raises(ArgumentTypeError):
+        array_map(arr, "%", 1.0)
+    with pytest.raises(ArgumentTypeError):
+        array_new(CONTEXT, -1.0)
+    with pytest.raises(OutOfMemoryError):
+        array_new(CONTEXT, 2.0 ** 64)
+
+
+def test_an_array_too_large_for_memory_is_a_runtime_error(lox, write):
+    run = lox("run", write("big.lox", 'print "before";\nvar a = array(100000000000);\n'))
+    assert run == ("before\n", "array() ran out of memory.\n1\n", 70)
+
+
+def test_natives_running_out_of_memory_raise_a_runtime_error():
+    def allocate():
+        raise MemoryError()
+
+    context = ExecutionContext()
+    context.root_scope.create_variable("allocate").set_value(NativeFunction("allocate", 0, allocate))  # type: ignore
+    with pytest.raises(OutOfMemoryError):
+        Parser("allocate();\n").ast.evaluate(context.root_scope)
+
+
+def test_maps_keep_booleans_apart_from_numbers():
+    m = LoxMap()
+    map_set(m, 1.0, "one")
+    map_set(m, True, "true")
+    map_set(m, concat("k" * 300, "!"), "rope")
+    assert map_get(m, 1.0) == "one"
+    assert map_get(m, True) == "true"
+    assert map_get(m, "k" * 300 + "!") == "rope"
+    assert map_get(m, False) is None
+    assert map_has(m, True) and not map_has(m, 2.0)
+    assert map_keys(m).items == [1.0, True, "k" * 300 + "!"]
+    assert map_delete(m, True) is True and map_delete(m, True) is False
+    assert map_size(m) == 2.0
+    with pytest.raises(ArgumentTypeError):
+        map_set(m, LoxMap(), 1.0)
+
+
+def test_strings():
+    rope = concat("a" * 300, "bc")
+    assert string_length(rope) == 302.0
+    assert substring("hello", 1.0, 3.0) == "el"
+    assert char_code("A", 0.0) == 65.0
+    assert from_char_code(97.0) == "a"
+    assert to_number(" -12.5 ") == -12.5
+    assert to_number("abc") is None
+    with pytest.raises(StringIndexError):
+        substring("abc", 2.0, 5.0)
+    with pytest.raises(StringIndexError):
+        char_code("", 0.0)
+    with pytest.raises(ArgumentTypeError):
+        from_char_code(0.5)
+    with pytest.raises(ArgumentTypeError):
+        string_length(1.0)
+
+
+def test_maths_answer_like_ieee():
+    assert math.isnan(call("sqrt", -1.0))
+    assert call("pow", 10.0, 400.0) == math.inf
+    assert call("pow", -10.0, 1001.0) == -math.inf
+    assert call("pow", -10.0, 1000.0) == math.inf
+    assert math.isnan(call("pow", -10.0, 1000.5))
+    assert call("log", 0.0) == -math.inf
+    assert call("floor", math.inf) == math.inf
+    assert call("floor", -2.5) == -3.0
+    assert call("min", 1.0, -1.0) == -1.0
+    assert 0 <= call("random") < 1
+    with pytest.raises(ArgumentTypeError):
+        call("abs", "x")
+
+
+def test_io_builtins(lox, write, tmp_path):
+    target = tmp_path / "out.txt"
+    source = write("io.lox", f'write_file("{target}", "saved");\nwrite("a");\nprint read_file("{target}");\n')
+    assert lox("run", source) == ("asaved\n", "", 0)
+    missing = lox("run", write("missing.lox", 'read_file("/nonexistent/file");\n'))
+    assert missing.code == 70
+    binary = tmp_path / "data.bin"
+    binary.write_bytes(bytes(range(128, 256)))
+    result = lox("run", write("binary.lox", f'read_file("{binary}");\n'))
+    assert result.code == 70
+    assert "read_file() failed: not a text file." in result.stderr
+
+
+def test_clocks():
+    first = call("clock_ns")
+    assert call("clock_ns") >= first
+    assert call("cpu_clock") >= 0
+    assert call("clock") > 0